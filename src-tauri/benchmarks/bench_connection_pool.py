@@ -0,0 +1,116 @@
+"""
+Micro-benchmark: pooled SQLite connections vs. connect-per-call.
+
+Runs against a throwaway database in a temporary directory, never the user's
+~/.classtop/app_config.db.
+
+Usage (from src-tauri/):
+    python benchmarks/bench_connection_pool.py [--iterations 2000] [--entries 200]
+"""
+
+import argparse
+import sqlite3
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "python"))
+
+from tauri_app import db as _db  # noqa: E402
+from tauri_app.connection_pool import get_pool  # noqa: E402
+from tauri_app.schedule_manager import ScheduleManager  # noqa: E402
+
+
+class ConnectPerCallScheduleManager(ScheduleManager):
+    """ScheduleManager with the pre-pool connect/close-per-call behaviour."""
+
+    @contextmanager
+    def get_connection(self):
+        conn = sqlite3.connect(self.db_path)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+
+def _populate(manager: ScheduleManager, entries: int) -> None:
+    course_ids = [manager.add_course(f"Course {i}", f"Teacher {i}", f"Room {i}") for i in range(20)]
+    for i in range(entries):
+        hour = 8 + (i % 10)
+        manager.add_schedule_entry(
+            course_ids[i % len(course_ids)],
+            (i % 7) + 1,
+            f"{hour:02d}:00",
+            f"{hour:02d}:45",
+            weeks=list(range(1 + i % 2, 21, 2)),
+        )
+
+
+def _time_per_call(fn, iterations: int) -> float:
+    """Return the mean latency of fn() in microseconds."""
+    fn()  # warm-up
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def _raw_setting_lookup_connect_per_call(db_path: Path):
+    def run():
+        conn = sqlite3.connect(db_path)
+        try:
+            conn.execute("SELECT value FROM settings WHERE key=?", ("current_week",)).fetchone()
+        finally:
+            conn.close()
+    return run
+
+
+def _raw_setting_lookup_pooled(db_path: Path):
+    pool = get_pool(db_path)
+
+    def run():
+        with pool.connection() as conn:
+            conn.execute("SELECT value FROM settings WHERE key=?", ("current_week",)).fetchone()
+    return run
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--entries", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "bench.db"
+        _db.init_db(db_path)
+
+        pooled = ScheduleManager(db_path)
+        legacy = ConnectPerCallScheduleManager(db_path)
+        _populate(pooled, args.entries)
+
+        cases = [
+            ("settings lookup (raw SQL)",
+             _raw_setting_lookup_connect_per_call(db_path),
+             _raw_setting_lookup_pooled(db_path)),
+            ("get_schedule_by_day(3, week=5)",
+             lambda: legacy.get_schedule_by_day(3, 5),
+             lambda: pooled.get_schedule_by_day(3, 5)),
+            ("get_statistics()",
+             legacy.get_statistics,
+             pooled.get_statistics),
+        ]
+
+        print(f"{args.iterations} iterations, {args.entries} schedule entries\n")
+        print(f"{'case':<34}{'connect/call':>14}{'pooled':>12}{'speedup':>10}")
+        for name, legacy_fn, pooled_fn in cases:
+            legacy_us = _time_per_call(legacy_fn, args.iterations)
+            pooled_us = _time_per_call(pooled_fn, args.iterations)
+            print(f"{name:<34}{legacy_us:>12.1f}us{pooled_us:>10.1f}us{legacy_us / pooled_us:>9.1f}x")
+
+        pooled.pool.close_all()
+
+
+if __name__ == "__main__":
+    main()
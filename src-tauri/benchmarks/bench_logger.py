@@ -0,0 +1,87 @@
+"""
+Micro-benchmark: log_message fast path vs. the inspect.stack() based wrapper.
+
+All default sinks are replaced by a sink writing to a throwaway file in a
+temporary directory, so nothing reaches the user's ~/.classtop/logs/app.log.
+
+Usage (from src-tauri/):
+    python benchmarks/bench_logger.py [--iterations 5000]
+"""
+
+import argparse
+import inspect
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "python"))
+
+from tauri_app import logger as _logger  # noqa: E402
+from tauri_app.logger import FILE_FORMAT, logger  # noqa: E402
+
+
+def _legacy_caller_depth() -> int:
+    """The pre-fast-path depth lookup: walk the whole stack on every call."""
+    current_file = Path(__file__).resolve()
+    for depth, frame_info in enumerate(inspect.stack()):
+        try:
+            if Path(frame_info.filename).resolve() != current_file:
+                return depth
+        except Exception:
+            continue
+    return 0
+
+
+def legacy_log_message(level: str, message: str) -> None:
+    level = (level or "info").upper()
+    depth = _legacy_caller_depth()
+    try:
+        logger.opt(depth=depth).log(level, message)
+    except Exception:
+        logger.log(level, message)
+
+
+def _time_per_call(fn, iterations: int) -> float:
+    """Return the mean latency of fn() in microseconds."""
+    fn()  # warm-up
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=5000)
+    args = parser.parse_args()
+
+    rows = [{"id": i, "name": f"Course {i}"} for i in range(50)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        logger.remove()
+        sink_id = logger.add(str(Path(tmp) / "bench.log"), level="INFO", format=FILE_FORMAT)
+        # Mirror the sink level so debug messages take the filtered path
+        _logger.set_min_level("INFO")
+
+        cases = [
+            ("info, emitted",
+             lambda: legacy_log_message("info", f"Loaded {len(rows)} rows"),
+             lambda: _logger.log_message("info", "Loaded {} rows", len(rows))),
+            ("debug, filtered",
+             lambda: legacy_log_message("debug", f"Rows: {rows}"),
+             lambda: _logger.log_message("debug", "Rows: {}", rows)),
+        ]
+
+        print(f"{args.iterations} iterations\n")
+        print(f"{'case':<20}{'inspect.stack':>16}{'fast path':>12}{'speedup':>10}")
+        for name, legacy_fn, fast_fn in cases:
+            legacy_us = _time_per_call(legacy_fn, args.iterations)
+            fast_us = _time_per_call(fast_fn, args.iterations)
+            print(f"{name:<20}{legacy_us:>14.1f}us{fast_us:>10.2f}us{legacy_us / fast_us:>9.1f}x")
+
+        logger.remove(sink_id)
+
+
+if __name__ == "__main__":
+    main()
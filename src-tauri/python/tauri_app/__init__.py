@@ -26,6 +26,7 @@ def main() -> int:
     from .schedule_manager import ScheduleManager
     from .settings_manager import SettingsManager
     from .api_server import APIServer
+    from .services import ServiceSupervisor
     from . import db as _db
 
     context = context_factory()
@@ -41,6 +42,10 @@ def main() -> int:
         # Initialize event handler with app handle and portal for thread safety
         event_handler.initialize(app_handle, portal)
 
+        # Background services run as tasks on the portal's event loop
+        supervisor = ServiceSupervisor(portal)
+        _db.set_service_supervisor(supervisor)
+
         # Initialize database and managers
         try:
             _db.init_db()
@@ -59,9 +64,10 @@ def main() -> int:
             # Initialize reminder manager
             try:
                 from .reminder_manager import ReminderManager
-                reminder_manager = ReminderManager(schedule_manager, settings_manager, app_handle)
-                reminder_enabled = settings_manager.get_setting('reminder_enabled')
-                if reminder_enabled == 'true':
+                reminder_manager = ReminderManager(schedule_manager, settings_manager, supervisor, app_handle)
+                _db.set_reminder_manager(reminder_manager)
+                # 之后 reminder_enabled 的变更由 ReminderManager 订阅后实时启停
+                if reminder_manager.reminder_enabled:
                     reminder_manager.start()
                     _logger.log_message("info", "Reminder service started")
                 else:
@@ -88,8 +94,7 @@ def main() -> int:
 
             # Initialize camera manager if enabled (with WebSocket client reference)
             import platform
-            camera_enabled = settings_manager.get_setting('camera_enabled')
-            if camera_enabled == 'true':
+            if settings_manager.get_bool('camera_enabled'):
                 if platform.system() == "Windows":
                     try:
                         from .camera_manager import CameraManager
@@ -125,11 +130,10 @@ def main() -> int:
 
             # Initialize and start API server if enabled
             try:
-                api_enabled = settings_manager.get_setting('api_server_enabled')
-                if api_enabled == 'true':
+                if settings_manager.get_bool('api_server_enabled'):
                     api_server = APIServer(_db.DB_PATH, schedule_manager, settings_manager)
                     api_host = settings_manager.get_setting('api_server_host') or '0.0.0.0'
-                    api_port = int(settings_manager.get_setting('api_server_port') or 8765)
+                    api_port = settings_manager.get_int('api_server_port', 8765)
                     api_server.start(host=api_host, port=api_port)
                     _logger.log_message(
                         "info", f"API server started on {api_host}:{api_port}")
@@ -149,4 +153,5 @@ def main() -> int:
             print("Warning: Failed to setup system tray")
 
         exit_code = app.run_return()
+        supervisor.shutdown()
         return exit_code
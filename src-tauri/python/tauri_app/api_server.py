@@ -9,8 +9,9 @@ from typing import Optional, List, Dict, Any
 from datetime import datetime
 
 try:
-    from fastapi import FastAPI, HTTPException, Query
+    from fastapi import FastAPI, HTTPException, Query, Request
     from fastapi.middleware.cors import CORSMiddleware
+    from fastapi.responses import StreamingResponse
     from pydantic import BaseModel
     import uvicorn
 except ImportError:
@@ -18,6 +19,7 @@ except ImportError:
     print("Warning: FastAPI not installed. API server will not be available.")
 
 from . import logger as _logger
+from .settings_schema import validate_setting
 
 
 class APIServer:
@@ -165,6 +167,55 @@ class APIServer:
                 self.logger.log_message("error", f"API error deleting course: {e}")
                 raise HTTPException(status_code=500, detail=str(e))
 
+        @self.app.get("/api/courses/{course_id}/reminders", tags=["Courses"])
+        async def get_course_reminders(course_id: int):
+            """获取课程提醒方案 / Get a course's reminder plan."""
+            from . import db as _db
+            if not _db.reminder_manager:
+                raise HTTPException(status_code=503, detail="Reminder manager not available")
+            try:
+                return {"success": True, "data": _db.reminder_manager.get_course_plan(course_id)}
+            except Exception as e:
+                self.logger.log_message("error", f"API error getting reminder plan: {e}")
+                raise HTTPException(status_code=500, detail=str(e))
+
+        @self.app.put("/api/courses/{course_id}/reminders", tags=["Courses"])
+        async def update_course_reminders(course_id: int, plan: Dict[str, Any]):
+            """设置课程提醒方案 / Set a course's reminder offsets and end-of-class notice."""
+            from . import db as _db
+            if not _db.reminder_manager:
+                raise HTTPException(status_code=503, detail="Reminder manager not available")
+            try:
+                success = _db.reminder_manager.set_course_plan(
+                    course_id,
+                    enabled=plan.get("enabled", True),
+                    offsets=plan.get("offsets"),
+                    end_notice=plan.get("end_notice")
+                )
+                if not success:
+                    raise HTTPException(status_code=404, detail="Course not found")
+                return {"success": True, "data": _db.reminder_manager.get_course_plan(course_id)}
+            except (TypeError, ValueError) as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            except HTTPException:
+                raise
+            except Exception as e:
+                self.logger.log_message("error", f"API error setting reminder plan: {e}")
+                raise HTTPException(status_code=500, detail=str(e))
+
+        @self.app.delete("/api/courses/{course_id}/reminders", tags=["Courses"])
+        async def delete_course_reminders(course_id: int):
+            """删除课程提醒方案（恢复全局设置）/ Reset a course to the global reminder settings."""
+            from . import db as _db
+            if not _db.reminder_manager:
+                raise HTTPException(status_code=503, detail="Reminder manager not available")
+            try:
+                removed = _db.reminder_manager.clear_course_plan(course_id)
+                return {"success": True, "data": {"removed": removed}}
+            except Exception as e:
+                self.logger.log_message("error", f"API error clearing reminder plan: {e}")
+                raise HTTPException(status_code=500, detail=str(e))
+
         # ==================== Schedule Management ====================
 
         @self.app.get("/api/schedule", tags=["Schedule"])
@@ -221,15 +272,29 @@ class APIServer:
                 raise HTTPException(status_code=500, detail=str(e))
 
         @self.app.get("/api/schedule/week", tags=["Schedule"])
-        async def get_schedule_for_week(week: Optional[int] = Query(None)):
+        async def get_schedule_for_week(week: Optional[int] = Query(None),
+                                        grouped: bool = Query(False, description="Group classes by day of week")):
             """获取整周课程表 / Get schedule for entire week."""
             try:
-                classes = self.schedule_manager.get_schedule_for_week(week)
+                if grouped:
+                    classes = self.schedule_manager.get_schedule_for_week_grouped(week)
+                else:
+                    classes = self.schedule_manager.get_schedule_for_week(week)
                 return {"success": True, "data": classes}
             except Exception as e:
                 self.logger.log_message("error", f"API error getting weekly schedule: {e}")
                 raise HTTPException(status_code=500, detail=str(e))
 
+        @self.app.get("/api/schedule/conflicts", tags=["Schedule"])
+        async def get_conflict_report():
+            """获取整个课程表的冲突报告 / Get every conflicting pair in the timetable."""
+            try:
+                report = self.schedule_manager.get_conflict_report()
+                return {"success": True, "data": {"has_conflict": len(report) > 0, "conflicts": report}}
+            except Exception as e:
+                self.logger.log_message("error", f"API error getting conflict report: {e}")
+                raise HTTPException(status_code=500, detail=str(e))
+
         @self.app.delete("/api/schedule/{entry_id}", tags=["Schedule"])
         async def delete_schedule_entry(entry_id: int):
             """删除课程表条目 / Delete a schedule entry."""
@@ -246,6 +311,30 @@ class APIServer:
                 self.logger.log_message("error", f"API error deleting schedule entry: {e}")
                 raise HTTPException(status_code=500, detail=str(e))
 
+        # ==================== Data Export ====================
+
+        @self.app.get("/api/export", tags=["Data"])
+        async def export_data(
+            format: str = Query("json", description="json, ndjson or csv"),
+            include_courses: bool = Query(True),
+            include_schedule: bool = Query(True),
+            include_settings: bool = Query(False)
+        ):
+            """流式导出数据 / Stream an export of courses, schedule and settings."""
+            from .data_export import DataExporter, EXPORT_FORMATS, MEDIA_TYPES
+
+            if format not in EXPORT_FORMATS:
+                raise HTTPException(status_code=400, detail=f"Unsupported export format: {format}")
+
+            chunks = DataExporter(self.db_path).iter_export(
+                format, include_courses, include_schedule, include_settings
+            )
+            return StreamingResponse(
+                chunks,
+                media_type=MEDIA_TYPES[format],
+                headers={"Content-Disposition": f'attachment; filename="classtop_export.{format}"'}
+            )
+
         # ==================== Settings Management ====================
 
         @self.app.get("/api/settings", tags=["Settings"])
@@ -253,7 +342,7 @@ class APIServer:
             """获取所有设置 / Get all settings."""
             try:
                 settings = self.settings_manager.get_all_settings()
-                return {"success": True, "data": settings}
+                return {"success": True, "data": dict(settings)}
             except Exception as e:
                 self.logger.log_message("error", f"API error getting settings: {e}")
                 raise HTTPException(status_code=500, detail=str(e))
@@ -278,6 +367,10 @@ class APIServer:
         async def update_settings(settings: Dict[str, str]):
             """批量更新设置 / Update multiple settings."""
             try:
+                errors = [e for e in (validate_setting(k, v) for k, v in settings.items()) if e]
+                if errors:
+                    raise HTTPException(status_code=400, detail="; ".join(errors))
+
                 success = self.settings_manager.update_multiple(settings)
 
                 if success:
@@ -297,6 +390,9 @@ class APIServer:
                 val = value.get("value")
                 if val is None:
                     raise HTTPException(status_code=400, detail="Value is required")
+                error = validate_setting(key, val)
+                if error:
+                    raise HTTPException(status_code=400, detail=error)
 
                 success = self.settings_manager.set_setting(key, val)
 
@@ -349,6 +445,19 @@ class APIServer:
                 self.logger.log_message("error", f"API error getting current week: {e}")
                 raise HTTPException(status_code=500, detail=str(e))
 
+        @self.app.get("/api/week/range", tags=["Week"])
+        async def get_week_numbers(start_date: str, end_date: str, strict: bool = False):
+            """获取日期范围内每天的周次 / Get week numbers for a date range."""
+            try:
+                from . import db as _db
+                weeks = _db.get_week_numbers(start_date, end_date, strict)
+                return {"success": True, "data": weeks}
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            except Exception as e:
+                self.logger.log_message("error", f"API error getting week numbers: {e}")
+                raise HTTPException(status_code=500, detail=str(e))
+
         @self.app.post("/api/week/semester-start", tags=["Week"])
         async def set_semester_start(data: Dict[str, str]):
             """设置学期开始日期 / Set semester start date."""
@@ -370,6 +479,33 @@ class APIServer:
                 self.logger.log_message("error", f"API error setting semester start: {e}")
                 raise HTTPException(status_code=500, detail=str(e))
 
+        # ==================== Changes ====================
+
+        @self.app.get("/api/changes", tags=["Changes"])
+        async def get_changes_since(since: int = Query(0, ge=0)):
+            """获取指定版本之后的变更 / Get schedule and settings changes after a revision."""
+            try:
+                from .events import event_handler
+                return {"success": True, "data": event_handler.get_changes_since(since)}
+            except Exception as e:
+                self.logger.log_message("error", f"API error getting changes: {e}")
+                raise HTTPException(status_code=500, detail=str(e))
+
+        # ==================== Metrics ====================
+
+        @self.app.get("/api/metrics", tags=["Metrics"])
+        async def get_metrics():
+            """获取事件发送与日志写入指标 / Get event emission and log writer metrics."""
+            try:
+                from .events import event_handler
+                return {"success": True, "data": {
+                    "events": event_handler.get_metrics(),
+                    "logging": _logger.get_log_stats(),
+                }}
+            except Exception as e:
+                self.logger.log_message("error", f"API error getting metrics: {e}")
+                raise HTTPException(status_code=500, detail=str(e))
+
         # ==================== Statistics ====================
 
         @self.app.get("/api/statistics", tags=["Statistics"])
@@ -384,27 +520,83 @@ class APIServer:
 
         # ==================== Logs ====================
 
+        # Plain def: flushing the sink and reading files blocks, so FastAPI
+        # runs this in its threadpool instead of on the event loop
         @self.app.get("/api/logs", tags=["Logs"])
-        async def get_logs(max_lines: int = Query(200, description="Maximum number of log lines")):
-            """获取应用日志 / Get application logs."""
+        def get_logs(
+            max_lines: int = Query(200, ge=1, description="Maximum number of log lines"),
+            level: Optional[str] = Query(None, description="Minimum level, e.g. warning"),
+            since: Optional[str] = Query(None, description="Start time (YYYY-MM-DD HH:mm:ss)"),
+            until: Optional[str] = Query(None, description="End time (YYYY-MM-DD HH:mm:ss)"),
+            cursor: Optional[str] = Query(None, description="Cursor from the previous page"),
+        ):
+            """获取应用日志（从新到旧分页）/ Get application logs, paged from newest to oldest."""
             try:
-                lines = _logger.tail_logs(max_lines)
-                return {"success": True, "data": {"lines": lines}}
+                page = _logger.read_logs(max_lines, level=level, since=since, until=until, cursor=cursor)
+                return {"success": True, "data": page}
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
             except Exception as e:
                 self.logger.log_message("error", f"API error getting logs: {e}")
                 raise HTTPException(status_code=500, detail=str(e))
 
+        @self.app.get("/api/logs/stream", tags=["Logs"])
+        async def stream_logs(
+            request: Request,
+            level: Optional[str] = Query(None, description="Minimum level, e.g. warning"),
+            module: Optional[List[str]] = Query(None, description="Module names to include"),
+            backlog: int = Query(50, ge=0, le=1000, description="Recent entries sent first"),
+        ):
+            """实时日志流（SSE）/ Stream log records as Server-Sent Events."""
+            from .log_stream import make_filter
+
+            try:
+                log_filter = make_filter(level, module)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+
+            subscription = _logger.log_stream.open_async(log_filter, backlog=backlog)
+
+            def sse(entry: Dict[str, Any]) -> str:
+                return f"id: {entry['seq']}\nevent: log\ndata: {json.dumps(entry, ensure_ascii=False)}\n\n"
+
+            async def events():
+                try:
+                    for entry in subscription.backlog:
+                        yield sse(entry)
+                    while not await request.is_disconnected():
+                        batch = await subscription.get_batch(timeout=15)
+                        if not batch:
+                            yield ": keepalive\n\n"
+                            continue
+                        chunk = "".join(sse(entry) for entry in batch)
+                        if subscription.dropped:
+                            # Tell the viewer it missed entries because it fell behind
+                            chunk += f"event: dropped\ndata: {subscription.dropped}\n\n"
+                            subscription.dropped = 0
+                        yield chunk
+                finally:
+                    subscription.close()
+
+            return StreamingResponse(
+                events(),
+                media_type="text/event-stream",
+                headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+            )
+
         # ==================== Health Check ====================
 
         @self.app.get("/api/health", tags=["System"])
         async def health_check():
             """健康检查 / Health check endpoint."""
+            from . import db as _db
             return {
                 "success": True,
                 "data": {
                     "status": "healthy",
                     "timestamp": datetime.now().isoformat(),
-                    "version": "1.0.0"
+                    "version": "1.0.0",
+                    "services": _db.get_services_health()
                 }
             }
 
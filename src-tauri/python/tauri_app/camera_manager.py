@@ -80,12 +80,12 @@ class CameraManager:
         config = MonitorConfig()
 
         # 摄像头设置
-        if width := self.settings_manager.get_setting('camera_width'):
-            config.camera.width = int(width)
-        if height := self.settings_manager.get_setting('camera_height'):
-            config.camera.height = int(height)
-        if fps := self.settings_manager.get_setting('camera_fps'):
-            config.camera.fps = int(fps)
+        if width := self.settings_manager.get_typed('camera_width'):
+            config.camera.width = width
+        if height := self.settings_manager.get_typed('camera_height'):
+            config.camera.height = height
+        if fps := self.settings_manager.get_typed('camera_fps'):
+            config.camera.fps = fps
         if encoder_pref := self.settings_manager.get_setting('camera_encoder_preference'):
             config.camera.encoder_preference = encoder_pref
 
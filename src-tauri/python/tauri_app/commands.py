@@ -3,9 +3,11 @@ Command handlers for ClassTop application.
 """
 
 import sys
+from functools import partial
 import numpy as np
-from typing import Optional, List, Dict
+from typing import Any, Optional, List, Dict
 
+from anyio import to_thread
 from pydantic import BaseModel
 from pytauri import Commands
 from pytauri.ipc import Channel, JavaScriptChannelId, WebviewWindow
@@ -41,6 +43,8 @@ class LogResponse(BaseModel):
 
 class LogsResponse(BaseModel):
     lines: List[str]
+    cursor: Optional[str] = None
+    has_more: bool = False
 
 
 class SetConfigRequest(BaseModel):
@@ -55,6 +59,10 @@ class ConfigResponse(BaseModel):
 
 class GetLogsRequest(BaseModel):
     max_lines: Optional[int] = 200
+    level: Optional[str] = None  # minimum level, e.g. "warning"
+    since: Optional[str] = None  # "YYYY-MM-DD HH:mm:ss"
+    until: Optional[str] = None
+    cursor: Optional[str] = None  # from a previous response, for older lines
 
 
 class GetConfigRequest(BaseModel):
@@ -78,8 +86,16 @@ async def log_message(body: LogRequest) -> LogResponse:
 
 @commands.command()
 async def get_logs(body: GetLogsRequest) -> LogsResponse:
-    lines = _logger.tail_logs(int(body.max_lines or 200))
-    return LogsResponse(lines=lines)
+    # Flushing the sink and reading log files blocks; keep it off the portal loop
+    page = await to_thread.run_sync(partial(
+        _logger.read_logs,
+        int(body.max_lines or 200),
+        level=body.level,
+        since=body.since,
+        until=body.until,
+        cursor=body.cursor,
+    ))
+    return LogsResponse(**page)
 
 
 @commands.command()
@@ -254,6 +270,67 @@ async def check_schedule_conflict(body: ConflictCheckRequest) -> ConflictCheckRe
     )
 
 
+class ConflictReportEntry(BaseModel):
+    day_of_week: int
+    first: ConflictEntry
+    second: ConflictEntry
+    conflict_weeks: List[int]
+    all_weeks: bool  # 两者均无周次限制，每周都冲突
+
+
+class ConflictReportResponse(BaseModel):
+    has_conflict: bool
+    conflicts: List[ConflictReportEntry]
+
+
+@commands.command()
+async def get_schedule_conflict_report() -> ConflictReportResponse:
+    """Validate the whole timetable and list every pair of conflicting entries."""
+    if not _db.schedule_manager:
+        return ConflictReportResponse(has_conflict=False, conflicts=[])
+
+    report = [ConflictReportEntry(**item) for item in _db.schedule_manager.get_conflict_report()]
+    return ConflictReportResponse(has_conflict=len(report) > 0, conflicts=report)
+
+
+class ChangesSinceRequest(BaseModel):
+    revision: int = 0
+
+
+class ChangeRecord(BaseModel):
+    revision: int
+    channel: str  # "schedule" or "settings"
+    type: str
+    payload: Dict[str, Any]
+    timestamp: str
+
+
+class ChangesSinceResponse(BaseModel):
+    revision: int
+    complete: bool  # False: 变更已超出缓冲区，需全量重新加载
+    changes: List[ChangeRecord]
+
+
+@commands.command()
+async def get_changes_since(body: ChangesSinceRequest) -> ChangesSinceResponse:
+    """Schedule/settings changes after a revision, for applying deltas instead of refetching."""
+    from .events import event_handler
+    return ChangesSinceResponse(**event_handler.get_changes_since(body.revision))
+
+
+@commands.command()
+async def get_services_health() -> Dict[str, Dict[str, Any]]:
+    """State, uptime, restarts and last error of background services."""
+    return _db.get_services_health()
+
+
+@commands.command()
+async def get_event_metrics() -> Dict[str, Any]:
+    """Event emission counters (queued/emitted/dropped/failed) and latency histograms."""
+    from .events import event_handler
+    return event_handler.get_metrics()
+
+
 @commands.command()
 async def get_schedule(body: WeekRequest) -> List[ScheduleEntryResponse]:
     schedule = _db.get_schedule(body.week)
@@ -312,6 +389,13 @@ async def get_schedule_for_week(body: WeekRequest) -> List[NextClassResponse]:
     return [NextClassResponse(**cls) for cls in classes]
 
 
+@commands.command()
+async def get_schedule_for_week_grouped(body: WeekRequest) -> Dict[int, List[NextClassResponse]]:
+    """Get all classes for the entire week grouped by day of week (1-7)."""
+    grouped = _db.get_schedule_for_week_grouped(body.week)
+    return {day: [NextClassResponse(**cls) for cls in classes] for day, classes in grouped.items()}
+
+
 @commands.command()
 async def get_current_week() -> Dict:
     """Get the current week number, either calculated or manually set."""
@@ -330,6 +414,22 @@ async def get_calculated_week_number() -> int:
     return _db.get_calculated_week_number()
 
 
+class WeekRangeRequest(BaseModel):
+    start_date: str
+    end_date: str
+    strict: bool = False
+
+
+@commands.command()
+async def get_week_numbers(body: WeekRangeRequest) -> Dict:
+    """Get the teaching week of every date in a range (None for out-of-term days when strict)."""
+    try:
+        weeks = _db.get_week_numbers(body.start_date, body.end_date, body.strict)
+    except ValueError as e:
+        return {"success": False, "message": str(e)}
+    return {"success": True, "weeks": weeks}
+
+
 @commands.command()
 async def set_semester_start_date(body: Dict) -> Dict:
     """Set the semester start date for automatic week calculation."""
@@ -344,6 +444,49 @@ async def set_semester_start_date(body: Dict) -> Dict:
         return {"success": True, "semester_start_date": "", "calculated_week": 1}
 
 
+# ========== Course Reminder Plan Commands ==========
+
+class CourseIdRequest(BaseModel):
+    course_id: int
+
+
+class CourseReminderPlanRequest(BaseModel):
+    course_id: int
+    enabled: bool = True
+    offsets: Optional[List[int]] = None  # minutes before class; None = use settings
+    end_notice: Optional[bool] = None  # None = use settings
+
+
+@commands.command()
+async def get_course_reminder_plan(body: CourseIdRequest) -> Dict:
+    """Get a course's reminder plan together with the effective offsets."""
+    if not _db.reminder_manager:
+        return {"success": False, "message": "Reminder manager not available"}
+    return {"success": True, "plan": _db.reminder_manager.get_course_plan(body.course_id)}
+
+
+@commands.command()
+async def set_course_reminder_plan(body: CourseReminderPlanRequest) -> Dict:
+    """Set per-course reminder offsets and end-of-class notice."""
+    if not _db.reminder_manager:
+        return {"success": False, "message": "Reminder manager not available"}
+    try:
+        success = _db.reminder_manager.set_course_plan(
+            body.course_id, body.enabled, body.offsets, body.end_notice
+        )
+    except ValueError as e:
+        return {"success": False, "message": str(e)}
+    return {"success": success}
+
+
+@commands.command()
+async def clear_course_reminder_plan(body: CourseIdRequest) -> Dict:
+    """Remove a course's reminder plan so it follows the global settings again."""
+    if not _db.reminder_manager:
+        return {"success": False, "message": "Reminder manager not available"}
+    return {"success": _db.reminder_manager.clear_course_plan(body.course_id)}
+
+
 # ========== Settings Management Commands ==========
 
 @commands.command()
@@ -774,10 +917,11 @@ async def get_audio_devices() -> AudioDevicesResponse:
 # ========== Data Import/Export Commands ==========
 
 class ExportDataRequest(BaseModel):
-    format: str  # "json" or "csv"
+    format: str  # "json", "ndjson" or "csv"
     include_courses: bool = True
     include_schedule: bool = True
     include_settings: bool = False
+    output_path: Optional[str] = None  # 指定时直接流式写入文件（推荐）；否则通过 data 返回，大小受 MAX_INLINE_CHARS 限制
 
 
 class ExportDataResponse(BaseModel):
@@ -787,7 +931,7 @@ class ExportDataResponse(BaseModel):
 
 
 class ImportDataRequest(BaseModel):
-    format: str  # "json" or "csv"
+    format: str  # "json", "ndjson" or "csv"
     data: str
     replace_existing: bool = False  # 是否替换现有数据
 
@@ -797,83 +941,44 @@ class ImportDataResponse(BaseModel):
     message: str
     courses_imported: int = 0
     schedule_imported: int = 0
+    conflicts: int = 0  # 导入后检测到的冲突数
 
 
 @commands.command()
 async def export_schedule_data(body: ExportDataRequest) -> ExportDataResponse:
-    """Export schedule data to JSON or CSV format."""
+    """Export schedule data to JSON, NDJSON or CSV format."""
     try:
-        import json
-        import csv
-        import io
+        from .data_export import DataExporter, EXPORT_FORMATS
 
-        data_dict = {}
-
-        # Export courses
-        if body.include_courses:
-            courses = _db.get_courses()
-            data_dict['courses'] = courses
-
-        # Export schedule
-        if body.include_schedule:
-            schedule = _db.get_schedule(week=None)
-            data_dict['schedule'] = schedule
-
-        # Export settings (optional)
-        if body.include_settings:
-            settings = _db.list_configs()
-            # Exclude sensitive settings
-            safe_settings = {k: v for k, v in settings.items()
-                           if k not in ['client_uuid', 'server_url', 'api_server_enabled']}
-            data_dict['settings'] = safe_settings
-
-        if body.format == 'json':
-            # Export as JSON
-            json_data = json.dumps(data_dict, ensure_ascii=False, indent=2)
+        if body.format not in EXPORT_FORMATS:
             return ExportDataResponse(
-                success=True,
-                data=json_data,
-                message="数据已导出为 JSON 格式"
+                success=False,
+                message=f"不支持的导出格式: {body.format}"
             )
 
-        elif body.format == 'csv':
-            # Export as CSV (schedule entries only)
-            output = io.StringIO()
-            writer = csv.writer(output)
-
-            # Write CSV header
-            writer.writerow([
-                'course_id', 'course_name', 'teacher', 'location', 'color',
-                'day_of_week', 'start_time', 'end_time', 'weeks', 'note'
-            ])
-
-            # Write schedule entries
-            for entry in data_dict.get('schedule', []):
-                writer.writerow([
-                    entry.get('course_id', ''),
-                    entry.get('course_name', ''),
-                    entry.get('teacher', ''),
-                    entry.get('location', ''),
-                    entry.get('color', ''),
-                    entry.get('day_of_week', ''),
-                    entry.get('start_time', ''),
-                    entry.get('end_time', ''),
-                    json.dumps(entry.get('weeks', [])),
-                    entry.get('note', '')
-                ])
-
-            csv_data = output.getvalue()
+        exporter = DataExporter(_db.DB_PATH)
+        options = (body.format, body.include_courses, body.include_schedule, body.include_settings)
+
+        if body.output_path:
+            # Stream straight to disk so large exports never sit in memory
+            exporter.export_to_file(body.output_path, *options)
             return ExportDataResponse(
                 success=True,
-                data=csv_data,
-                message="数据已导出为 CSV 格式"
+                message=f"数据已导出为 {body.format.upper()} 格式: {body.output_path}"
             )
 
-        else:
+        try:
+            data = exporter.export_to_string(*options)
+        except ValueError:
             return ExportDataResponse(
                 success=False,
-                message=f"不支持的导出格式: {body.format}"
+                message="导出数据过大，请指定 output_path 直接导出到文件"
             )
+        return ExportDataResponse(
+            success=True,
+            data=data,
+            message=f"数据已导出为 {body.format.upper()} 格式"
+        )
 
     except Exception as e:
         _logger.log_message("error", f"Failed to export data: {e}")
@@ -891,117 +996,75 @@ async def import_schedule_data(body: ImportDataRequest) -> ImportDataResponse:
         import csv
         import io
 
-        courses_imported = 0
-        schedule_imported = 0
-
-        if body.format == 'json':
-            # Parse JSON data
-            data_dict = json.loads(body.data)
-
-            # Clear existing data if requested
-            if body.replace_existing:
-                # Delete all schedule entries and courses
-                all_courses = _db.get_courses()
-                for course in all_courses:
-                    _db.delete_course(course['id'])
-
-            # Import courses
-            if 'courses' in data_dict:
-                course_id_map = {}  # Map old IDs to new IDs
-                for course_data in data_dict['courses']:
-                    # Remove ID to create new course
-                    course_name = course_data.get('name')
-                    teacher = course_data.get('teacher')
-                    location = course_data.get('location')
-                    color = course_data.get('color')
-
-                    new_id = _db.add_course(course_name, teacher, location, color)
-                    if new_id > 0:
-                        old_id = course_data.get('id')
-                        course_id_map[old_id] = new_id
-                        courses_imported += 1
-
-            # Import schedule entries
-            if 'schedule' in data_dict:
-                for entry_data in data_dict['schedule']:
-                    old_course_id = entry_data.get('course_id')
-                    new_course_id = course_id_map.get(old_course_id)
-
-                    if new_course_id:
-                        entry_id = _db.add_schedule_entry(
-                            course_id=new_course_id,
-                            day_of_week=entry_data.get('day_of_week'),
-                            start_time=entry_data.get('start_time'),
-                            end_time=entry_data.get('end_time'),
-                            weeks=entry_data.get('weeks'),
-                            note=entry_data.get('note')
-                        )
-                        if entry_id > 0:
-                            schedule_imported += 1
-
-            return ImportDataResponse(
-                success=True,
-                message=f"成功导入 {courses_imported} 门课程和 {schedule_imported} 条课程表",
-                courses_imported=courses_imported,
-                schedule_imported=schedule_imported
-            )
+        courses = []
+        entries = []
+
+        if body.format in ('json', 'ndjson'):
+            # Parse JSON data; entries reference courses by their exported ID
+            if body.format == 'ndjson':
+                data_dict = {'courses': [], 'schedule': []}
+                sections = {'course': data_dict['courses'], 'schedule': data_dict['schedule']}
+                for line in body.data.splitlines():
+                    if line.strip():
+                        record = json.loads(line)
+                        if record.get('type') in sections:
+                            sections[record['type']].append(record['data'])
+            else:
+                data_dict = json.loads(body.data)
+
+            for course_data in data_dict.get('courses', []):
+                courses.append({
+                    'ref': course_data.get('id'),
+                    'name': course_data.get('name'),
+                    'teacher': course_data.get('teacher'),
+                    'location': course_data.get('location'),
+                    'color': course_data.get('color')
+                })
+
+            for entry_data in data_dict.get('schedule', []):
+                entries.append({
+                    'course_ref': entry_data.get('course_id'),
+                    'day_of_week': entry_data.get('day_of_week'),
+                    'start_time': entry_data.get('start_time'),
+                    'end_time': entry_data.get('end_time'),
+                    'weeks': entry_data.get('weeks'),
+                    'note': entry_data.get('note')
+                })
 
         elif body.format == 'csv':
-            # Parse CSV data
+            # Parse CSV data; courses are created once per distinct course name
             reader = csv.DictReader(io.StringIO(body.data))
-
-            # Clear existing data if requested
-            if body.replace_existing:
-                all_courses = _db.get_courses()
-                for course in all_courses:
-                    _db.delete_course(course['id'])
-
-            # Map to track created courses
-            course_map = {}  # name -> course_id
+            seen_courses = set()
 
             for row in reader:
-                course_name = row.get('course_name', '').strip()
+                course_name = (row.get('course_name') or '').strip()
                 if not course_name:
                     continue
 
-                # Create or get course
-                if course_name not in course_map:
-                    course_id = _db.add_course(
-                        name=course_name,
-                        teacher=row.get('teacher'),
-                        location=row.get('location'),
-                        color=row.get('color')
-                    )
-                    if course_id > 0:
-                        course_map[course_name] = course_id
-                        courses_imported += 1
-                else:
-                    course_id = course_map[course_name]
+                if course_name not in seen_courses:
+                    seen_courses.add(course_name)
+                    courses.append({
+                        'ref': course_name,
+                        'name': course_name,
+                        'teacher': row.get('teacher'),
+                        'location': row.get('location'),
+                        'color': row.get('color')
+                    })
 
-                # Add schedule entry
                 try:
                     weeks_str = row.get('weeks', '[]')
                     weeks = json.loads(weeks_str) if weeks_str else None
-                except:
+                except ValueError:
                     weeks = None
 
-                entry_id = _db.add_schedule_entry(
-                    course_id=course_id,
-                    day_of_week=int(row.get('day_of_week', 1)),
-                    start_time=row.get('start_time'),
-                    end_time=row.get('end_time'),
-                    weeks=weeks,
-                    note=row.get('note')
-                )
-                if entry_id > 0:
-                    schedule_imported += 1
-
-            return ImportDataResponse(
-                success=True,
-                message=f"成功导入 {courses_imported} 门课程和 {schedule_imported} 条课程表",
-                courses_imported=courses_imported,
-                schedule_imported=schedule_imported
-            )
+                entries.append({
+                    'course_ref': course_name,
+                    'day_of_week': row.get('day_of_week') or 1,
+                    'start_time': row.get('start_time'),
+                    'end_time': row.get('end_time'),
+                    'weeks': weeks,
+                    'note': row.get('note')
+                })
 
         else:
             return ImportDataResponse(
@@ -1009,11 +1072,25 @@ async def import_schedule_data(body: ImportDataRequest) -> ImportDataResponse:
                 message=f"不支持的导入格式: {body.format}"
             )
 
+        result = _db.bulk_import(courses, entries, body.replace_existing)
+        courses_imported = result['courses_imported']
+        schedule_imported = result['schedule_imported']
+
+        message = f"成功导入 {courses_imported} 门课程和 {schedule_imported} 条课程表"
+        if result['conflicts']:
+            message += f"（检测到 {len(result['conflicts'])} 处时间冲突）"
+
+        return ImportDataResponse(
+            success=True,
+            message=message,
+            courses_imported=courses_imported,
+            schedule_imported=schedule_imported,
+            conflicts=len(result['conflicts'])
+        )
+
     except Exception as e:
         _logger.log_message("error", f"Failed to import data: {e}")
         return ImportDataResponse(
             success=False,
             message=f"导入失败: {str(e)}"
         )
-
-
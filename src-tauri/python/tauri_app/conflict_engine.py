@@ -0,0 +1,193 @@
+"""
+Schedule conflict detection engine for ClassTop application.
+Indexes schedule entries as integer minute intervals per (day, week) and
+answers overlap queries in logarithmic time.
+"""
+
+import heapq
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+# Bucket key used for entries that apply to every week
+ALL_WEEKS = None
+
+
+def to_minutes(time_str: str) -> int:
+    """Convert 'HH:MM' to minutes since midnight."""
+    hour, minute = time_str.split(":")
+    return int(hour) * 60 + int(minute)
+
+
+class IntervalIndex:
+    """Static interval tree over half-open [start, end) intervals.
+
+    Intervals are sorted by start and laid out as an implicit balanced binary
+    tree (the midpoint of every range is its root). Each node stores the
+    largest end in its subtree, so a query only descends into subtrees that
+    can still overlap, giving O(log n + k) lookups.
+    """
+
+    __slots__ = ("_starts", "_ends", "_items", "_max_end")
+
+    def __init__(self, intervals: Iterable[Tuple[int, int, object]]):
+        ordered = sorted(intervals, key=lambda iv: (iv[0], iv[1]))
+        self._starts = [iv[0] for iv in ordered]
+        self._ends = [iv[1] for iv in ordered]
+        self._items = [iv[2] for iv in ordered]
+        self._max_end = [0] * len(ordered)
+        self._build(0, len(ordered))
+
+    def _build(self, lo: int, hi: int) -> int:
+        if lo >= hi:
+            return -1
+        mid = (lo + hi) // 2
+        self._max_end[mid] = max(self._ends[mid], self._build(lo, mid), self._build(mid + 1, hi))
+        return self._max_end[mid]
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def overlapping(self, start: int, end: int) -> List[object]:
+        """Items whose interval overlaps [start, end), in start order."""
+        # Only intervals starting before `end` can overlap
+        limit = bisect_left(self._starts, end)
+        found = []
+        stack = [(0, len(self._items))]
+        while stack:
+            lo, hi = stack.pop()
+            if lo >= hi or lo >= limit:
+                continue
+            mid = (lo + hi) // 2
+            if self._max_end[mid] <= start:
+                continue  # nothing in this subtree ends after `start`
+            if mid < limit:
+                if self._ends[mid] > start:
+                    found.append(mid)
+                stack.append((mid + 1, hi))
+            stack.append((lo, mid))
+        found.sort()
+        return [self._items[i] for i in found]
+
+
+def _conflict_record(entry: Mapping, conflict_weeks: Sequence[int]) -> Dict:
+    return {
+        "id": entry["id"],
+        "course_name": entry.get("course_name"),
+        "teacher": entry.get("teacher"),
+        "location": entry.get("location"),
+        "start_time": entry["start_time"],
+        "end_time": entry["end_time"],
+        "day_of_week": entry["day_of_week"],
+        "weeks": list(entry["weeks"]),
+        "conflict_weeks": list(conflict_weeks),
+    }
+
+
+class ConflictEngine:
+    """Conflict queries over a fixed set of schedule entries.
+
+    Entries are mappings with at least id, day_of_week, start_time, end_time
+    and weeks (an empty weeks list means every week), e.g. the records of a
+    ScheduleSnapshot.
+    """
+
+    def __init__(self, entries: Iterable[Mapping]):
+        self.entries: List[Mapping] = list(entries)
+        buckets: Dict[Tuple[int, Optional[int]], List[Tuple[int, int, Mapping]]] = {}
+        by_day: Dict[int, List[Tuple[int, int, Mapping]]] = {}
+
+        for entry in self.entries:
+            interval = (to_minutes(entry["start_time"]), to_minutes(entry["end_time"]), entry)
+            day = entry["day_of_week"]
+            by_day.setdefault(day, []).append(interval)
+            if entry["weeks"]:
+                for week in set(entry["weeks"]):
+                    buckets.setdefault((day, week), []).append(interval)
+            else:
+                buckets.setdefault((day, ALL_WEEKS), []).append(interval)
+
+        self._buckets = {key: IntervalIndex(ivs) for key, ivs in buckets.items()}
+        self._days = {day: IntervalIndex(ivs) for day, ivs in by_day.items()}
+
+    def find_conflicts(self, day_of_week: int, start_time: str, end_time: str,
+                       weeks: Optional[List[int]] = None,
+                       exclude_entry_id: Optional[int] = None) -> List[Dict]:
+        """Entries overlapping [start_time, end_time) on a day in any of `weeks`.
+
+        Returns conflict records (entry fields plus conflict_weeks) ordered by
+        start time. When either side has no week restriction the conflict
+        covers the other side's weeks; when neither does, conflict_weeks is [1].
+        """
+        start, end = to_minutes(start_time), to_minutes(end_time)
+        matched: Dict[int, Tuple[Mapping, List[int]]] = {}
+
+        if weeks:
+            wanted = sorted(set(weeks))
+            index = self._buckets.get((day_of_week, ALL_WEEKS))
+            if index:
+                for entry in index.overlapping(start, end):
+                    matched[entry["id"]] = (entry, wanted)
+            for week in wanted:
+                index = self._buckets.get((day_of_week, week))
+                if not index:
+                    continue
+                for entry in index.overlapping(start, end):
+                    matched.setdefault(entry["id"], (entry, []))[1].append(week)
+        else:
+            index = self._days.get(day_of_week)
+            if index:
+                for entry in index.overlapping(start, end):
+                    matched[entry["id"]] = (entry, sorted(set(entry["weeks"])) or [1])
+
+        matched.pop(exclude_entry_id, None)
+        ordered = sorted(matched.values(), key=lambda m: (to_minutes(m[0]["start_time"]), m[0]["id"]))
+        return [_conflict_record(entry, conflict_weeks) for entry, conflict_weeks in ordered]
+
+    def has_conflict(self, day_of_week: int, start_time: str, end_time: str,
+                     weeks: Optional[List[int]] = None) -> bool:
+        """Whether any entry conflicts with the given slot."""
+        return bool(self.find_conflicts(day_of_week, start_time, end_time, weeks))
+
+    def report(self) -> List[Dict]:
+        """Every conflicting pair in the timetable, found with one sweep per day.
+
+        Each item holds the day, both entries (as conflict records) and the
+        weeks they clash in; all_weeks is True when neither entry is
+        restricted to specific weeks.
+        """
+        return conflict_report(self.entries)
+
+
+def conflict_report(entries: Iterable[Mapping]) -> List[Dict]:
+    """Sweep-line conflict report over arbitrary schedule entries."""
+    by_day: Dict[int, List[Tuple[int, int, int, Mapping]]] = {}
+    for order, entry in enumerate(entries):
+        by_day.setdefault(entry["day_of_week"], []).append(
+            (to_minutes(entry["start_time"]), to_minutes(entry["end_time"]), order, entry)
+        )
+
+    report = []
+    for day in sorted(by_day):
+        active: List[Tuple[int, int, Mapping, frozenset]] = []  # min-heap on end time
+        for start, end, order, entry in sorted(by_day[day], key=lambda iv: iv[:3]):
+            while active and active[0][0] <= start:
+                heapq.heappop(active)
+
+            weeks = frozenset(entry["weeks"])
+            for _, _, other, other_weeks in active:
+                if weeks and other_weeks:
+                    shared = weeks & other_weeks
+                    if not shared:
+                        continue
+                    conflict_weeks = sorted(shared)
+                else:
+                    conflict_weeks = sorted(weeks or other_weeks)
+                report.append({
+                    "day_of_week": day,
+                    "first": _conflict_record(other, conflict_weeks),
+                    "second": _conflict_record(entry, conflict_weeks),
+                    "conflict_weeks": conflict_weeks,
+                    "all_weeks": not weeks and not other_weeks,
+                })
+            heapq.heappush(active, (end, order, entry, weeks))
+    return report
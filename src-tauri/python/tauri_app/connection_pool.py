@@ -0,0 +1,143 @@
+"""
+SQLite connection pool for ClassTop application.
+Hands out one persistent connection per thread so managers stop paying the
+connect/PRAGMA cost on every query.
+"""
+
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+
+from . import logger
+
+
+class ConnectionPool:
+    """Per-thread reusable SQLite connections for a single database file.
+
+    Every connection is configured once when it is opened (WAL journal,
+    foreign keys, busy timeout) and keeps sqlite3's prepared statement cache
+    alive between calls, so repeated queries skip both the connect and the
+    SQL compilation step.
+    """
+
+    # Number of compiled statements kept per connection (sqlite3 LRU cache)
+    STATEMENT_CACHE_SIZE = 256
+    # How long a writer waits for a lock held by another connection
+    BUSY_TIMEOUT_SECONDS = 5.0
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections: Dict[int, sqlite3.Connection] = {}
+
+    def _open(self) -> sqlite3.Connection:
+        """Open and configure a new connection."""
+        # check_same_thread is disabled so close_all() can close connections
+        # owned by other threads; the pool itself never shares a connection.
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self.BUSY_TIMEOUT_SECONDS,
+            cached_statements=self.STATEMENT_CACHE_SIZE,
+            check_same_thread=False,
+        )
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+        return conn
+
+    def open_dedicated(self) -> sqlite3.Connection:
+        """Open a configured connection owned by the caller, outside the pool.
+
+        Meant for long-lived work such as streaming a cursor across threads;
+        the caller is responsible for closing it.
+        """
+        return self._open()
+
+    def _prune_dead_threads(self) -> None:
+        """Close connections whose owning thread has exited."""
+        alive = {t.ident for t in threading.enumerate()}
+        with self._lock:
+            dead = [ident for ident in self._connections if ident not in alive]
+            for ident in dead:
+                try:
+                    self._connections.pop(ident).close()
+                except Exception:
+                    pass
+
+    def acquire(self) -> sqlite3.Connection:
+        """Return the calling thread's connection, opening it on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            self._prune_dead_threads()
+            conn = self._open()
+            self._local.conn = conn
+            self._local.depth = 0
+            with self._lock:
+                self._connections[threading.get_ident()] = conn
+            logger.log_message("debug", f"Pooled connection opened: {self.db_path}")
+        return conn
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """Context manager yielding the thread's pooled connection.
+
+        The connection is not closed on exit. Work that was not committed by
+        the outermost block is rolled back, matching the old behaviour of
+        closing a connection without committing.
+        """
+        conn = self.acquire()
+        self._local.depth += 1
+        try:
+            yield conn
+        finally:
+            self._local.depth -= 1
+            if self._local.depth == 0 and conn.in_transaction:
+                conn.rollback()
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """Run the block in a single transaction, committing on success."""
+        with self.connection() as conn:
+            try:
+                yield conn
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+
+    def close_all(self) -> None:
+        """Close every connection held by the pool."""
+        with self._lock:
+            for conn in self._connections.values():
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+            self._connections.clear()
+        self._local = threading.local()
+        logger.log_message("info", f"Connection pool closed: {self.db_path}")
+
+    @property
+    def size(self) -> int:
+        """Number of open connections."""
+        return len(self._connections)
+
+
+_pools: Dict[str, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(db_path: Path) -> ConnectionPool:
+    """Get the shared pool for a database file, creating it if needed."""
+    key = str(Path(db_path).resolve())
+    pool: Optional[ConnectionPool] = _pools.get(key)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(key)
+            if pool is None:
+                pool = ConnectionPool(db_path)
+                _pools[key] = pool
+    return pool
@@ -0,0 +1,220 @@
+"""
+Streaming data export for ClassTop application.
+Produces JSON, NDJSON and CSV exports chunk by chunk straight from a database
+cursor, so memory stays flat regardless of timetable size.
+"""
+
+import csv
+import io
+import json
+from pathlib import Path
+from typing import Iterator, List, Tuple
+
+from .connection_pool import get_pool
+from . import logger
+
+EXPORT_FORMATS = ("json", "ndjson", "csv")
+
+MEDIA_TYPES = {
+    "json": "application/json",
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+# Largest export returned as a string; bigger exports have to go to a file
+MAX_INLINE_CHARS = 5 * 1024 * 1024
+
+# Settings never included in an export
+SENSITIVE_SETTINGS = ("client_uuid", "server_url", "api_server_enabled")
+
+CSV_HEADER = [
+    'course_id', 'course_name', 'teacher', 'location', 'color',
+    'day_of_week', 'start_time', 'end_time', 'weeks', 'note'
+]
+
+_COURSE_QUERY = "SELECT id, name, teacher, location, color FROM courses ORDER BY id"
+
+_SCHEDULE_QUERY = """
+    SELECT s.id, s.course_id, c.name, c.teacher, c.location, c.color,
+           s.day_of_week, s.start_time, s.end_time,
+           (SELECT group_concat(sw.week) FROM schedule_weeks sw WHERE sw.entry_id = s.id),
+           s.note
+    FROM schedule s
+    JOIN courses c ON s.course_id = c.id
+    ORDER BY s.day_of_week, s.start_time, s.id
+"""
+
+_SETTINGS_QUERY = "SELECT key, value FROM settings WHERE key NOT IN ({}) ORDER BY key".format(
+    ", ".join("?" * len(SENSITIVE_SETTINGS))
+)
+
+
+def _dumps(obj) -> str:
+    return json.dumps(obj, ensure_ascii=False)
+
+
+def _course(row: Tuple) -> dict:
+    return {"id": row[0], "name": row[1], "teacher": row[2], "location": row[3], "color": row[4]}
+
+
+def _schedule_entry(row: Tuple) -> dict:
+    return {
+        "id": row[0],
+        "course_id": row[1],
+        "course_name": row[2],
+        "teacher": row[3],
+        "location": row[4],
+        "color": row[5],
+        "day_of_week": row[6],
+        "start_time": row[7],
+        "end_time": row[8],
+        "weeks": sorted(int(w) for w in row[9].split(",")) if row[9] else [],
+        "note": row[10],
+    }
+
+
+class DataExporter:
+    """Streams export documents from the database.
+
+    Each export opens its own connection (closed when the generator finishes
+    or is discarded), so a generator may be consumed from any thread, e.g. by
+    a Starlette StreamingResponse running it in a worker pool.
+    """
+
+    def __init__(self, db_path: Path, chunk_rows: int = 256):
+        self.db_path = db_path
+        self.chunk_rows = chunk_rows
+        self.logger = logger
+
+    def _rows(self, conn, query: str, params: Tuple = ()) -> Iterator[List[Tuple]]:
+        """Yield query results in chunks of chunk_rows."""
+        cur = conn.cursor()
+        cur.execute(query, params)
+        while True:
+            rows = cur.fetchmany(self.chunk_rows)
+            if not rows:
+                break
+            yield rows
+
+    def iter_export(self, fmt: str, include_courses: bool = True,
+                    include_schedule: bool = True,
+                    include_settings: bool = False) -> Iterator[str]:
+        """Yield the export document in text chunks.
+
+        Raises:
+            ValueError: if fmt is not one of EXPORT_FORMATS
+        """
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Unsupported export format: {fmt}")
+
+        conn = get_pool(self.db_path).open_dedicated()
+        try:
+            if fmt == "json":
+                yield from self._iter_json(conn, include_courses, include_schedule, include_settings)
+            elif fmt == "ndjson":
+                yield from self._iter_ndjson(conn, include_courses, include_schedule, include_settings)
+            else:
+                yield from self._iter_csv(conn, include_schedule)
+        finally:
+            conn.close()
+
+    def _iter_json(self, conn, include_courses: bool, include_schedule: bool,
+                   include_settings: bool) -> Iterator[str]:
+        sections = []
+        if include_courses:
+            sections.append(("courses", _COURSE_QUERY, (), _course))
+        if include_schedule:
+            sections.append(("schedule", _SCHEDULE_QUERY, (), _schedule_entry))
+
+        yield "{"
+        first_section = True
+        for name, query, params, to_record in sections:
+            yield ("\n" if first_section else ",\n") + f'  "{name}": ['
+            first_section = False
+            first_row = True
+            for rows in self._rows(conn, query, params):
+                chunk = ",".join("\n    " + _dumps(to_record(row)) for row in rows)
+                yield chunk if first_row else "," + chunk
+                first_row = False
+            yield "\n  ]" if not first_row else "]"
+
+        if include_settings:
+            yield ("\n" if first_section else ",\n") + '  "settings": {'
+            first_row = True
+            for rows in self._rows(conn, _SETTINGS_QUERY, SENSITIVE_SETTINGS):
+                chunk = ",".join(f"\n    {_dumps(key)}: {_dumps(value)}" for key, value in rows)
+                yield chunk if first_row else "," + chunk
+                first_row = False
+            yield "\n  }" if not first_row else "}"
+        yield "\n}\n"
+
+    def _iter_ndjson(self, conn, include_courses: bool, include_schedule: bool,
+                     include_settings: bool) -> Iterator[str]:
+        # One self-describing record per line: {"type": ..., "data": ...}
+        if include_courses:
+            for rows in self._rows(conn, _COURSE_QUERY):
+                yield "".join(_dumps({"type": "course", "data": _course(row)}) + "\n" for row in rows)
+        if include_schedule:
+            for rows in self._rows(conn, _SCHEDULE_QUERY):
+                yield "".join(_dumps({"type": "schedule", "data": _schedule_entry(row)}) + "\n"
+                              for row in rows)
+        if include_settings:
+            for rows in self._rows(conn, _SETTINGS_QUERY, SENSITIVE_SETTINGS):
+                yield "".join(_dumps({"type": "setting", "data": {"key": k, "value": v}}) + "\n"
+                              for k, v in rows)
+
+    def _iter_csv(self, conn, include_schedule: bool) -> Iterator[str]:
+        # CSV carries schedule entries only
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(CSV_HEADER)
+        yield buffer.getvalue()
+
+        if not include_schedule:
+            return
+        for rows in self._rows(conn, _SCHEDULE_QUERY):
+            buffer.seek(0)
+            buffer.truncate()
+            for row in rows:
+                entry = _schedule_entry(row)
+                writer.writerow([
+                    entry['course_id'],
+                    entry['course_name'],
+                    entry['teacher'] or '',
+                    entry['location'] or '',
+                    entry['color'] or '',
+                    entry['day_of_week'],
+                    entry['start_time'],
+                    entry['end_time'],
+                    json.dumps(entry['weeks']),
+                    entry['note'] or ''
+                ])
+            yield buffer.getvalue()
+
+    def export_to_file(self, path: Path, fmt: str, include_courses: bool = True,
+                       include_schedule: bool = True, include_settings: bool = False) -> int:
+        """Stream an export into a file and return the number of characters written."""
+        written = 0
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            for chunk in self.iter_export(fmt, include_courses, include_schedule, include_settings):
+                f.write(chunk)
+                written += len(chunk)
+        self.logger.log_message("info", f"Exported {fmt} data to {path} ({written} chars)")
+        return written
+
+    def export_to_string(self, fmt: str, include_courses: bool = True,
+                         include_schedule: bool = True, include_settings: bool = False,
+                         max_chars: int = MAX_INLINE_CHARS) -> str:
+        """Collect an export into a string of at most `max_chars` characters.
+
+        Raises:
+            ValueError: if the export is larger than max_chars (use export_to_file)
+        """
+        chunks: List[str] = []
+        size = 0
+        for chunk in self.iter_export(fmt, include_courses, include_schedule, include_settings):
+            size += len(chunk)
+            if size > max_chars:
+                raise ValueError(f"Export is larger than {max_chars} characters, write it to a file instead")
+            chunks.append(chunk)
+        return "".join(chunks)
@@ -1,7 +1,9 @@
-import sqlite3
+import json
 from pathlib import Path
 from typing import Optional, Dict, List
 from . import logger
+from .connection_pool import get_pool
+from .week_calendar import SETTING_KEYS, WeekCalendar
 
 # Store DB in user home directory under .classtop
 APP_DIR = Path.home() / ".classtop"
@@ -13,75 +15,153 @@ schedule_manager = None
 settings_manager = None
 camera_manager = None
 audio_manager = None
+reminder_manager = None
+service_supervisor = None
 
 
-def init_db() -> None:
+def init_db(db_path: Path = DB_PATH) -> None:
     """Initialize database and create tables."""
     logger.log_message("info", "Initializing database")
 
-    conn = sqlite3.connect(DB_PATH)
-    try:
-        cur = conn.cursor()
-
-        # Settings table
-        cur.execute(
-            """
-            CREATE TABLE IF NOT EXISTS settings (
-                key TEXT PRIMARY KEY,
-                value TEXT
+    with get_pool(db_path).connection() as conn:
+        try:
+            cur = conn.cursor()
+
+            # Settings table
+            cur.execute(
+                """
+                CREATE TABLE IF NOT EXISTS settings (
+                    key TEXT PRIMARY KEY,
+                    value TEXT
+                )
+                """
+            )
+            logger.log_message("debug", "Settings table ready")
+
+            # Courses table - stores course information
+            cur.execute(
+                """
+                CREATE TABLE IF NOT EXISTS courses (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    name TEXT NOT NULL,
+                    teacher TEXT,
+                    location TEXT,
+                    color TEXT,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+                """
+            )
+            logger.log_message("debug", "Courses table ready")
+
+            # Schedule table - stores weekly schedule
+            cur.execute(
+                """
+                CREATE TABLE IF NOT EXISTS schedule (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    course_id INTEGER NOT NULL,
+                    day_of_week INTEGER NOT NULL CHECK (day_of_week >= 1 AND day_of_week <= 7),
+                    start_time TEXT NOT NULL,
+                    end_time TEXT NOT NULL,
+                    weeks TEXT,  -- JSON array of week numbers
+                    note TEXT,
+                    FOREIGN KEY (course_id) REFERENCES courses(id) ON DELETE CASCADE
+                )
+                """
+            )
+            logger.log_message("debug", "Schedule table ready")
+
+            # Schedule weeks table - normalized week membership of schedule entries.
+            # Entries without rows here apply to every week.
+            cur.execute(
+                """
+                CREATE TABLE IF NOT EXISTS schedule_weeks (
+                    entry_id INTEGER NOT NULL,
+                    week INTEGER NOT NULL,
+                    PRIMARY KEY (entry_id, week),
+                    FOREIGN KEY (entry_id) REFERENCES schedule(id) ON DELETE CASCADE
+                ) WITHOUT ROWID
+                """
+            )
+            cur.execute("CREATE INDEX IF NOT EXISTS idx_schedule_weeks_week ON schedule_weeks(week, entry_id)")
+            cur.execute("CREATE INDEX IF NOT EXISTS idx_schedule_day ON schedule(day_of_week, start_time)")
+            _backfill_schedule_weeks(cur)
+            logger.log_message("debug", "Schedule weeks table ready")
+
+            # Per-course reminder plans; courses without a row follow the reminder_* settings
+            cur.execute(
+                """
+                CREATE TABLE IF NOT EXISTS course_reminders (
+                    course_id INTEGER PRIMARY KEY,
+                    enabled INTEGER NOT NULL DEFAULT 1,
+                    offsets TEXT,  -- comma-separated minutes before class, NULL = settings
+                    end_notice INTEGER,  -- NULL = settings
+                    FOREIGN KEY (course_id) REFERENCES courses(id) ON DELETE CASCADE
+                )
+                """
             )
-            """
-        )
-        logger.log_message("debug", "Settings table ready")
-
-        # Courses table - stores course information
-        cur.execute(
-            """
-            CREATE TABLE IF NOT EXISTS courses (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL,
-                teacher TEXT,
-                location TEXT,
-                color TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+
+            # Delivered reminders, so restarts don't send them again. Keyed by date
+            # first so expired rows are removed with a single range delete.
+            cur.execute(
+                """
+                CREATE TABLE IF NOT EXISTS reminder_deliveries (
+                    date TEXT NOT NULL,  -- YYYY-MM-DD
+                    entry_id INTEGER NOT NULL,
+                    offset_minutes INTEGER NOT NULL,  -- minutes before start, -1 = end of class
+                    PRIMARY KEY (date, entry_id, offset_minutes)
+                ) WITHOUT ROWID
+                """
             )
-            """
-        )
-        logger.log_message("debug", "Courses table ready")
-
-        # Schedule table - stores weekly schedule
-        cur.execute(
-            """
-            CREATE TABLE IF NOT EXISTS schedule (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                course_id INTEGER NOT NULL,
-                day_of_week INTEGER NOT NULL CHECK (day_of_week >= 1 AND day_of_week <= 7),
-                start_time TEXT NOT NULL,
-                end_time TEXT NOT NULL,
-                weeks TEXT,  -- JSON array of week numbers
-                note TEXT,
-                FOREIGN KEY (course_id) REFERENCES courses(id) ON DELETE CASCADE
+            logger.log_message("debug", "Reminder tables ready")
+
+            # Current week settings with semester start date
+            cur.execute(
+                """
+                INSERT OR IGNORE INTO settings(key, value)
+                VALUES('current_week', '1'), ('total_weeks', '20'), ('semester_start_date', '')
+                """
             )
-            """
-        )
-        logger.log_message("debug", "Schedule table ready")
 
-        # Current week settings with semester start date
-        cur.execute(
-            """
-            INSERT OR IGNORE INTO settings(key, value)
-            VALUES('current_week', '1'), ('total_weeks', '20'), ('semester_start_date', '')
-            """
-        )
+            conn.commit()
+            logger.log_message("info", "Database initialized successfully")
+
+        except Exception as e:
+            logger.log_message("error", f"Error initializing database: {e}")
+            raise
+
+
+def _backfill_schedule_weeks(cur) -> None:
+    """Populate schedule_weeks from the JSON weeks column for entries missing rows.
+
+    Covers databases created before the table existed as well as entries
+    written by older builds that only maintained the JSON column.
+    """
+    cur.execute(
+        """
+        SELECT id, weeks FROM schedule
+        WHERE weeks IS NOT NULL AND weeks != '[]'
+          AND NOT EXISTS (SELECT 1 FROM schedule_weeks sw WHERE sw.entry_id = schedule.id)
+        """
+    )
+    rows = []
+    for entry_id, weeks_json in cur.fetchall():
+        try:
+            weeks = json.loads(weeks_json)
+            if not isinstance(weeks, list):
+                raise TypeError("not a list")
+            week_numbers = {int(week) for week in weeks}
+        except (TypeError, ValueError):
+            logger.log_message("warning", f"Invalid weeks JSON for schedule entry {entry_id}: {weeks_json}")
+            continue
+        rows.extend((entry_id, week) for week in week_numbers)
+
+    if rows:
+        cur.executemany("INSERT OR IGNORE INTO schedule_weeks(entry_id, week) VALUES(?, ?)", rows)
+        logger.log_message("info", f"Backfilled {len(rows)} schedule week rows")
 
-        conn.commit()
-        logger.log_message("info", "Database initialized successfully")
 
-    except Exception as e:
-        logger.log_message("error", f"Error initializing database: {e}")
-        raise
-    finally:
-        conn.close()
+# Semester week calendar, re-read whenever a semester setting changes
+week_calendar = WeekCalendar(lambda key: get_config(key))
 
 
 def set_schedule_manager(manager) -> None:
@@ -95,9 +175,21 @@ def set_settings_manager(manager) -> None:
     """Set the global settings manager instance."""
     global settings_manager
     settings_manager = manager
+    week_calendar.invalidate()
+    manager.subscribe(SETTING_KEYS, lambda changes: week_calendar.invalidate())
+    _apply_log_level(manager.get_setting('log_level'))
+    manager.subscribe(('log_level',), lambda changes: _apply_log_level(changes['log_level']))
     logger.log_message("info", "Settings manager instance set")
 
 
+def _apply_log_level(level: Optional[str]) -> None:
+    """Make the log_level setting the logger's minimum level."""
+    try:
+        logger.set_min_level(level or 'DEBUG')
+    except ValueError as e:
+        logger.log_message("warning", f"Invalid log_level setting: {e}")
+
+
 def set_camera_manager(manager) -> None:
     """Set the global camera manager instance."""
     global camera_manager
@@ -112,6 +204,27 @@ def set_audio_manager(manager) -> None:
     logger.log_message("info", "Audio manager instance set")
 
 
+def set_reminder_manager(manager) -> None:
+    """Set the global reminder manager instance."""
+    global reminder_manager
+    reminder_manager = manager
+    logger.log_message("info", "Reminder manager instance set")
+
+
+def set_service_supervisor(supervisor) -> None:
+    """Set the global service supervisor instance."""
+    global service_supervisor
+    service_supervisor = supervisor
+    logger.log_message("info", "Service supervisor instance set")
+
+
+def get_services_health() -> Dict[str, Dict]:
+    """Health report of supervised background services."""
+    if service_supervisor is None:
+        return {}
+    return service_supervisor.health()
+
+
 # Configuration management functions - delegated to settings manager
 def set_config(key: str, value: str) -> None:
     """Set a configuration value."""
@@ -121,19 +234,18 @@ def set_config(key: str, value: str) -> None:
     else:
         # Fallback to direct database access if manager not initialized
         logger.log_message("warning", "Settings manager not initialized, using direct DB access")
-        conn = sqlite3.connect(DB_PATH)
-        try:
-            cur = conn.cursor()
-            cur.execute(
-                "INSERT INTO settings(key, value) VALUES(?, ?) ON CONFLICT(key) DO UPDATE SET value=excluded.value",
-                (key, value),
-            )
-            conn.commit()
-            logger.log_message("info", f"Config set: {key} = {value}")
-        except Exception as e:
-            logger.log_message("error", f"Error setting config for key '{key}': {e}")
-        finally:
-            conn.close()
+        with get_pool(DB_PATH).connection() as conn:
+            try:
+                cur = conn.cursor()
+                cur.execute(
+                    "INSERT INTO settings(key, value) VALUES(?, ?) ON CONFLICT(key) DO UPDATE SET value=excluded.value",
+                    (key, value),
+                )
+                conn.commit()
+                week_calendar.on_settings_changed([key])
+                logger.log_message("info", f"Config set: {key} = {value}")
+            except Exception as e:
+                logger.log_message("error", f"Error setting config for key '{key}': {e}")
 
 
 def get_config(key: str) -> Optional[str]:
@@ -144,37 +256,33 @@ def get_config(key: str) -> Optional[str]:
     else:
         # Fallback to direct database access
         logger.log_message("warning", "Settings manager not initialized, using direct DB access")
-        conn = sqlite3.connect(DB_PATH)
-        try:
-            cur = conn.cursor()
-            cur.execute("SELECT value FROM settings WHERE key=?", (key,))
-            row = cur.fetchone()
-            return row[0] if row else None
-        except Exception as e:
-            logger.log_message("error", f"Error getting config for key '{key}': {e}")
-            return None
-        finally:
-            conn.close()
+        with get_pool(DB_PATH).connection() as conn:
+            try:
+                cur = conn.cursor()
+                cur.execute("SELECT value FROM settings WHERE key=?", (key,))
+                row = cur.fetchone()
+                return row[0] if row else None
+            except Exception as e:
+                logger.log_message("error", f"Error getting config for key '{key}': {e}")
+                return None
 
 
 def list_configs() -> Dict[str, str]:
     """List all configuration values."""
     global settings_manager
     if settings_manager:
-        return settings_manager.get_all_settings()
+        return dict(settings_manager.get_all_settings())
     else:
         # Fallback to direct database access
         logger.log_message("warning", "Settings manager not initialized, using direct DB access")
-        conn = sqlite3.connect(DB_PATH)
-        try:
-            cur = conn.cursor()
-            cur.execute("SELECT key, value FROM settings")
-            return {k: v for k, v in cur.fetchall()}
-        except Exception as e:
-            logger.log_message("error", f"Error listing configs: {e}")
-            return {}
-        finally:
-            conn.close()
+        with get_pool(DB_PATH).connection() as conn:
+            try:
+                cur = conn.cursor()
+                cur.execute("SELECT key, value FROM settings")
+                return {k: v for k, v in cur.fetchall()}
+            except Exception as e:
+                logger.log_message("error", f"Error listing configs: {e}")
+                return {}
 
 
 # Course management functions - delegated to schedule manager
@@ -226,6 +334,15 @@ def add_schedule_entry(course_id: int, day_of_week: int, start_time: str, end_ti
     return schedule_manager.add_schedule_entry(course_id, day_of_week, start_time, end_time, weeks, note)
 
 
+def bulk_import(courses: List[Dict], entries: List[Dict], replace_existing: bool = False) -> Dict:
+    """Import courses and schedule entries in one transaction."""
+    global schedule_manager
+    if not schedule_manager:
+        logger.log_message("error", "Schedule manager not initialized")
+        return {"courses_imported": 0, "schedule_imported": 0, "skipped": len(entries), "conflicts": []}
+    return schedule_manager.bulk_import(courses, entries, replace_existing)
+
+
 def get_schedule(week: Optional[int] = None) -> List[Dict]:
     """Get schedule for a specific week or all schedules."""
     global schedule_manager
@@ -246,19 +363,19 @@ def delete_schedule_entry(entry_id: int) -> bool:
 
 def get_calculated_week_number() -> int:
     """Get current week number, either from manual setting or calculated from semester start."""
-    # First check if semester start date is configured
-    semester_start = get_config("semester_start_date")
+    return week_calendar.week_of()
 
-    if semester_start and semester_start.strip():
-        # Calculate week from semester start date
-        global schedule_manager
-        if schedule_manager:
-            week_num = schedule_manager.calculate_week_number(semester_start)
-            return week_num
 
-    # Fall back to manually set current week
-    current_week = get_config("current_week")
-    return int(current_week) if current_week else 1
+def get_week_numbers(start_date: str, end_date: str, strict: bool = False) -> Dict[str, Optional[int]]:
+    """Get the week number of every date in a range, keyed by 'YYYY-MM-DD'.
+
+    Raises:
+        ValueError: on malformed dates, end before start, or a range longer
+            than week_calendar.MAX_RANGE_DAYS
+    """
+    from datetime import date
+    start, end = date.fromisoformat(start_date), date.fromisoformat(end_date)
+    return {day.isoformat(): week for day, week in week_calendar.weeks_between(start, end, strict).items()}
 
 
 def get_schedule_by_day(day_of_week: int, week: Optional[int] = None) -> List[Dict]:
@@ -281,6 +398,24 @@ def get_schedule_for_week(week: Optional[int] = None) -> List[Dict]:
     return schedule_manager.get_schedule_for_week(week)
 
 
+def get_schedule_for_week_grouped(week: Optional[int] = None) -> Dict[int, List[Dict]]:
+    """Get all classes for the entire week grouped by day of week."""
+    global schedule_manager
+    if not schedule_manager:
+        logger.log_message("error", "Schedule manager not initialized")
+        return {}
+
+    return schedule_manager.get_schedule_for_week_grouped(week)
+
+
+def _timeline_now():
+    """Current week's timeline plus today's day of week and minute of day."""
+    from datetime import datetime
+    now = datetime.now()
+    timeline = schedule_manager.get_timeline(get_calculated_week_number())
+    return timeline, now.isoweekday(), now.hour * 60 + now.minute
+
+
 def get_current_class() -> Optional[Dict]:
     """
     DEPRECATED: Use get_schedule_by_day() and calculate on frontend.
@@ -291,17 +426,8 @@ def get_current_class() -> Optional[Dict]:
         logger.log_message("error", "Schedule manager not initialized")
         return None
 
-    from datetime import datetime
-    now = datetime.now()
-    day_of_week = now.isoweekday()
-    current_time = now.strftime("%H:%M")
-    week_num = get_calculated_week_number()
-
-    classes = schedule_manager.get_schedule_by_day(day_of_week, week_num)
-    for cls in classes:
-        if cls["start_time"] <= current_time <= cls["end_time"]:
-            return cls
-    return None
+    timeline, day_of_week, minute = _timeline_now()
+    return timeline.current(day_of_week, minute)
 
 
 def get_next_class() -> Optional[Dict]:
@@ -314,23 +440,8 @@ def get_next_class() -> Optional[Dict]:
         logger.log_message("error", "Schedule manager not initialized")
         return None
 
-    from datetime import datetime
-    now = datetime.now()
-    day_of_week = now.isoweekday()
-    current_time = now.strftime("%H:%M")
-    week_num = get_calculated_week_number()
-
-    classes = schedule_manager.get_schedule_by_day(day_of_week, week_num)
-    for cls in classes:
-        if cls["start_time"] > current_time:
-            return cls
-
-    for day_offset in range(1, 8):
-        next_day = ((day_of_week - 1 + day_offset) % 7) + 1
-        classes = schedule_manager.get_schedule_by_day(next_day, week_num)
-        if classes:
-            return classes[0]
-    return None
+    timeline, day_of_week, minute = _timeline_now()
+    return timeline.next(day_of_week, minute)
 
 
 def get_last_class() -> Optional[Dict]:
@@ -343,20 +454,8 @@ def get_last_class() -> Optional[Dict]:
         logger.log_message("error", "Schedule manager not initialized")
         return None
 
-    from datetime import datetime
-    now = datetime.now()
-    day_of_week = now.isoweekday()
-    current_time = now.strftime("%H:%M")
-    week_num = get_calculated_week_number()
-
-    classes = schedule_manager.get_schedule_by_day(day_of_week, week_num)
-    last_class = None
-    for cls in classes:
-        if cls["end_time"] <= current_time:
-            last_class = cls
-        else:
-            break
-    return last_class
+    timeline, day_of_week, minute = _timeline_now()
+    return timeline.last(day_of_week, minute)
 
 
 def get_schedule_statistics() -> Dict:
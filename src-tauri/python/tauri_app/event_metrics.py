@@ -0,0 +1,140 @@
+"""
+Event emission metrics for ClassTop application.
+Counts emitted/dropped/failed events per name and keeps latency histograms,
+so event throughput can be inspected without debug logging.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, List, Optional
+
+# Histogram bucket upper bounds in milliseconds; the last bucket is open-ended
+LATENCY_BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 1000)
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram with count, sum and max."""
+
+    __slots__ = ("buckets", "count", "total_ms", "max_ms")
+
+    def __init__(self):
+        self.buckets: List[int] = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, ms: float) -> None:
+        self.buckets[bisect_left(LATENCY_BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        if ms > self.max_ms:
+            self.max_ms = ms
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        """Upper bound of the bucket holding the given fraction of samples."""
+        if not self.count:
+            return None
+        target = fraction * self.count
+        seen = 0
+        for index, hits in enumerate(self.buckets):
+            seen += hits
+            if seen >= target:
+                return LATENCY_BUCKETS_MS[index] if index < len(LATENCY_BUCKETS_MS) else self.max_ms
+        return self.max_ms
+
+    def to_dict(self) -> Dict:
+        bounds = [f"le_{b}" for b in LATENCY_BUCKETS_MS] + ["le_inf"]
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total_ms / self.count, 3) if self.count else None,
+            "max_ms": round(self.max_ms, 3),
+            "p50_ms": self.percentile(0.5),
+            "p99_ms": self.percentile(0.99),
+            "buckets": dict(zip(bounds, self.buckets)),
+        }
+
+
+class _NameStats:
+    __slots__ = ("queued", "emitted", "dropped", "failed", "portal_fallbacks", "ipc", "queue_wait")
+
+    def __init__(self):
+        self.queued = 0
+        self.emitted = 0
+        self.dropped = 0
+        self.failed = 0
+        self.portal_fallbacks = 0
+        self.ipc = LatencyHistogram()         # time spent in the Tauri emit call
+        self.queue_wait = LatencyHistogram()  # time from enqueue to emit
+
+
+class EmitMetrics:
+    """Thread-safe per-event-name emission statistics."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats: Dict[str, _NameStats] = {}
+        self._started = time.time()
+
+    def _get(self, name: str) -> _NameStats:
+        stats = self._stats.get(name)
+        if stats is None:
+            stats = self._stats[name] = _NameStats()
+        return stats
+
+    def queued(self, name: str) -> None:
+        with self._lock:
+            self._get(name).queued += 1
+
+    def dropped(self, name: str) -> None:
+        with self._lock:
+            self._get(name).dropped += 1
+
+    def failed(self, name: str) -> None:
+        with self._lock:
+            self._get(name).failed += 1
+
+    def portal_fallback(self, name: str) -> None:
+        with self._lock:
+            self._get(name).portal_fallbacks += 1
+
+    def emitted(self, name: str, queue_wait_ms: float, ipc_ms: float) -> None:
+        with self._lock:
+            stats = self._get(name)
+            stats.emitted += 1
+            stats.queue_wait.observe(queue_wait_ms)
+            stats.ipc.observe(ipc_ms)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+            self._started = time.time()
+
+    def snapshot(self, queue_depth: int = 0) -> Dict:
+        """Totals plus per-event breakdown, ready to serialize."""
+        with self._lock:
+            events = {
+                name: {
+                    "queued": s.queued,
+                    "emitted": s.emitted,
+                    "dropped": s.dropped,
+                    "failed": s.failed,
+                    "portal_fallbacks": s.portal_fallbacks,
+                    "ipc_latency": s.ipc.to_dict(),
+                    "queue_latency": s.queue_wait.to_dict(),
+                }
+                for name, s in self._stats.items()
+            }
+            uptime = time.time() - self._started
+
+        totals = {
+            key: sum(e[key] for e in events.values())
+            for key in ("queued", "emitted", "dropped", "failed", "portal_fallbacks")
+        }
+        return {
+            "uptime_seconds": round(uptime, 1),
+            "queue_depth": queue_depth,
+            "emitted_per_second": round(totals["emitted"] / uptime, 3) if uptime > 0 else 0.0,
+            "totals": totals,
+            "events": events,
+        }
@@ -3,13 +3,28 @@ Global event handler for ClassTop application.
 Manages all event emissions to the frontend in a thread-safe manner.
 """
 
-import asyncio
+import json
 import threading
-from typing import Optional, Any, Dict
+import time
+from collections import deque
+from typing import Optional, Any, Dict, List, NamedTuple, Tuple, Union
 from datetime import datetime
 from pydantic import BaseModel
 from pytauri import AppHandle, Emitter
 from . import logger
+from .event_metrics import EmitMetrics
+
+try:
+    import orjson
+except ImportError:  # optional, faster JSON encoder
+    orjson = None
+
+
+def dumps_json(payload: Any) -> str:
+    """Serialize an event payload to compact JSON (orjson when installed)."""
+    if orjson is not None:
+        return orjson.dumps(payload, default=str, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":"), default=str)
 
 
 class ScheduleUpdateEvent(BaseModel):
@@ -17,52 +32,322 @@ class ScheduleUpdateEvent(BaseModel):
     type: str
     payload: Dict[str, Any]
     timestamp: str
+    revision: int = 0
 
 class SettingUpdateEvent(BaseModel):
     """Model for setting updated events."""
     key: str
     value: Any
     timestamp: str
+    revision: int = 0
 
 
 class SettingsBatchUpdateEvent(BaseModel):
     """Model for batch settings update events."""
     updated_keys: list[str]
     timestamp: str
+    values: Dict[str, Any] = {}
+    revision: int = 0
+
+
+# Default buffering window for schedule updates (milliseconds)
+DEFAULT_COALESCE_WINDOW_MS = 30
+
+# Number of recent changes kept for get_changes_since()
+CHANGE_LOG_SIZE = 512
+
+_ENTITY_ACTIONS = ("added", "updated", "deleted")
+
+
+def _entity_key(event_type: str, payload: Dict[str, Any]) -> Optional[Tuple[str, Any]]:
+    """(entity, id) for per-entity events such as course_updated, else None."""
+    entity, _, action = event_type.rpartition("_")
+    if not entity or action not in _ENTITY_ACTIONS or "id" not in payload:
+        return None
+    return entity, payload["id"]
+
+
+def coalesce_schedule_events(events: List[Tuple[str, Dict[str, Any]]]) -> List[Tuple[str, Dict[str, Any]]]:
+    """Merge buffered schedule updates that touch the same entity.
+
+    Updates to one entity collapse into a single event at the position of the
+    first one: added+updated stays an add with the merged fields, repeated
+    updates merge, anything followed by a delete becomes the delete, and an
+    add followed by a delete cancels out. Events without an entity id (e.g.
+    schedule_imported) are kept as they are.
+    """
+    merged: List[Optional[Tuple[str, Dict[str, Any]]]] = []
+    positions: Dict[Tuple[str, Any], int] = {}
+
+    for event_type, payload in events:
+        key = _entity_key(event_type, payload)
+        if key is None or key not in positions:
+            if key is not None:
+                positions[key] = len(merged)
+            merged.append((event_type, payload))
+            continue
+
+        index = positions[key]
+        prev_type, prev_payload = merged[index]
+        prev_action = prev_type.rpartition("_")[2]
+        action = event_type.rpartition("_")[2]
+
+        if action == "deleted":
+            if prev_action == "added":
+                merged[index] = None
+                del positions[key]
+            else:
+                merged[index] = (event_type, payload)
+        elif action == "updated" and prev_action in ("added", "updated"):
+            merged[index] = (prev_type, {**prev_payload, **payload})
+        else:
+            # e.g. re-added after a delete: keep both, in order
+            positions[key] = len(merged)
+            merged.append((event_type, payload))
+
+    return [event for event in merged if event is not None]
+
+
+class _QueuedEvent(NamedTuple):
+    """An event waiting for the emitter thread."""
+    name: str
+    data: Union[BaseModel, str]  # models go through Emitter.emit, strings through emit_str
+    droppable: bool  # may be discarded under backpressure
+    enqueued_at: float  # time.perf_counter() when queued
 
 
 class EventHandler:
-    """Thread-safe event handler for emitting events to the frontend."""
+    """Thread-safe event handler for emitting events to the frontend.
+
+    Producers only append to a bounded in-memory queue; a single emitter
+    thread drains it and performs the Tauri IPC, so no caller ever blocks on
+    the frontend. The queue is lock-based: the size check, eviction, append
+    and the emitter's pops all hold a small lock, so concurrent producers
+    cannot overrun the limit. When the queue is full, droppable events
+    (string/custom notifications) are discarded first, then the oldest
+    event. Schedule updates are not queued one by one: they are merged per
+    entity in a separate buffer that the emitter thread flushes once per
+    window.
+    """
 
     _instance: Optional['EventHandler'] = None
     _app_handle: Optional[AppHandle] = None
     _portal = None  # Async portal for thread-safe operations
+    _coalesce_window = 0.0  # seconds; 0 flushes schedule updates on the next wakeup
+
+    MAX_QUEUE_SIZE = 1024
+    # Only every Nth successful emit / drop is logged; see get_metrics() for totals
+    LOG_SAMPLE_EVERY = 100
 
     def __new__(cls):
         if cls._instance is None:
-            cls._instance = super(EventHandler, cls).__new__(cls)
+            instance = super(EventHandler, cls).__new__(cls)
+            instance._queue = deque()
+            instance._queue_lock = threading.Lock()
+            instance._wakeup = threading.Event()
+            instance._pending = []
+            instance._pending_lock = threading.Lock()
+            instance._flush_deadline = None
+            instance._worker = None
+            instance._stopping = False
+            instance.metrics = EmitMetrics()
+            instance._emit_count = 0
+            instance._drop_count = 0
+            instance._revision = 0
+            instance._revision_lock = threading.Lock()
+            instance._changes = deque(maxlen=CHANGE_LOG_SIZE)
+            cls._instance = instance
         return cls._instance
 
-    def initialize(self, app_handle: AppHandle, portal) -> None:
+    def initialize(self, app_handle: AppHandle, portal,
+                   coalesce_window_ms: float = DEFAULT_COALESCE_WINDOW_MS) -> None:
         """Initialize the event handler with app handle and async portal."""
         self._app_handle = app_handle
         self._portal = portal
+        self.set_coalesce_window(coalesce_window_ms)
+        self._start_worker()
         logger.log_message("info", "Event handler initialized with async portal")
-        
+
+    def set_coalesce_window(self, window_ms: float) -> None:
+        """Set how long schedule updates are buffered before one merged emit (0 disables)."""
+        self._coalesce_window = max(0.0, window_ms) / 1000.0
+        if self._coalesce_window == 0:
+            self.flush_schedule_updates()
+
+    # ---- emitter thread ----
+
+    def _start_worker(self) -> None:
+        if self._worker and self._worker.is_alive():
+            return
+        self._stopping = False
+        self._worker = threading.Thread(target=self._run_worker, name="event-emitter", daemon=True)
+        self._worker.start()
+
+    def shutdown(self, timeout: float = 1.0) -> None:
+        """Flush pending events and stop the emitter thread."""
+        self.flush_schedule_updates()
+        self._stopping = True
+        self._wakeup.set()
+        if self._worker:
+            self._worker.join(timeout)
+            self._worker = None
+
+    def _run_worker(self) -> None:
+        while True:
+            deadline = self._flush_deadline
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            self._wakeup.wait(timeout)
+            self._wakeup.clear()
+
+            deadline = self._flush_deadline
+            if deadline is not None and time.monotonic() >= deadline:
+                self._flush_pending()
+            self._drain()
+
+            if self._stopping:
+                self._flush_pending()
+                self._drain()
+                break
+
+    def _drain(self) -> None:
+        queue = self._queue
+        while True:
+            with self._queue_lock:
+                if not queue:
+                    break
+                event = queue.popleft()
+            self._emit_now(event)
+
+    def _enqueue(self, name: str, data: Union[BaseModel, str], droppable: bool = False) -> None:
+        """Hand an event to the emitter thread without blocking."""
+        queue = self._queue
+        with self._queue_lock:
+            if len(queue) >= self.MAX_QUEUE_SIZE:
+                if droppable:
+                    self._count_drop(name)
+                    return
+                self._evict_one()
+            queue.append(_QueuedEvent(name, data, droppable, time.perf_counter()))
+            self.metrics.queued(name)
+        self._wakeup.set()
+
+    def _count_drop(self, name: str) -> None:
+        self.metrics.dropped(name)
+        self._drop_count += 1
+        if self._drop_count % self.LOG_SAMPLE_EVERY == 1:
+            logger.log_message("warning", f"Event queue full, dropped {self._drop_count} events so far")
+
+    def _evict_one(self) -> None:
+        """Make room in a full queue: the oldest droppable event, else the oldest event.
+
+        Called with ``_queue_lock`` held.
+        """
+        queue = self._queue
+        for event in queue:
+            if event.droppable:
+                queue.remove(event)
+                break
+        else:
+            event = queue.popleft()
+        self._count_drop(event.name)
+
+    def _emit_now(self, event: _QueuedEvent) -> None:
+        """Perform the IPC for one event (emitter thread only)."""
+        event_name, data = event.name, event.data
+        emit = Emitter.emit if isinstance(data, BaseModel) else Emitter.emit_str
+        started = time.perf_counter()
+        try:
+            emit(self._app_handle, event_name, data)
+            finished = time.perf_counter()
+            self.metrics.emitted(event_name, (started - event.enqueued_at) * 1000,
+                                 (finished - started) * 1000)
+            self._emit_count += 1
+            if self._emit_count % self.LOG_SAMPLE_EVERY == 0:
+                logger.log_message("debug", f"{self._emit_count} events emitted (latest: {event_name})")
+        except RuntimeError as e:
+            # The emitter thread has no event loop; retry on the portal's loop
+            if "event loop" in str(e).lower() and self._portal:
+                self.metrics.portal_fallback(event_name)
+
+                async def emit_task():
+                    try:
+                        emit(self._app_handle, event_name, data)
+                    except Exception as e2:
+                        self.metrics.failed(event_name)
+                        logger.log_message("error", f"Failed to emit via portal: {e2}")
+                try:
+                    self._portal.start_task_soon(emit_task)
+                except Exception as e2:
+                    self.metrics.failed(event_name)
+                    logger.log_message("error", f"Failed to schedule emit via portal: {e2}")
+            else:
+                self.metrics.failed(event_name)
+                logger.log_message("error", f"Failed to emit event {event_name}: {e}")
+        except Exception as e:
+            self.metrics.failed(event_name)
+            logger.log_message("error", f"Unexpected error emitting event {event_name}: {e}")
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Emission counters and latency histograms per event name."""
+        return self.metrics.snapshot(queue_depth=len(self._queue))
+
+    @property
+    def dropped_events(self) -> int:
+        """Total number of events discarded under backpressure."""
+        return self._drop_count
+
+    # ---- change log ----
+
+    def _record_change(self, channel: str, change_type: str, payload: Dict[str, Any]) -> int:
+        """Assign the next revision to a change and keep it in the ring buffer."""
+        with self._revision_lock:
+            self._revision += 1
+            self._changes.append({
+                "revision": self._revision,
+                "channel": channel,
+                "type": change_type,
+                "payload": payload,
+                "timestamp": datetime.now().isoformat(),
+            })
+            return self._revision
+
+    @property
+    def revision(self) -> int:
+        """Revision of the latest schedule/settings change."""
+        return self._revision
+
+    def get_changes_since(self, revision: int) -> Dict[str, Any]:
+        """Changes with a revision greater than `revision`, oldest first.
+
+        `complete` is False when the ring buffer no longer holds every change
+        after `revision` (or the revision is from another run); the client
+        must then reload everything and continue from the returned revision.
+        """
+        with self._revision_lock:
+            current = self._revision
+            changes = list(self._changes)
+
+        oldest = changes[0]["revision"] if changes else current + 1
+        complete = oldest - 1 <= revision <= current
+        return {
+            "revision": current,
+            "complete": complete,
+            "changes": [c for c in changes if c["revision"] > revision] if complete else [],
+        }
+
+    # ---- producers ----
+
     def emit_string_event(self, event_name: str, message: str) -> None:
         """Emit a simple string event to the frontend."""
         if not self._app_handle:
             logger.log_message("warning", "Event handler not initialized, cannot emit event")
             return
 
-        try:
-            Emitter.emit_str(self._app_handle, event_name, message)
-            logger.log_message("debug", f"String event emitted: {event_name} - {message}")
-        except Exception as e:
-            logger.log_message("error", f"Failed to emit string event: {e}")
-    
+        self._enqueue(event_name, message, droppable=True)
+
     def emit_setting_update(self, key: str, value: Any) -> None:
         """Emit an event when a setting is updated."""
+        revision = self._record_change("settings", "setting_updated", {"key": key, "value": value})
         if not self._app_handle:
             logger.log_message("warning", "Event handler not initialized, cannot emit event")
             return
@@ -71,100 +356,121 @@ class EventHandler:
             event_data = SettingUpdateEvent(
                 key=key,
                 value=value,
-                timestamp=datetime.now().isoformat()
+                timestamp=datetime.now().isoformat(),
+                revision=revision
             )
-            Emitter.emit(self._app_handle, "setting-update", event_data)
-            logger.log_message("info", f"Setting update event emitted: {key} = {value}")
+            self._enqueue("setting-update", event_data)
         except Exception as e:
             logger.log_message("error", f"Failed to emit setting update event: {e}")
 
-    def emit_schedule_update(self, event_type: str, payload: Dict[str, Any]) -> None:
-        """Emit a schedule update event to the frontend."""
+    def emit_schedule_update(self, event_type: str, payload: Dict[str, Any],
+                             immediate: bool = False) -> None:
+        """Emit a schedule update event to the frontend.
+
+        The event is buffered and merged with the other updates of the
+        coalescing window into one schedule-update. Pass immediate=True for
+        latency-sensitive events, which skip the buffer.
+
+        Every update gets the next revision number, stored in the payload
+        and in the change log.
+        """
+        revision = self._record_change("schedule", event_type, payload)
+        payload = {**payload, "revision": revision}
         if not self._app_handle:
             logger.log_message("warning", "Event handler not initialized, cannot emit event")
             return
 
-        try:
-            # Create event data
-            event_data = ScheduleUpdateEvent(
-                type=event_type,
-                payload=payload,
-                timestamp=datetime.now().isoformat()
-            )
-
-            # Try to emit directly - PyTauri's Emitter should be thread-safe
-            try:
-                Emitter.emit(self._app_handle, "schedule-update", event_data)
-                logger.log_message("debug", f"Event emitted successfully: {event_type}")
-            except RuntimeError as e:
-                # If we get a runtime error about event loop, try using portal
-                if "event loop" in str(e).lower() and self._portal:
-                    logger.log_message("debug", "Direct emit failed, trying portal approach")
-
-                    # Define the emit task
-                    async def emit_task():
-                        try:
-                            # In async context, we can safely emit
-                            Emitter.emit(self._app_handle, "schedule-update", event_data)
-                            logger.log_message("debug", f"Event emitted via portal: {event_type}")
-                        except Exception as e2:
-                            logger.log_message("error", f"Failed to emit via portal: {e2}")
-
-                    # Check if we're in a thread that can use portal
-                    try:
-                        # Try to get the current event loop
-                        loop = asyncio.get_event_loop()
-                        if loop.is_running():
-                            # We're in the event loop thread, schedule as a task
-                            asyncio.create_task(emit_task())
-                            logger.log_message("debug", "Scheduled emit as async task")
-                        else:
-                            # Event loop exists but not running, use portal
-                            self._portal.start_task_soon(emit_task)
-                            logger.log_message("debug", "Scheduled emit via portal")
-                    except RuntimeError:
-                        # No event loop in current thread, use portal
-                        if self._portal:
-                            self._portal.start_task_soon(emit_task)
-                            logger.log_message("debug", "Scheduled emit via portal (no loop)")
-                        else:
-                            logger.log_message("error", "Cannot emit: no portal available")
-                else:
-                    logger.log_message("error", f"Failed to emit event: {e}")
-            except Exception as e:
-                logger.log_message("error", f"Unexpected error emitting event: {e}")
+        if immediate:
+            self._enqueue("schedule-update", self._schedule_event(event_type, payload))
+            return
 
+        with self._pending_lock:
+            self._pending.append((event_type, payload))
+            if self._flush_deadline is None:
+                self._flush_deadline = time.monotonic() + self._coalesce_window
+                self._wakeup.set()
+
+    def flush_schedule_updates(self) -> None:
+        """Hand buffered schedule updates to the emitter thread now."""
+        self._flush_pending()
+        self._wakeup.set()
+
+    def _flush_pending(self) -> None:
+        """Merge buffered schedule updates into one queued event."""
+        with self._pending_lock:
+            events, self._pending = self._pending, []
+            self._flush_deadline = None
+
+        events = coalesce_schedule_events(events)
+        if not events:
+            return
+        try:
+            if len(events) == 1:
+                event_data = self._schedule_event(*events[0])
+            else:
+                event_data = self._schedule_event("batch", {
+                    "events": [{"type": event_type, "payload": payload} for event_type, payload in events]
+                })
+            self._enqueue("schedule-update", event_data)
         except Exception as e:
             logger.log_message("error", f"Failed to prepare event: {e}")
 
-    def emit_course_added(self, course_id: int, name: str) -> None:
-        """Emit event when a course is added."""
-        self.emit_schedule_update("course_added", {"id": course_id, "name": name})
-
-    def emit_course_updated(self, course_id: int, **updates) -> None:
-        """Emit event when a course is updated."""
-        self.emit_schedule_update("course_updated", {"id": course_id, **updates})
-
-    def emit_course_deleted(self, course_id: int) -> None:
-        """Emit event when a course is deleted."""
-        self.emit_schedule_update("course_deleted", {"id": course_id})
-
-    def emit_schedule_added(self, entry_id: int, course_id: int, day: int, start: str, end: str) -> None:
-        """Emit event when a schedule entry is added."""
+    @staticmethod
+    def _schedule_event(event_type: str, payload: Dict[str, Any]) -> ScheduleUpdateEvent:
+        if event_type == "batch":
+            revision = max(e["payload"].get("revision", 0) for e in payload["events"])
+        else:
+            revision = payload.get("revision", 0)
+        return ScheduleUpdateEvent(
+            type=event_type,
+            payload=payload,
+            timestamp=datetime.now().isoformat(),
+            revision=revision
+        )
+
+    def emit_course_added(self, course_id: int, name: str, record: Optional[Dict] = None) -> None:
+        """Emit event when a course is added (record: the full course row)."""
+        self.emit_schedule_update("course_added", {"id": course_id, "name": name, "record": record})
+
+    def emit_course_updated(self, course_id: int, record: Optional[Dict] = None, **updates) -> None:
+        """Emit event when a course is updated (record: the full course row after the update)."""
+        self.emit_schedule_update("course_updated", {"id": course_id, **updates, "record": record})
+
+    def emit_course_deleted(self, course_id: int, schedule_ids: Optional[List[int]] = None) -> None:
+        """Emit event when a course is deleted, with the schedule entries removed with it."""
+        self.emit_schedule_update("course_deleted", {"id": course_id, "schedule_ids": schedule_ids or []})
+
+    def emit_schedule_added(self, entry_id: int, course_id: int, day: int, start: str, end: str,
+                            record: Optional[Dict] = None) -> None:
+        """Emit event when a schedule entry is added (record: the full entry)."""
         self.emit_schedule_update("schedule_added", {
             "id": entry_id,
             "course_id": course_id,
             "day_of_week": day,
             "start_time": start,
-            "end_time": end
+            "end_time": end,
+            "record": record
         })
 
     def emit_schedule_deleted(self, entry_id: int) -> None:
         """Emit event when a schedule entry is deleted."""
         self.emit_schedule_update("schedule_deleted", {"id": entry_id})
 
-    def emit_settings_batch_updated(self, updated_keys: list) -> None:
+    def emit_schedule_imported(self, courses_imported: int, schedule_imported: int,
+                               replaced: bool) -> None:
+        """Emit a single event for a whole bulk import."""
+        self.emit_schedule_update("schedule_imported", {
+            "courses_imported": courses_imported,
+            "schedule_imported": schedule_imported,
+            "replaced": replaced
+        })
+
+    def emit_settings_batch_updated(self, updated_keys: list,
+                                    values: Optional[Dict[str, Any]] = None) -> None:
         """Emit event when multiple settings are updated at once."""
+        values = values or {}
+        revision = self._record_change("settings", "settings_batch_updated",
+                                       {"updated_keys": updated_keys, "values": values})
         if not self._app_handle:
             logger.log_message("warning", "Event handler not initialized, cannot emit event")
             return
@@ -172,10 +478,11 @@ class EventHandler:
         try:
             event_data = SettingsBatchUpdateEvent(
                 updated_keys=updated_keys,
-                timestamp=datetime.now().isoformat()
+                timestamp=datetime.now().isoformat(),
+                values=values,
+                revision=revision
             )
-            Emitter.emit(self._app_handle, "settings-batch-update", event_data)
-            logger.log_message("info", f"Settings batch update event emitted: {len(updated_keys)} settings")
+            self._enqueue("settings-batch-update", event_data)
         except Exception as e:
             logger.log_message("error", f"Failed to emit settings batch update event: {e}")
 
@@ -197,15 +504,31 @@ class EventHandler:
                                f"Recording stopped on camera {camera_index}")
         logger.log_message("info", f"Recording stopped on camera {camera_index}")
 
-    def emit_custom_event(self, event_name: str, payload: Dict[str, Any]) -> None:
-        """Emit a custom event with arbitrary payload."""
+    def emit_custom_event(self, event_name: str,
+                          payload: Union[Dict[str, Any], BaseModel, str, bytes],
+                          droppable: bool = False) -> None:
+        """Emit a custom event with a JSON payload.
+
+        Dicts are serialized once here; pydantic models use model_dump_json.
+        str/bytes payloads are treated as already-serialized JSON and passed
+        through untouched, so high-rate producers can encode once themselves.
+        High-rate producers should also pass droppable=True so their events
+        are discarded first when the queue is full.
+        """
         if not self._app_handle:
             logger.log_message("warning", "Event handler not initialized, cannot emit event")
             return
 
         try:
-            Emitter.emit_str(self._app_handle, event_name, str(payload))
-            logger.log_message("debug", f"Custom event emitted: {event_name}")
+            if isinstance(payload, bytes):
+                message = payload.decode("utf-8")
+            elif isinstance(payload, str):
+                message = payload
+            elif isinstance(payload, BaseModel):
+                message = payload.model_dump_json()
+            else:
+                message = dumps_json(payload)
+            self._enqueue(event_name, message, droppable)
         except Exception as e:
             logger.log_message("error", f"Failed to emit custom event: {e}")
 
@@ -0,0 +1,145 @@
+"""
+Reverse log reader for ClassTop application.
+Reads app.log and its rotated siblings backwards in fixed-size blocks, so
+returning the newest N matching lines costs O(N) instead of reading whole
+files, and supports level/time filtering and cursor-based pagination.
+"""
+
+import os
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from .log_sink import rotated_files
+
+BLOCK_SIZE = 64 * 1024
+
+# Records start with "YYYY-MM-DD HH:mm:ss.SSS | LEVEL    | "; lines that
+# don't (e.g. traceback lines) continue the previous record
+_TIMESTAMP_LEN = 23
+_SEPARATOR = " | "
+
+
+def _parse_header(line: str) -> Optional[Tuple[str, str]]:
+    """(timestamp, level) of a record's first line, None for continuation lines."""
+    if len(line) < _TIMESTAMP_LEN + 3 or line[4] != "-" or line[_TIMESTAMP_LEN:_TIMESTAMP_LEN + 3] != _SEPARATOR:
+        return None
+    level_end = line.find(_SEPARATOR, _TIMESTAMP_LEN + 3)
+    if level_end == -1:
+        return None
+    return line[:_TIMESTAMP_LEN], line[_TIMESTAMP_LEN + 3:level_end].strip()
+
+
+def _reverse_lines(path: Path, end: Optional[int] = None,
+                   block_size: int = BLOCK_SIZE) -> Iterator[Tuple[int, str]]:
+    """Yield (offset, line) pairs from `end` (default: end of file) backwards."""
+    with open(path, "rb") as f:
+        size = f.seek(0, os.SEEK_END)
+        position = size if end is None else min(end, size)
+        remainder = b""
+        while position > 0:
+            read_size = min(block_size, position)
+            position -= read_size
+            f.seek(position)
+            chunk = f.read(read_size) + remainder
+            lines = chunk.split(b"\n")
+            # The first piece may be the tail of a line starting in an earlier block
+            remainder = lines.pop(0)
+            offset = position + len(remainder) + 1
+            line_offsets = []
+            for raw in lines:
+                line_offsets.append((offset, raw))
+                offset += len(raw) + 1
+            for line_offset, raw in reversed(line_offsets):
+                if raw:
+                    yield line_offset, raw.decode("utf-8", errors="replace").rstrip("\r")
+        if remainder:
+            yield 0, remainder.decode("utf-8", errors="replace").rstrip("\r")
+
+
+def log_files(current: Path) -> List[Path]:
+    """The live log file followed by rotated files, newest first."""
+    files = [current] if current.exists() else []
+    files.extend(reversed(rotated_files(current)))
+    return files
+
+
+def _parse_cursor(cursor: Optional[str]) -> Tuple[Optional[str], Optional[int]]:
+    if not cursor:
+        return None, None
+    name, _, offset = cursor.rpartition(":")
+    if not name:
+        raise ValueError(f"Invalid log cursor: {cursor!r}")
+    return name, int(offset)
+
+
+def read_log_page(current: Path, limit: int = 200, levels: Optional[Set[str]] = None,
+                  since: Optional[str] = None, until: Optional[str] = None,
+                  cursor: Optional[str] = None) -> Dict:
+    """Return up to `limit` of the newest matching lines, oldest first.
+
+    Args:
+        current: path of the live log file
+        limit: maximum number of lines to return
+        levels: level names to keep, None for all
+        since/until: inclusive bounds as 'YYYY-MM-DD HH:mm:ss[.SSS]' strings
+        cursor: value returned by a previous call, continues with older lines
+
+    Returns:
+        {"lines": [...], "cursor": str or None, "has_more": bool}. Pass the
+        cursor back to fetch the page before this one. Cursors name a file and
+        byte offset, so they are only valid until the next rotation.
+
+    Raises:
+        ValueError: if the cursor is malformed
+    """
+    cursor_file, cursor_offset = _parse_cursor(cursor)
+    files = log_files(current)
+    if cursor_file is not None:
+        names = [f.name for f in files]
+        files = files[names.index(cursor_file):] if cursor_file in names else []
+
+    filtering = levels is not None or since is not None or until is not None
+    result: List[str] = []
+    pending: List[str] = []  # continuation lines waiting for their record header
+    next_cursor = None
+    exhausted = True
+
+    for index, path in enumerate(files):
+        end = cursor_offset if index == 0 and cursor_file is not None else None
+        pending.clear()
+        try:
+            for offset, line in _reverse_lines(path, end):
+                if len(result) >= limit:
+                    exhausted = False
+                    break
+                if not filtering:
+                    result.append(line)
+                    next_cursor = f"{path.name}:{offset}"
+                    continue
+
+                header = _parse_header(line)
+                if header is None:
+                    pending.append(line)
+                    continue
+                timestamp, level = header
+                if since is not None and timestamp < since:
+                    # Everything further back is older still
+                    break
+                if (until is None or timestamp[:len(until)] <= until) and (levels is None or level in levels):
+                    # Built newest-first and reversed at the end
+                    result.extend(pending)
+                    result.append(line)
+                pending.clear()
+                # Only move the cursor on record boundaries
+                next_cursor = f"{path.name}:{offset}"
+            else:
+                continue
+            break
+        except FileNotFoundError:
+            # Rotated away between listing and reading
+            continue
+
+    if exhausted:
+        next_cursor = None
+    result.reverse()
+    return {"lines": result, "cursor": next_cursor, "has_more": next_cursor is not None}
@@ -0,0 +1,234 @@
+"""
+Non-blocking file sink for the ClassTop logger.
+Loguru hands formatted records to AsyncFileSink.write(), which only enqueues
+them; a background thread writes them to disk in batches and takes care of
+size-based rotation and retention of rotated files.
+"""
+
+import queue
+import sys
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# Same naming loguru used for rotated files: app.2024-03-01_08-00-00_000000.log
+ROTATED_TIME_FORMAT = "%Y-%m-%d_%H-%M-%S_%f"
+
+# After a failed rotation (file locked on Windows, disk full) keep appending
+# to the current file and only retry after this many seconds
+ROTATE_RETRY_SECONDS = 60
+
+
+def rotated_files(path: Path) -> List[Path]:
+    """Rotated siblings of a log file, oldest first."""
+    return sorted(path.parent.glob(f"{path.stem}.*{path.suffix}"))
+
+
+class AsyncFileSink:
+    """Bounded-queue file sink with a background writer thread.
+
+    Producers never touch the disk: when the queue is full the message is
+    dropped and counted, and the writer records how many were lost once it
+    catches up.
+    """
+
+    def __init__(self, path: Path, max_bytes: int = 10 * 1024 * 1024,
+                 retention_days: float = 10, max_queue: int = 10000,
+                 batch_size: int = 256, encoding: str = "utf-8"):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.retention_seconds = retention_days * 86400
+        self.batch_size = batch_size
+        self.encoding = encoding
+
+        self._queue: "queue.Queue[Optional[str]]" = queue.Queue(maxsize=max_queue)
+        self._file = None
+        self._size = 0
+        self._lock = threading.Lock()
+        self._dropped = 0
+        self._reported_dropped = 0
+        self._written = 0
+        self._batches = 0
+        self._rotations = 0
+        self._rotate_errors = 0
+        self._errors = 0
+        self._next_rotate_at = 0.0
+
+        self._open()
+        self._remove_expired()
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+
+    # Producer side
+
+    def write(self, message: str) -> None:
+        """Loguru sink entry point; never blocks."""
+        try:
+            self._queue.put_nowait(str(message))
+        except queue.Full:
+            with self._lock:
+                self._dropped += 1
+
+    def flush(self, timeout: float = 2.0) -> bool:
+        """Wait until everything queued so far is on disk."""
+        if not self._thread.is_alive():
+            return False
+        done = threading.Event()
+        try:
+            self._queue.put(_FlushMarker(done), timeout=timeout)
+        except queue.Full:
+            return False
+        return done.wait(timeout)
+
+    def stop(self, timeout: float = 2.0) -> None:
+        """Drain the queue and close the file."""
+        if not self._thread.is_alive():
+            return
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            pass
+        self._thread.join(timeout)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            dropped = self._dropped
+        return {
+            "queued": self._queue.qsize(),
+            "written": self._written,
+            "dropped": dropped,
+            "batches": self._batches,
+            "rotations": self._rotations,
+            "rotation_errors": self._rotate_errors,
+            "write_errors": self._errors,
+        }
+
+    # Writer thread
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            batch: List[str] = []
+            markers = []
+            stop = False
+            while True:
+                if item is None:
+                    stop = True
+                elif isinstance(item, _FlushMarker):
+                    markers.append(item)
+                else:
+                    batch.append(item)
+                if stop or len(batch) >= self.batch_size:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+
+            self._write_batch(batch)
+            for marker in markers:
+                marker.done.set()
+            if stop:
+                self._close()
+                return
+
+    def _write_batch(self, batch: List[str]) -> None:
+        with self._lock:
+            lost = self._dropped - self._reported_dropped
+            self._reported_dropped = self._dropped
+        if lost:
+            stamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
+            batch.append(f"{stamp} | WARNING  | {__name__} - {lost} log messages dropped (queue full)\n")
+        if not batch:
+            return
+
+        data = "".join(batch).encode(self.encoding, errors="replace")
+        if self._size and self._size + len(data) > self.max_bytes and time.monotonic() >= self._next_rotate_at:
+            try:
+                self._rotate()
+            except Exception as e:
+                # Don't lose the batch over a failed rotation; write it to the
+                # current file and try rotating again later
+                self._rotate_errors += 1
+                self._next_rotate_at = time.monotonic() + ROTATE_RETRY_SECONDS
+                self._report(f"log rotation failed, retrying in {ROTATE_RETRY_SECONDS}s: {e}")
+
+        try:
+            if self._file is None:
+                self._open()
+            self._file.write(data)
+            self._file.flush()
+            self._size += len(data)
+            self._written += len(batch)
+            self._batches += 1
+        except Exception as e:
+            self._errors += 1
+            self._report(f"log write failed: {e}")
+            # Last resort so logging never goes silent
+            self._fallback(batch)
+
+    @staticmethod
+    def _report(problem: str) -> None:
+        if sys.stderr is not None:
+            try:
+                sys.stderr.write(f"[{__name__}] {problem}\n")
+            except Exception:
+                pass
+
+    @staticmethod
+    def _fallback(batch: List[str]) -> None:
+        if sys.stderr is not None:
+            try:
+                sys.stderr.write("".join(batch))
+                sys.stderr.flush()
+            except Exception:
+                pass
+
+    # File handling
+
+    def _open(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "ab")
+        self._size = self._file.tell()
+
+    def _close(self) -> None:
+        if self._file is not None:
+            try:
+                self._file.close()
+            finally:
+                self._file = None
+
+    def _rotate(self) -> None:
+        """Rename the current file aside and start a new one.
+
+        If the rename fails the current file is reopened for appending and
+        the error is re-raised.
+        """
+        self._close()
+        stamp = datetime.now().strftime(ROTATED_TIME_FORMAT)
+        target = self.path.with_name(f"{self.path.stem}.{stamp}{self.path.suffix}")
+        try:
+            self.path.rename(target)
+            self._rotations += 1
+        finally:
+            self._open()
+        self._next_rotate_at = 0.0
+        self._remove_expired()
+
+    def _remove_expired(self) -> None:
+        cutoff = time.time() - self.retention_seconds
+        for rotated in rotated_files(self.path):
+            try:
+                if rotated.stat().st_mtime < cutoff:
+                    rotated.unlink()
+            except OSError:
+                continue
+
+
+class _FlushMarker:
+    __slots__ = ("done",)
+
+    def __init__(self, done: threading.Event):
+        self.done = done
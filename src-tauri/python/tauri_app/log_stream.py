@@ -0,0 +1,194 @@
+"""
+Live log stream for ClassTop application.
+A loguru sink keeps the most recent records in a ring buffer and pushes new
+ones to subscribers, with level/module filters applied before anything is
+handed over, so remote viewers don't have to poll and re-read app.log.
+"""
+
+import asyncio
+import threading
+from collections import deque
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from loguru import logger as _loguru
+
+DEFAULT_CAPACITY = 1000
+
+
+class LogFilter(NamedTuple):
+    """Server-side filter: minimum level number and module names (None for all)."""
+    min_level_no: int = 0
+    modules: Optional[Tuple[str, ...]] = None
+
+    def matches(self, entry: Dict[str, Any]) -> bool:
+        if entry["level_no"] < self.min_level_no:
+            return False
+        if self.modules is None:
+            return True
+        name = entry["module"]
+        short = name.rsplit(".", 1)[-1]
+        return any(name == m or short == m or name.startswith(m + ".") for m in self.modules)
+
+
+def make_filter(level: Optional[str] = None, modules: Optional[Iterable[str]] = None) -> LogFilter:
+    """Build a LogFilter from a level name and module names.
+
+    Module names match the full logger name ("tauri_app.camera_manager"), its
+    last component ("camera_manager") or a package prefix ("tauri_app").
+
+    Raises:
+        ValueError: unknown level name
+    """
+    min_level_no = 0
+    if level:
+        try:
+            min_level_no = _loguru.level(level.upper()).no
+        except ValueError:
+            raise ValueError(f"Unknown log level: {level}")
+    names = tuple(m.strip() for m in modules or () if m and m.strip())
+    return LogFilter(min_level_no, names or None)
+
+
+class LogStream:
+    """Ring buffer of recent log records with filtered push subscribers.
+
+    sink() runs on whichever thread logged, inside loguru's handler lock:
+    subscriber callbacks must be quick, must not block and must not log.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY):
+        self._buffer: deque = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+        self._seq = 0
+        self._subscribers: List[Tuple[LogFilter, Callable[[Dict[str, Any]], None]]] = []
+        self._local = threading.local()
+
+    def sink(self, message) -> None:
+        """Loguru sink entry point."""
+        record = message.record
+        with self._lock:
+            self._seq += 1
+            entry = {
+                "seq": self._seq,
+                "time": record["time"].isoformat(timespec="milliseconds"),
+                "level": record["level"].name,
+                "level_no": record["level"].no,
+                "module": record["name"] or "",
+                "function": record["function"],
+                "line": record["line"],
+                "message": record["message"],
+            }
+            self._buffer.append(entry)
+            subscribers = self._subscribers
+
+        if not subscribers or getattr(self._local, "dispatching", False):
+            return
+        self._local.dispatching = True
+        try:
+            for log_filter, callback in subscribers:
+                if log_filter.matches(entry):
+                    try:
+                        callback(entry)
+                    except Exception:
+                        # Can't log from here; a broken subscriber only hurts itself
+                        pass
+        finally:
+            self._local.dispatching = False
+
+    def recent(self, limit: int = 100, log_filter: LogFilter = LogFilter()) -> List[Dict[str, Any]]:
+        """The newest `limit` buffered entries matching the filter, oldest first."""
+        with self._lock:
+            entries = list(self._buffer)
+        matched = [e for e in reversed(entries) if log_filter.matches(e)][:limit]
+        matched.reverse()
+        return matched
+
+    def subscribe(self, callback: Callable[[Dict[str, Any]], None],
+                  log_filter: LogFilter = LogFilter()) -> Callable[[], None]:
+        """Call `callback(entry)` for each new matching record.
+
+        Returns:
+            Function that removes the subscription
+        """
+        return self.subscribe_with_backlog(callback, log_filter, 0)[0]
+
+    def subscribe_with_backlog(self, callback: Callable[[Dict[str, Any]], None],
+                               log_filter: LogFilter = LogFilter(),
+                               backlog: int = 100) -> Tuple[Callable[[], None], List[Dict[str, Any]]]:
+        """Subscribe and take the newest `backlog` matching entries in one step.
+
+        Both happen under the buffer lock, so every record ends up either in
+        the returned backlog or in a callback, never both and never neither.
+
+        Returns:
+            (unsubscribe function, backlog entries oldest first)
+        """
+        item = (log_filter, callback)
+        with self._lock:
+            entries = list(self._buffer) if backlog > 0 else []
+            # Copy-on-write so sink() can iterate without holding the lock
+            self._subscribers = self._subscribers + [item]
+
+        def unsubscribe() -> None:
+            with self._lock:
+                self._subscribers = [s for s in self._subscribers if s is not item]
+
+        matched = [e for e in reversed(entries) if log_filter.matches(e)][:backlog]
+        matched.reverse()
+        return unsubscribe, matched
+
+    def open_async(self, log_filter: LogFilter = LogFilter(), max_pending: int = 1000,
+                   backlog: int = 0) -> "AsyncLogSubscription":
+        """Subscribe on behalf of the running event loop.
+
+        The newest `backlog` matching entries are available as `.backlog`;
+        they never overlap with what get_batch() delivers.
+        """
+        return AsyncLogSubscription(self, log_filter, asyncio.get_running_loop(), max_pending, backlog)
+
+
+class AsyncLogSubscription:
+    """Delivers matching entries to a coroutine through a bounded asyncio queue.
+
+    Entries that arrive while the queue is full are dropped and counted.
+    """
+
+    def __init__(self, stream: LogStream, log_filter: LogFilter,
+                 loop: asyncio.AbstractEventLoop, max_pending: int, backlog: int = 0):
+        self.filter = log_filter
+        self.dropped = 0
+        self._loop = loop
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_pending)
+        self._unsubscribe, self.backlog = stream.subscribe_with_backlog(self._on_entry, log_filter, backlog)
+
+    def _on_entry(self, entry: Dict[str, Any]) -> None:
+        # Called on the logging thread
+        try:
+            self._loop.call_soon_threadsafe(self._offer, entry)
+        except RuntimeError:
+            # Loop already closed
+            self.close()
+
+    def _offer(self, entry: Dict[str, Any]) -> None:
+        try:
+            self._queue.put_nowait(entry)
+        except asyncio.QueueFull:
+            self.dropped += 1
+
+    async def get_batch(self, max_items: int = 100,
+                        timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Wait for at least one entry and return everything pending (up to max_items).
+
+        Returns an empty list if `timeout` expires first.
+        """
+        try:
+            first = await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return []
+        batch = [first]
+        while len(batch) < max_items and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        return batch
+
+    def close(self) -> None:
+        self._unsubscribe()
@@ -1,8 +1,12 @@
 from loguru import logger
 from pathlib import Path
+import atexit
 import sys
-from typing import List
-import inspect
+from typing import Dict, List, Optional, Set
+
+from .log_reader import read_log_page
+from .log_sink import AsyncFileSink
+from .log_stream import LogStream
 
 # Place logs in user home directory under .classtop
 APP_DIR = Path.home() / ".classtop"
@@ -23,54 +27,121 @@ if sys.stderr is not None:
         # In production mode without console, stderr might not be writable
         pass
 
-# File sink: plain text with full context
+# File sink: plain text with full context. Records are only queued on the
+# calling thread; a background writer batches them to disk and handles
+# rotation (10 MB) and retention (10 days), so a slow disk never stalls the
+# audio callback, camera loop or event loop.
 FILE_FORMAT = "{time:YYYY-MM-DD HH:mm:ss.SSS} | {level: <8} | {name}:{function}:{line} - {message}"
-logger.add(str(LOG_FILE), rotation="10 MB", retention="10 days", encoding="utf-8", level="DEBUG", format=FILE_FORMAT)
+file_sink = AsyncFileSink(LOG_FILE, max_bytes=10 * 1024 * 1024, retention_days=10)
+logger.add(file_sink.write, level="DEBUG", format=FILE_FORMAT)
+atexit.register(file_sink.stop)
+
+# In-memory stream of recent records for live viewers (SSE / admin server)
+log_stream = LogStream()
+logger.add(log_stream.sink, level="DEBUG", format="{message}")
 
-def init_logger():
+def init_logger(level: Optional[str] = None):
+    """Log startup and optionally apply a configured minimum level."""
+    if level:
+        set_min_level(level)
     logger.info("Logger initialized")
 
 
-def _caller_depth() -> int:
-    """Return number of stack frames to skip so loguru reports the original caller.
+# Severity numbers of the standard loguru levels, used to filter before any
+# record is built. Unknown (custom) level names are always passed through.
+_LEVEL_NO = {
+    "TRACE": 5,
+    "DEBUG": 10,
+    "INFO": 20,
+    "SUCCESS": 25,
+    "WARNING": 30,
+    "ERROR": 40,
+    "CRITICAL": 50,
+}
+# Lowest level any sink accepts; messages below it are discarded up front
+_min_level_no = _LEVEL_NO["DEBUG"]
+
+# log_message is always called directly by the code doing the logging, so the
+# caller is exactly one frame up. Binding the depth once avoids both the stack
+# walk and a new logger object per call.
+_caller_logger = logger.opt(depth=1)
+
+
+def set_min_level(level: str) -> None:
+    """Set the lowest level log_message forwards to loguru.
+
+    Raises:
+        ValueError: unknown level name
+    """
+    global _min_level_no
+    try:
+        _min_level_no = _LEVEL_NO[level.upper()]
+    except KeyError:
+        raise ValueError(f"Unknown log level: {level}")
+
 
-    We need to skip the frames inside this module (wrapper functions) so loguru
-    reports the user's calling file/line instead of this module.
+def is_enabled(level: str) -> bool:
+    """Whether a message at `level` would be logged.
+
+    Lets hot paths skip building expensive messages entirely.
     """
-    # Walk the stack until we find a frame outside this file
-    current_file = Path(__file__).resolve()
-    for depth, frame_info in enumerate(inspect.stack()):
-        try:
-            fpath = Path(frame_info.filename).resolve()
-            if fpath != current_file:
-                # loguru's depth is number of frames to skip; add 0 for current
-                return depth
-        except Exception:
-            continue
-    return 0
-
-
-def log_message(level: str, message: str) -> None:
+    level_no = _LEVEL_NO.get(level.upper())
+    return level_no is None or level_no >= _min_level_no
+
+
+def log_message(level: str, message: str, *args, **kwargs) -> None:
     """Log a message at given level (debug/info/warning/error/critical).
 
-    Uses logger.opt(depth=...) to skip the wrapper and report the actual caller.
+    Messages below the minimum level return before any work is done. Extra
+    positional/keyword arguments are substituted into `{}` placeholders by
+    loguru only when the record is actually emitted, e.g.
+    ``log_message("debug", "Loaded {} rows from {}", count, table)``.
     """
     level = (level or "info").upper()
-    depth = _caller_depth()
+    level_no = _LEVEL_NO.get(level)
+    if level_no is not None and level_no < _min_level_no:
+        return
+    _caller_logger.log(level, message, *args, **kwargs)
+
+
+def get_log_stats() -> Dict:
+    """File sink counters: queued, written and dropped messages, rotations."""
+    return file_sink.stats()
+
+
+def _levels_from(min_level: Optional[str]) -> Optional[Set[str]]:
+    if not min_level:
+        return None
+    threshold = _LEVEL_NO[min_level.upper()]
+    return {name for name, number in _LEVEL_NO.items() if number >= threshold}
+
+
+def read_logs(limit: int = 200, level: Optional[str] = None, since: Optional[str] = None,
+              until: Optional[str] = None, cursor: Optional[str] = None) -> Dict:
+    """Read a page of log lines, newest first across app.log and rotated files.
+
+    Args:
+        limit: maximum number of lines
+        level: minimum level name (e.g. "warning"), None for all
+        since/until: inclusive time bounds, 'YYYY-MM-DD HH:mm:ss' (prefixes allowed)
+        cursor: cursor from a previous page to continue with older lines
+
+    Returns:
+        {"lines": [...], "cursor": ..., "has_more": ...}; lines are in file order
+
+    Raises:
+        ValueError: unknown level or malformed cursor
+    """
     try:
-        # Use logger.opt to skip wrapper frames and then call logger.log with the
-        # provided level string. logger.log accepts level names like "INFO".
-        logger.opt(depth=depth).log(level, message)
-    except Exception:
-        # fallback to plain logger.log if something goes wrong
-        logger.log(level, message)
+        levels = _levels_from(level)
+    except KeyError:
+        raise ValueError(f"Unknown log level: {level}")
+    # Make sure messages still queued for the writer are included
+    if cursor is None:
+        file_sink.flush(timeout=0.5)
+    return read_log_page(LOG_FILE, limit, levels=levels, since=since, until=until, cursor=cursor)
 
 
 def tail_logs(lines: int = 200) -> List[str]:
     """Return the last `lines` lines from the log file as a list of strings."""
-    try:
-        with open(LOG_FILE, "r", encoding="utf-8") as f:
-            all_lines = f.readlines()
-            return [l.rstrip("\n") for l in all_lines[-lines:]]
-    except FileNotFoundError:
-        return []
+    return read_logs(lines)["lines"]
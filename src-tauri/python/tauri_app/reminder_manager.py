@@ -1,137 +1,360 @@
 """Reminder Manager - 课程提醒管理器"""
 import asyncio
-import threading
-from datetime import datetime, timedelta
-from typing import Optional, Set
+import heapq
+from datetime import date, datetime, time, timedelta
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+from . import db as _db
 from . import logger
+from .connection_pool import get_pool
+from .settings_schema import parse_offsets
+from .week_calendar import SETTING_KEYS as CALENDAR_SETTINGS
+
+# 提醒服务关注的设置项，变更时通过订阅推送而不是每分钟轮询
+# （学期设置变化会改变教学周，也需要重新计划）
+WATCHED_SETTINGS = ('reminder_enabled', 'reminder_minutes', 'reminder_offsets',
+                    'reminder_end_notice') + CALENDAR_SETTINGS
+
+# 在 ServiceSupervisor 中注册的服务名
+SERVICE_NAME = 'reminders'
+
+# 最长休眠时间：系统睡眠或时钟调整后也能在此时间内重新校准
+MAX_SLEEP_SECONDS = 600
+
+# 下课提醒在 reminder_deliveries.offset_minutes 中的取值
+END_OF_CLASS = -1
+
+# 唤醒较晚（如系统睡眠）时，下课后超过该时间不再发送下课提醒
+END_NOTICE_GRACE = timedelta(minutes=5)
+
+# 提醒计划项：(提醒时刻, 课程表条目ID, 提前分钟数或 END_OF_CLASS, 上/下课时刻, 课程信息)
+PlanItem = Tuple[datetime, int, int, datetime, Dict]
+
+
+class CourseReminderPlan(NamedTuple):
+    """单门课程的提醒方案，offsets / end_notice 为 None 时使用全局设置"""
+    enabled: bool = True
+    offsets: Optional[Tuple[int, ...]] = None
+    end_notice: Optional[bool] = None
 
 
 class ReminderManager:
     """管理课程提醒通知的后台任务"""
 
-    def __init__(self, schedule_manager, settings_manager, app_handle=None):
+    def __init__(self, schedule_manager, settings_manager, supervisor, app_handle=None):
         """初始化提醒管理器
 
         Args:
             schedule_manager: 课程表管理器
             settings_manager: 设置管理器
+            supervisor: 服务管理器，提醒循环作为共享事件循环上的任务运行
             app_handle: Tauri应用句柄，用于发送通知
         """
         self.schedule_manager = schedule_manager
         self.settings_manager = settings_manager
+        self.supervisor = supervisor
         self.app_handle = app_handle
         self.logger = logger
+        self.pool = get_pool(schedule_manager.db_path)
+
+        # 今天已发送的提醒 {(entry_id, offset)}，与 reminder_deliveries 表同步，重启后不会重复发送
+        self.sent_reminders: Set[Tuple[int, int]] = set()
+        self._sent_date: Optional[date] = None
 
-        # 跟踪已发送的提醒，避免重复发送 (格式: "entry_id_date")
-        self.sent_reminders: Set[str] = set()
+        # 提醒循环运行时创建，用于唤醒循环重新计划
+        self._replan: Optional[asyncio.Event] = None
+        supervisor.register(SERVICE_NAME, self._reminder_loop)
 
-        # 后台任务
-        self._task = None
-        self._running = False
+        # 设置快照，由订阅回调更新
+        self.reminder_enabled = settings_manager.get_bool('reminder_enabled')
+        self.reminder_minutes = settings_manager.get_int('reminder_minutes', 10)
+        self.reminder_offsets: Tuple[int, ...] = settings_manager.get_typed('reminder_offsets') or ()
+        self.reminder_end_notice = settings_manager.get_bool('reminder_end_notice')
+        self._unsubscribe = settings_manager.subscribe(WATCHED_SETTINGS, self._on_settings_changed)
+        # 课程表变化时重新计算提醒时刻
+        self._unsubscribe_schedule = schedule_manager.subscribe(lambda snapshot: self._request_replan())
 
         self.logger.log_message("info", "ReminderManager initialized")
 
+    @property
+    def running(self) -> bool:
+        """提醒服务是否在运行"""
+        return self.supervisor.is_running(SERVICE_NAME)
+
     def start(self):
         """启动提醒服务"""
-        if self._running:
+        if not self.supervisor.start(SERVICE_NAME):
             self.logger.log_message("warning", "Reminder service already running")
             return
-
-        self._running = True
-
-        # 在新线程中运行异步事件循环
-        def run_loop():
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            self._task = loop.create_task(self._reminder_loop())
-            loop.run_until_complete(self._task)
-            loop.close()
-
-        thread = threading.Thread(target=run_loop, daemon=True)
-        thread.start()
-
         self.logger.log_message("info", "Reminder service started")
 
     def stop(self):
         """停止提醒服务"""
-        self._running = False
-        if self._task:
-            self._task.cancel()
-        self.logger.log_message("info", "Reminder service stopped")
-
-    async def _reminder_loop(self):
-        """提醒循环 - 每分钟检查一次"""
-        while self._running:
-            try:
-                await self._check_and_send_reminders()
-                # 每60秒检查一次
-                await asyncio.sleep(60)
-            except asyncio.CancelledError:
-                break
-            except Exception as e:
-                self.logger.log_message("error", f"Error in reminder loop: {e}")
-                await asyncio.sleep(60)
-
-    async def _check_and_send_reminders(self):
-        """检查并发送课程提醒"""
+        if self.supervisor.stop(SERVICE_NAME):
+            self.logger.log_message("info", "Reminder service stopped")
+
+    def close(self):
+        """停止服务并取消设置订阅"""
+        self.stop()
+        self._unsubscribe()
+        self._unsubscribe_schedule()
+
+    def _on_settings_changed(self, changes: Dict[str, Any]):
+        """设置变更回调：更新设置快照，提醒开关变化时实时启停服务"""
+        if 'reminder_minutes' in changes:
+            self.reminder_minutes = changes['reminder_minutes'] or 10
+        if 'reminder_offsets' in changes:
+            self.reminder_offsets = changes['reminder_offsets'] or ()
+        if 'reminder_end_notice' in changes:
+            self.reminder_end_notice = bool(changes['reminder_end_notice'])
+        self._request_replan()
+        if 'reminder_enabled' in changes:
+            self.reminder_enabled = bool(changes['reminder_enabled'])
+            if self.reminder_enabled and not self.running:
+                self.start()
+            elif not self.reminder_enabled and self.running:
+                self.stop()
+
+    def _request_replan(self):
+        """通知提醒循环重新计算计划（可在任意线程调用）"""
+        replan = self._replan
+        if replan is None or not self.running:
+            return
         try:
-            # 检查是否启用提醒
-            enabled = self.settings_manager.get_setting('reminder_enabled')
-            if enabled != 'true':
-                return
+            self.supervisor.loop.call_soon_threadsafe(replan.set)
+        except RuntimeError:
+            pass  # 事件循环已关闭
 
-            # 获取提醒提前时间
-            reminder_minutes_str = self.settings_manager.get_setting('reminder_minutes')
-            reminder_minutes = int(reminder_minutes_str) if reminder_minutes_str else 10
+    def _week_for(self, day: date) -> Optional[int]:
+        """某天所在的教学周，由 db.week_calendar 统一计算；开学前、学期结束后或假期周返回 None"""
+        return _db.week_calendar.week_of(day, strict=True)
 
-            # 获取当前时间和周数
-            now = datetime.now()
-            current_day = now.isoweekday()  # 1-7 (Monday-Sunday)
-            current_time = now.strftime("%H:%M")
+    # Course Reminder Plans
+
+    def default_offsets(self) -> Tuple[int, ...]:
+        """全局提醒提前量：reminder_offsets，未设置时为 reminder_minutes"""
+        return self.reminder_offsets or (self.reminder_minutes,)
 
-            # 计算当前周数
-            week_number = self.schedule_manager.calculate_week_number(
-                self.settings_manager.get_setting('semester_start_date')
+    def _load_course_plans(self) -> Dict[int, CourseReminderPlan]:
+        with self.pool.connection() as conn:
+            rows = conn.execute("SELECT course_id, enabled, offsets, end_notice FROM course_reminders").fetchall()
+        plans = {}
+        for course_id, enabled, offsets, end_notice in rows:
+            try:
+                parsed = parse_offsets(offsets) if offsets is not None else None
+            except ValueError as e:
+                self.logger.log_message("warning", f"Invalid reminder offsets for course {course_id}: {e}")
+                parsed = None
+            plans[course_id] = CourseReminderPlan(
+                bool(enabled), parsed, None if end_notice is None else bool(end_notice)
             )
+        return plans
 
-            # 获取今天的课程
-            today_classes = self.schedule_manager.get_schedule_by_day(current_day, week_number)
+    def get_course_plan(self, course_id: int) -> Dict[str, Any]:
+        """获取课程的提醒方案（含合并全局设置后的生效值）
 
-            # 检查每节课
-            for class_info in today_classes:
-                start_time = class_info['start_time']
-                class_id = class_info['id']
+        Returns:
+            {course_id, enabled, offsets, end_notice, effective_offsets, effective_end_notice, custom}
+        """
+        stored = self._load_course_plans().get(course_id)
+        plan = stored or CourseReminderPlan()
+        return {
+            "course_id": course_id,
+            "enabled": plan.enabled,
+            "offsets": list(plan.offsets) if plan.offsets is not None else None,
+            "end_notice": plan.end_notice,
+            "effective_offsets": list(plan.offsets if plan.offsets is not None else self.default_offsets()),
+            "effective_end_notice": plan.end_notice if plan.end_notice is not None else self.reminder_end_notice,
+            "custom": stored is not None,
+        }
 
-                # 生成唯一的提醒ID（包含日期，避免每天重复）
-                reminder_id = f"{class_id}_{now.strftime('%Y-%m-%d')}"
+    def set_course_plan(self, course_id: int, enabled: bool = True,
+                        offsets: Optional[Iterable[int]] = None,
+                        end_notice: Optional[bool] = None) -> bool:
+        """设置课程的提醒方案
 
-                # 如果已经发送过这个提醒，跳过
-                if reminder_id in self.sent_reminders:
-                    continue
+        Args:
+            course_id: 课程ID
+            enabled: 是否提醒该课程
+            offsets: 上课前多少分钟提醒（可多个），None 表示使用全局设置
+            end_notice: 是否下课提醒，None 表示使用全局设置
 
-                # 计算距离上课的分钟数
-                start_hour, start_minute = map(int, start_time.split(':'))
-                start_datetime = now.replace(hour=start_hour, minute=start_minute, second=0, microsecond=0)
-                minutes_until_class = (start_datetime - now).total_seconds() / 60
+        Returns:
+            是否成功（课程不存在时返回 False）
 
-                # 如果在提醒时间范围内（提前reminder_minutes分钟到上课时间之间）
-                if 0 <= minutes_until_class <= reminder_minutes:
-                    await self._send_notification(class_info, int(minutes_until_class))
-                    self.sent_reminders.add(reminder_id)
-                    self.logger.log_message("info", f"Sent reminder for class: {class_info['name']}")
+        Raises:
+            ValueError: 提前量不合法
+        """
+        stored_offsets = None
+        if offsets is not None:
+            stored_offsets = ",".join(str(m) for m in parse_offsets(",".join(str(int(m)) for m in offsets)))
+        try:
+            with self.pool.connection() as conn:
+                if not conn.execute("SELECT 1 FROM courses WHERE id = ?", (course_id,)).fetchone():
+                    return False
+                conn.execute(
+                    "INSERT INTO course_reminders(course_id, enabled, offsets, end_notice) VALUES(?, ?, ?, ?) "
+                    "ON CONFLICT(course_id) DO UPDATE SET enabled=excluded.enabled, "
+                    "offsets=excluded.offsets, end_notice=excluded.end_notice",
+                    (course_id, int(bool(enabled)), stored_offsets,
+                     None if end_notice is None else int(bool(end_notice)))
+                )
+                conn.commit()
+        except Exception as e:
+            self.logger.log_message("error", f"Error saving reminder plan for course {course_id}: {e}")
+            return False
 
-            # 清理过期的提醒记录（超过24小时）
-            self._cleanup_old_reminders()
+        self._request_replan()
+        self.logger.log_message("info", f"Reminder plan updated for course {course_id}")
+        return True
 
+    def clear_course_plan(self, course_id: int) -> bool:
+        """删除课程的提醒方案，恢复使用全局设置"""
+        try:
+            with self.pool.connection() as conn:
+                cur = conn.execute("DELETE FROM course_reminders WHERE course_id = ?", (course_id,))
+                conn.commit()
+                removed = cur.rowcount > 0
         except Exception as e:
-            self.logger.log_message("error", f"Error checking reminders: {e}")
+            self.logger.log_message("error", f"Error clearing reminder plan for course {course_id}: {e}")
+            return False
+
+        if removed:
+            self._request_replan()
+        return removed
+
+    # Delivery State
+
+    def _load_sent(self, day: date) -> None:
+        """从数据库加载某天已发送的提醒"""
+        with self.pool.connection() as conn:
+            rows = conn.execute(
+                "SELECT entry_id, offset_minutes FROM reminder_deliveries WHERE date = ?",
+                (day.isoformat(),)
+            ).fetchall()
+        self.sent_reminders = {(entry_id, offset) for entry_id, offset in rows}
+        self._sent_date = day
+
+    def _record_sent(self, day: date, keys: List[Tuple[int, int]]) -> None:
+        """记录已发送的提醒（内存 + 数据库）"""
+        self.sent_reminders.update(keys)
+        with self.pool.transaction() as conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO reminder_deliveries(date, entry_id, offset_minutes) VALUES(?, ?, ?)",
+                [(day.isoformat(), entry_id, offset) for entry_id, offset in keys]
+            )
+
+    def _build_plan(self, now: datetime) -> List[PlanItem]:
+        """根据课程表快照计算今天剩余的提醒时刻，返回按时间排序的小顶堆"""
+        today = now.date()
+        if self._sent_date != today:
+            self._load_sent(today)
+        course_plans = self._load_course_plans()
+        default_offsets = self.default_offsets()
+
+        snapshot = self.schedule_manager.get_snapshot()
+        plan: List[PlanItem] = []
+        week = self._week_for(today)
+        if week is None:
+            return plan
+        for class_info in snapshot.get_schedule_by_day(now.isoweekday(), week):
+            entry_id = class_info['id']
+            entry = snapshot.get_entry(entry_id)
+            course_plan = course_plans.get(entry['course_id']) if entry else None
+            course_plan = course_plan or CourseReminderPlan()
+            if not course_plan.enabled:
+                continue
+
+            start_hour, start_minute = map(int, class_info['start_time'].split(':'))
+            start_at = datetime.combine(today, time(start_hour, start_minute))
+            if start_at >= now:
+                offsets = course_plan.offsets if course_plan.offsets is not None else default_offsets
+                for minutes in offsets:
+                    if (entry_id, minutes) not in self.sent_reminders:
+                        plan.append((start_at - timedelta(minutes=minutes), entry_id, minutes, start_at, class_info))
+
+            end_notice = course_plan.end_notice if course_plan.end_notice is not None else self.reminder_end_notice
+            if end_notice and (entry_id, END_OF_CLASS) not in self.sent_reminders:
+                end_hour, end_minute = map(int, class_info['end_time'].split(':'))
+                end_at = datetime.combine(today, time(end_hour, end_minute))
+                if end_at + END_NOTICE_GRACE >= now:
+                    plan.append((end_at, entry_id, END_OF_CLASS, end_at, class_info))
+        heapq.heapify(plan)
+        return plan
+
+    @staticmethod
+    def _seconds_until_next(plan: List[PlanItem], now: datetime) -> float:
+        """距离下一个提醒时刻（或次日零点重新计划）的秒数"""
+        next_day = datetime.combine(now.date() + timedelta(days=1), time())
+        deadline = min(plan[0][0], next_day) if plan else next_day
+        return max(0.0, min((deadline - now).total_seconds(), MAX_SLEEP_SECONDS))
+
+    async def _reminder_loop(self):
+        """提醒循环 - 休眠到最近的提醒时刻，课程表或设置变化时重新计划
+
+        计划或记录失败时异常直接抛出，由 ServiceSupervisor 记录错误并重启循环；
+        单条通知发送失败在 _send_notification 中处理。循环运行在共享的 portal
+        事件循环上，SQLite 读写都放到工作线程执行，避免数据库繁忙时阻塞其他命令。
+        """
+        replan = self._replan = asyncio.Event()
+        plan: List[PlanItem] = []
+        plan_date: Optional[date] = None
+        while True:
+            now = datetime.now()
+            if replan.is_set() or plan_date != now.date():
+                replan.clear()
+                if plan_date != now.date():
+                    await asyncio.to_thread(self._cleanup_old_reminders)
+                plan = await asyncio.to_thread(self._build_plan, now) if self.reminder_enabled else []
+                plan_date = now.date()
+                self.logger.log_message("debug", f"Reminder plan rebuilt: {len(plan)} pending")
+
+            due = []
+            while plan and plan[0][0] <= now:
+                due.append(heapq.heappop(plan))
+            if due:
+                await self._deliver_due(due, now)
+
+            try:
+                await asyncio.wait_for(replan.wait(), timeout=self._seconds_until_next(plan, now))
+            except asyncio.TimeoutError:
+                pass
+
+    async def _deliver_due(self, due: List[PlanItem], now: datetime):
+        """发送到期的提醒
 
-    async def _send_notification(self, class_info: dict, minutes_until: int):
+        同一节课有多个提前量同时到期时（如启动较晚）只发送离上课最近的一条；
+        已经开始的课程不再发送上课提醒，例如系统睡眠后唤醒。
+        """
+        nearest: Dict[Tuple[int, bool], PlanItem] = {}
+        for item in due:
+            _, entry_id, offset, _, _ = item
+            key = (entry_id, offset == END_OF_CLASS)
+            if key not in nearest or offset < nearest[key][2]:
+                nearest[key] = item
+
+        for _, entry_id, offset, target_at, class_info in nearest.values():
+            if offset == END_OF_CLASS:
+                if now <= target_at + END_NOTICE_GRACE:
+                    await self._send_notification(class_info, 0, end_of_class=True)
+            elif now <= target_at:
+                minutes_until_class = (target_at - now).total_seconds() / 60
+                await self._send_notification(class_info, int(minutes_until_class), offset)
+                self.logger.log_message("info", f"Sent reminder for class: {class_info['name']}")
+
+        # 跳过的提醒也记为已处理，避免重新计划后再次到期
+        await asyncio.to_thread(
+            self._record_sent, now.date(), [(entry_id, offset) for _, entry_id, offset, _, _ in due]
+        )
+
+    async def _send_notification(self, class_info: dict, minutes_until: int,
+                                 offset: Optional[int] = None, end_of_class: bool = False):
         """发送通知
 
         Args:
             class_info: 课程信息
             minutes_until: 距离上课还有多少分钟
+            offset: 触发本次提醒的提前量（分钟）
+            end_of_class: 是否为下课提醒
         """
         try:
             course_name = class_info['name']
@@ -139,12 +362,14 @@ class ReminderManager:
             teacher = class_info.get('teacher', '')
 
             # 构建通知标题和内容
-            if minutes_until <= 0:
+            if end_of_class:
+                title = f"下课提醒: {course_name}"
+            elif minutes_until <= 0:
                 title = f"课程即将开始: {course_name}"
             else:
                 title = f"课程提醒: {course_name}"
 
-            body_parts = [f"{minutes_until}分钟后上课"]
+            body_parts = ["课程已结束" if end_of_class else f"{minutes_until}分钟后上课"]
             if location:
                 body_parts.append(f"地点: {location}")
             if teacher:
@@ -164,7 +389,9 @@ class ReminderManager:
                         "course_name": course_name,
                         "start_time": class_info['start_time'],
                         "location": location,
-                        "minutes_until": minutes_until
+                        "minutes_until": minutes_until,
+                        "kind": "end" if end_of_class else "start",
+                        "offset": END_OF_CLASS if end_of_class else offset
                     })
 
             self.logger.log_message("info", f"Notification sent: {title} - {body}")
@@ -173,14 +400,26 @@ class ReminderManager:
             self.logger.log_message("error", f"Error sending notification: {e}")
 
     def _cleanup_old_reminders(self):
-        """清理超过1天的提醒记录"""
-        today_str = datetime.now().strftime('%Y-%m-%d')
-        self.sent_reminders = {
-            r for r in self.sent_reminders
-            if r.endswith(today_str)
-        }
+        """删除今天之前的提醒记录（按日期主键范围删除，只触及过期行）"""
+        try:
+            with self.pool.connection() as conn:
+                cur = conn.execute(
+                    "DELETE FROM reminder_deliveries WHERE date < ?", (date.today().isoformat(),)
+                )
+                conn.commit()
+            if cur.rowcount:
+                self.logger.log_message("debug", f"Removed {cur.rowcount} expired reminder records")
+        except Exception as e:
+            self.logger.log_message("error", f"Error cleaning up reminder records: {e}")
 
     def clear_sent_reminders(self):
         """手动清空已发送的提醒记录（用于测试）"""
+        try:
+            with self.pool.connection() as conn:
+                conn.execute("DELETE FROM reminder_deliveries")
+                conn.commit()
+        except Exception as e:
+            self.logger.log_message("error", f"Error clearing reminder records: {e}")
         self.sent_reminders.clear()
+        self._request_replan()
         self.logger.log_message("info", "Cleared all sent reminders")
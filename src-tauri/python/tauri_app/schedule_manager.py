@@ -5,12 +5,18 @@ Handles all schedule-related operations with proper logging.
 
 import json
 import sqlite3
-from typing import Optional, Dict, List
-from datetime import datetime, timedelta
+import threading
+from typing import Callable, Optional, Dict, List, Tuple
+from datetime import date
 from contextlib import contextmanager
 from pathlib import Path
 
 from . import logger as _logger
+from .conflict_engine import ConflictEngine
+from .connection_pool import get_pool
+from .schedule_snapshot import ScheduleSnapshot
+from .schedule_timeline import ScheduleTimeline
+from .week_calendar import parse_start_date, week_from_start
 
 
 class ScheduleManager:
@@ -20,22 +26,106 @@ class ScheduleManager:
         self.db_path = db_path
         self.logger = _logger
         self.event_handler = event_handler
+        self.pool = get_pool(db_path)
+        self._snapshot: Optional[ScheduleSnapshot] = None
+        self._snapshot_lock = threading.Lock()
+        self._snapshot_counter = 0
+        self._conflict_engine: Optional[Tuple[int, ConflictEngine]] = None
+        self._timeline: Optional[ScheduleTimeline] = None
+        self._subscribers: List[Callable[[ScheduleSnapshot], None]] = []
 
     @contextmanager
     def get_connection(self):
-        """Context manager for database connections."""
-        conn = None
+        """Context manager for the thread's pooled database connection."""
         try:
-            conn = sqlite3.connect(self.db_path)
-            self.logger.log_message("debug", f"Database connection opened: {self.db_path}")
-            yield conn
+            with self.pool.connection() as conn:
+                yield conn
         except Exception as e:
             self.logger.log_message("error", f"Database connection failed: {e}")
             raise
-        finally:
-            if conn:
-                conn.close()
-                self.logger.log_message("debug", "Database connection closed")
+
+    # Snapshot Methods
+    def get_snapshot(self) -> ScheduleSnapshot:
+        """Return the current timetable snapshot, loading it on first use."""
+        snapshot = self._snapshot
+        if snapshot is None:
+            snapshot = self.refresh_snapshot()
+        return snapshot
+
+    def refresh_snapshot(self) -> ScheduleSnapshot:
+        """Rebuild the snapshot from the database and swap it in atomically."""
+        with self._snapshot_lock:
+            self._snapshot_counter += 1
+            version = self._snapshot_counter
+            with self.get_connection() as conn:
+                snapshot = ScheduleSnapshot.load(conn, version)
+            self._snapshot = snapshot
+
+        self.logger.log_message("debug", f"Schedule snapshot rebuilt (version {version})")
+        self._notify_subscribers(snapshot)
+        return snapshot
+
+    def subscribe(self, callback: Callable[[ScheduleSnapshot], None]) -> Callable[[], None]:
+        """Call `callback(snapshot)` whenever the snapshot is rebuilt.
+
+        Callbacks run on the thread that changed the schedule and should only
+        schedule work. Returns a function that removes the subscription.
+        """
+        self._subscribers.append(callback)
+
+        def unsubscribe() -> None:
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+
+        return unsubscribe
+
+    def _notify_subscribers(self, snapshot: ScheduleSnapshot) -> None:
+        for callback in list(self._subscribers):
+            try:
+                callback(snapshot)
+            except Exception as e:
+                self.logger.log_message("error", f"Schedule subscriber failed: {e}")
+
+    def _invalidate_snapshot(self) -> None:
+        """Rebuild the snapshot after a write; fall back to a lazy reload on failure."""
+        try:
+            self.refresh_snapshot()
+        except Exception as e:
+            self.logger.log_message("error", f"Error rebuilding schedule snapshot: {e}")
+            with self._snapshot_lock:
+                self._snapshot = None
+
+    def get_conflict_engine(self) -> ConflictEngine:
+        """Return the conflict engine for the current snapshot, building it on demand."""
+        snapshot = self.get_snapshot()
+        cached = self._conflict_engine
+        if cached is None or cached[0] != snapshot.version:
+            cached = (snapshot.version, ConflictEngine(snapshot.entries))
+            self._conflict_engine = cached
+        return cached[1]
+
+    def get_timeline(self, week: Optional[int] = None) -> ScheduleTimeline:
+        """Return the class timeline for a week, rebuilt only when the week or snapshot changes."""
+        snapshot = self.get_snapshot()
+        timeline = self._timeline
+        if timeline is None or timeline.version != snapshot.version or timeline.week != week:
+            timeline = ScheduleTimeline(snapshot.week_classes(week), week, snapshot.version)
+            self._timeline = timeline
+        return timeline
+
+    def _changed_record(self, kind: str, record_id: int) -> Optional[Dict]:
+        """Full course/entry record from the fresh snapshot, attached to change events."""
+        try:
+            snapshot = self.get_snapshot()
+            return snapshot.get_course(record_id) if kind == "course" else snapshot.get_entry(record_id)
+        except Exception as e:
+            self.logger.log_message("error", f"Error loading changed {kind} {record_id}: {e}")
+            return None
+
+    @property
+    def snapshot_version(self) -> int:
+        """Version of the current snapshot, bumped on every schedule change."""
+        return self.get_snapshot().version
 
     # Course Management Methods
     def add_course(self, name: str, teacher: Optional[str] = None,
@@ -55,9 +145,11 @@ class ScheduleManager:
 
                 if course_id > 0:
                     self.logger.log_message("info", f"Course added successfully with ID: {course_id}")
+                    self._invalidate_snapshot()
                     # Emit event if handler is available
                     if self.event_handler:
-                        self.event_handler.emit_course_added(course_id, name)
+                        self.event_handler.emit_course_added(
+                            course_id, name, record=self._changed_record("course", course_id))
                 else:
                     self.logger.log_message("warning", f"Failed to get course ID after insertion")
 
@@ -71,28 +163,11 @@ class ScheduleManager:
 
     def get_courses(self) -> List[Dict]:
         """Get all courses."""
-        self.logger.log_message("debug", "Fetching all courses")
-
-        with self.get_connection() as conn:
-            try:
-                cur = conn.cursor()
-                cur.execute("SELECT id, name, teacher, location, color FROM courses")
-                courses = []
-
-                for row in cur.fetchall():
-                    courses.append({
-                        "id": row[0],
-                        "name": row[1],
-                        "teacher": row[2],
-                        "location": row[3],
-                        "color": row[4]
-                    })
-
-                self.logger.log_message("debug", f"Retrieved {len(courses)} courses")
-                return courses
-            except Exception as e:
-                self.logger.log_message("error", f"Error fetching courses: {e}")
-                return []
+        try:
+            return self.get_snapshot().get_courses()
+        except Exception as e:
+            self.logger.log_message("error", f"Error fetching courses: {e}")
+            return []
 
     def update_course(self, course_id: int, **kwargs) -> bool:
         """Update course information."""
@@ -120,9 +195,11 @@ class ScheduleManager:
                 success = cur.rowcount > 0
                 if success:
                     self.logger.log_message("info", f"Course {course_id} updated successfully")
+                    self._invalidate_snapshot()
                     # Emit event if handler is available
                     if self.event_handler:
-                        self.event_handler.emit_course_updated(course_id, **fields_to_update)
+                        self.event_handler.emit_course_updated(
+                            course_id, record=self._changed_record("course", course_id), **fields_to_update)
                 else:
                     self.logger.log_message("warning", f"Course {course_id} not found")
 
@@ -147,14 +224,21 @@ class ScheduleManager:
                     self.logger.log_message("warning", f"Course {course_id} not found")
                     return False
 
+                # Entries removed along with the course, reported in the delete event
+                try:
+                    cascaded_ids = self.get_snapshot().entry_ids_for_course(course_id)
+                except Exception:
+                    cascaded_ids = []
+
                 # Delete course (CASCADE will handle schedule entries)
                 cur.execute("DELETE FROM courses WHERE id = ?", (course_id,))
                 conn.commit()
 
                 self.logger.log_message("info", f"Course '{course[0]}' (ID: {course_id}) deleted successfully")
+                self._invalidate_snapshot()
                 # Emit event if handler is available
                 if self.event_handler:
-                    self.event_handler.emit_course_deleted(course_id)
+                    self.event_handler.emit_course_deleted(course_id, cascaded_ids)
                 return True
             except Exception as e:
                 self.logger.log_message("error", f"Error deleting course: {e}")
@@ -189,7 +273,7 @@ class ScheduleManager:
                     return -1
 
                 # Check for time conflicts
-                if self._has_time_conflict(conn, day_of_week, start_time, end_time, weeks):
+                if self._has_time_conflict(day_of_week, start_time, end_time, weeks):
                     self.logger.log_message("warning", "Schedule conflict detected")
 
                 weeks_json = json.dumps(weeks) if weeks else None
@@ -198,64 +282,149 @@ class ScheduleManager:
                        VALUES (?, ?, ?, ?, ?, ?)""",
                     (course_id, day_of_week, start_time, end_time, weeks_json, note)
                 )
+                entry_id = cur.lastrowid if cur.lastrowid is not None else -1
+                if entry_id > 0:
+                    self._write_entry_weeks(cur, entry_id, weeks)
                 conn.commit()
 
-                entry_id = cur.lastrowid if cur.lastrowid is not None else -1
                 if entry_id > 0:
                     self.logger.log_message("info", f"Schedule entry added with ID: {entry_id}")
+                    self._invalidate_snapshot()
                     # Emit event if handler is available
                     if self.event_handler:
-                        self.event_handler.emit_schedule_added(entry_id, course_id, day_of_week, start_time, end_time)
+                        self.event_handler.emit_schedule_added(
+                            entry_id, course_id, day_of_week, start_time, end_time,
+                            record=self._changed_record("schedule", entry_id))
 
                 return entry_id
             except Exception as e:
                 self.logger.log_message("error", f"Error adding schedule entry: {e}")
                 return -1
 
-    def get_schedule(self, week: Optional[int] = None) -> List[Dict]:
-        """Get schedule for a specific week or all schedules."""
-        self.logger.log_message("debug", f"Fetching schedule for week: {week if week else 'all'}")
+    def bulk_import(self, courses: List[Dict], entries: List[Dict],
+                    replace_existing: bool = False) -> Dict:
+        """
+        Import courses and schedule entries in a single transaction.
+
+        Args:
+            courses: Course dicts (name, teacher, location, color) with a `ref`
+                key that entries use to point at them
+            entries: Entry dicts with course_ref, day_of_week, start_time,
+                end_time and optional weeks/note
+            replace_existing: Delete all existing courses and entries first
+
+        Returns:
+            Dict with courses_imported, schedule_imported, skipped (invalid
+            entries) and conflicts (clashing pairs involving imported entries)
+        """
+        self.logger.log_message("info",
+            f"Bulk importing {len(courses)} courses and {len(entries)} schedule entries")
+
+        course_rows = [c for c in courses if c.get("name")]
+        known_refs = {c.get("ref") for c in course_rows}
+
+        valid_entries = []
+        for entry in entries:
+            try:
+                day_of_week = int(entry.get("day_of_week"))
+                weeks = sorted({int(w) for w in entry.get("weeks") or []})
+            except (TypeError, ValueError):
+                continue
+            if (entry.get("course_ref") in known_refs and 1 <= day_of_week <= 7
+                    and self._validate_time_format(entry.get("start_time") or "")
+                    and self._validate_time_format(entry.get("end_time") or "")):
+                valid_entries.append({**entry, "day_of_week": day_of_week, "weeks": weeks})
+        skipped = len(entries) - len(valid_entries)
 
         with self.get_connection() as conn:
             try:
+                # Take the write lock up front so explicit IDs cannot collide
+                conn.execute("BEGIN IMMEDIATE")
                 cur = conn.cursor()
-                query = """
-                    SELECT s.id, s.course_id, c.name, c.teacher, c.location, c.color,
-                           s.day_of_week, s.start_time, s.end_time, s.weeks, s.note
-                    FROM schedule s
-                    JOIN courses c ON s.course_id = c.id
-                    ORDER BY s.day_of_week, s.start_time
-                """
-                cur.execute(query)
-
-                schedule = []
-                for row in cur.fetchall():
-                    weeks_json = row[9]
-                    weeks_list = json.loads(weeks_json) if weeks_json else []
-
-                    # Filter by week if specified
-                    if week is not None and weeks_list and week not in weeks_list:
-                        continue
-
-                    schedule.append({
-                        "id": row[0],
-                        "course_id": row[1],
-                        "course_name": row[2],
-                        "teacher": row[3],
-                        "location": row[4],
-                        "color": row[5],
-                        "day_of_week": row[6],
-                        "start_time": row[7],
-                        "end_time": row[8],
-                        "weeks": weeks_list,
-                        "note": row[10]
-                    })
-
-                self.logger.log_message("debug", f"Retrieved {len(schedule)} schedule entries")
-                return schedule
+
+                if replace_existing:
+                    cur.execute("DELETE FROM schedule")
+                    cur.execute("DELETE FROM courses")
+
+                course_ids = {}
+                next_course_id = self._next_id(cur, "courses")
+                course_params = []
+                for offset, course in enumerate(course_rows):
+                    course_id = next_course_id + offset
+                    course_ids.setdefault(course.get("ref"), course_id)
+                    course_params.append((course_id, course["name"], course.get("teacher"),
+                                          course.get("location"), course.get("color")))
+                cur.executemany(
+                    "INSERT INTO courses (id, name, teacher, location, color) VALUES (?, ?, ?, ?, ?)",
+                    course_params
+                )
+
+                next_entry_id = self._next_id(cur, "schedule")
+                entry_params = []
+                week_params = []
+                for offset, entry in enumerate(valid_entries):
+                    entry_id = next_entry_id + offset
+                    entry["id"] = entry_id
+                    entry["course_id"] = course_ids[entry["course_ref"]]
+                    weeks = entry["weeks"]
+                    entry_params.append((entry_id, entry["course_id"], entry["day_of_week"],
+                                         entry["start_time"], entry["end_time"],
+                                         json.dumps(weeks) if weeks else None, entry.get("note")))
+                    week_params.extend((entry_id, week) for week in weeks)
+                cur.executemany(
+                    """INSERT INTO schedule (id, course_id, day_of_week, start_time, end_time, weeks, note)
+                       VALUES (?, ?, ?, ?, ?, ?, ?)""",
+                    entry_params
+                )
+                cur.executemany("INSERT INTO schedule_weeks (entry_id, week) VALUES (?, ?)", week_params)
+
+                conn.commit()
             except Exception as e:
-                self.logger.log_message("error", f"Error fetching schedule: {e}")
-                return []
+                conn.rollback()
+                self.logger.log_message("error", f"Error during bulk import: {e}")
+                raise
+
+        snapshot = self.refresh_snapshot()
+        imported_ids = {entry["id"] for entry in valid_entries}
+        conflicts = [
+            pair for pair in ConflictEngine(snapshot.entries).report()
+            if pair["first"]["id"] in imported_ids or pair["second"]["id"] in imported_ids
+        ]
+        if conflicts:
+            self.logger.log_message("warning", f"Bulk import introduced {len(conflicts)} schedule conflicts")
+
+        result = {
+            "courses_imported": len(course_params),
+            "schedule_imported": len(entry_params),
+            "skipped": skipped,
+            "conflicts": conflicts,
+        }
+        self.logger.log_message("info",
+            f"Bulk import done: {result['courses_imported']} courses, "
+            f"{result['schedule_imported']} entries, {skipped} skipped")
+
+        if self.event_handler:
+            self.event_handler.emit_schedule_imported(
+                result["courses_imported"], result["schedule_imported"], replace_existing
+            )
+        return result
+
+    @staticmethod
+    def _next_id(cur: sqlite3.Cursor, table: str) -> int:
+        """Next AUTOINCREMENT id for a table (caller must hold the write lock)."""
+        cur.execute(f"SELECT COALESCE(MAX(id), 0) FROM {table}")
+        max_id = cur.fetchone()[0]
+        cur.execute("SELECT seq FROM sqlite_sequence WHERE name = ?", (table,))
+        row = cur.fetchone()
+        return max(max_id, row[0] if row else 0) + 1
+
+    def get_schedule(self, week: Optional[int] = None) -> List[Dict]:
+        """Get schedule for a specific week or all schedules."""
+        try:
+            return self.get_snapshot().get_schedule(week)
+        except Exception as e:
+            self.logger.log_message("error", f"Error fetching schedule: {e}")
+            return []
 
     def delete_schedule_entry(self, entry_id: int) -> bool:
         """Delete a schedule entry."""
@@ -270,6 +439,7 @@ class ScheduleManager:
                 success = cur.rowcount > 0
                 if success:
                     self.logger.log_message("info", f"Schedule entry {entry_id} deleted")
+                    self._invalidate_snapshot()
                     # Emit event if handler is available
                     if self.event_handler:
                         self.event_handler.emit_schedule_deleted(entry_id)
@@ -283,56 +453,27 @@ class ScheduleManager:
 
     def get_schedule_by_day(self, day_of_week: int, week: Optional[int] = None) -> List[Dict]:
         """Get all classes for a specific day, optionally filtered by week."""
-        self.logger.log_message("debug", f"Getting schedule for day {day_of_week}, week {week}")
-
-        with self.get_connection() as conn:
-            try:
-                cur = conn.cursor()
-                query = """
-                    SELECT s.id, c.name, c.teacher, c.location, s.day_of_week,
-                           s.start_time, s.end_time, s.weeks, c.color
-                    FROM schedule s
-                    JOIN courses c ON s.course_id = c.id
-                    WHERE s.day_of_week = ?
-                    ORDER BY s.start_time
-                """
-                cur.execute(query, (day_of_week,))
-
-                classes = []
-                for row in cur.fetchall():
-                    weeks_list = json.loads(row[7]) if row[7] else []
-
-                    # Filter by week if specified
-                    if week is not None and weeks_list and week not in weeks_list:
-                        continue
-
-                    classes.append({
-                        "id": row[0],
-                        "name": row[1],
-                        "teacher": row[2],
-                        "location": row[3],
-                        "day_of_week": row[4],
-                        "start_time": row[5],
-                        "end_time": row[6],
-                        "weeks": weeks_list,
-                        "color": row[8] if len(row) > 8 else None
-                    })
-
-                return classes
-            except Exception as e:
-                self.logger.log_message("error", f"Error getting schedule by day: {e}")
-                return []
+        try:
+            return self.get_snapshot().get_schedule_by_day(day_of_week, week)
+        except Exception as e:
+            self.logger.log_message("error", f"Error getting schedule by day: {e}")
+            return []
 
     def get_schedule_for_week(self, week: Optional[int] = None) -> List[Dict]:
         """Get all classes for the entire week, optionally filtered by week number."""
-        self.logger.log_message("debug", f"Getting schedule for week {week}")
-
-        all_classes = []
-        for day in range(1, 8):  # Monday to Sunday
-            day_classes = self.get_schedule_by_day(day, week)
-            all_classes.extend(day_classes)
+        try:
+            return self.get_snapshot().get_schedule_for_week(week)
+        except Exception as e:
+            self.logger.log_message("error", f"Error getting schedule for week: {e}")
+            return []
 
-        return all_classes
+    def get_schedule_for_week_grouped(self, week: Optional[int] = None) -> Dict[int, List[Dict]]:
+        """Get all classes for the entire week grouped by day of week (1-7)."""
+        try:
+            return self.get_snapshot().get_schedule_for_week_grouped(week)
+        except Exception as e:
+            self.logger.log_message("error", f"Error getting grouped schedule for week: {e}")
+            return {}
 
     # Utility Methods
     def _validate_time_format(self, time_str: str) -> bool:
@@ -343,40 +484,29 @@ class ScheduleManager:
         except:
             return False
 
-    def _has_time_conflict(self, conn: sqlite3.Connection, day_of_week: int,
-                          start_time: str, end_time: str,
-                          weeks: Optional[List[int]] = None) -> bool:
+    def _write_entry_weeks(self, cur: sqlite3.Cursor, entry_id: int,
+                           weeks: Optional[List[int]]) -> None:
+        """Store an entry's week membership in the normalized schedule_weeks table."""
+        cur.execute("DELETE FROM schedule_weeks WHERE entry_id = ?", (entry_id,))
+        if weeks:
+            cur.executemany(
+                "INSERT INTO schedule_weeks (entry_id, week) VALUES (?, ?)",
+                [(entry_id, week) for week in sorted(set(weeks))]
+            )
+
+    def _has_time_conflict(self, day_of_week: int, start_time: str, end_time: str,
+                           weeks: Optional[List[int]] = None) -> bool:
         """Check if there's a time conflict with existing schedule."""
         try:
-            cur = conn.cursor()
-            query = """
-                SELECT s.id, s.start_time, s.end_time, s.weeks, c.name
-                FROM schedule s
-                JOIN courses c ON s.course_id = c.id
-                WHERE s.day_of_week = ?
-            """
-            cur.execute(query, (day_of_week,))
-
-            for row in cur.fetchall():
-                existing_start = row[1]
-                existing_end = row[2]
-                existing_weeks = json.loads(row[3]) if row[3] else []
-
-                # Check time overlap
-                if not (end_time <= existing_start or start_time >= existing_end):
-                    # Check week overlap
-                    if not weeks or not existing_weeks:
-                        self.logger.log_message("warning",
-                            f"Time conflict with course '{row[4]}' ({existing_start}-{existing_end})")
-                        return True
-
-                    week_overlap = set(weeks) & set(existing_weeks)
-                    if week_overlap:
-                        self.logger.log_message("warning",
-                            f"Time conflict with course '{row[4]}' in weeks {week_overlap}")
-                        return True
+            conflicts = self.get_conflict_engine().find_conflicts(day_of_week, start_time, end_time, weeks)
+            if not conflicts:
+                return False
 
-            return False
+            first = conflicts[0]
+            self.logger.log_message("warning",
+                f"Time conflict with course '{first['course_name']}' "
+                f"({first['start_time']}-{first['end_time']}) in weeks {first['conflict_weeks']}")
+            return True
         except Exception as e:
             self.logger.log_message("error", f"Error checking time conflict: {e}")
             return False
@@ -387,10 +517,7 @@ class ScheduleManager:
             return 1
 
         try:
-            start_date = datetime.strptime(semester_start_date, "%Y-%m-%d")
-            current_date = datetime.now()
-            days_diff = (current_date - start_date).days
-            return max(1, (days_diff // 7) + 1)
+            return week_from_start(parse_start_date(semester_start_date), date.today())
         except Exception as e:
             self.logger.log_message("error", f"Error calculating week number: {e}")
             return 1
@@ -413,70 +540,29 @@ class ScheduleManager:
         """
         self.logger.log_message("debug", f"Checking conflicts for {day_of_week} {start_time}-{end_time}")
 
-        with self.get_connection() as conn:
-            try:
-                cur = conn.cursor()
-                query = """
-                    SELECT s.id, c.name, c.teacher, c.location, s.start_time, s.end_time,
-                           s.day_of_week, s.weeks
-                    FROM schedule s
-                    JOIN courses c ON s.course_id = c.id
-                    WHERE s.day_of_week = ?
-                """
-                params = [day_of_week]
-
-                # Exclude specific entry if editing
-                if exclude_entry_id:
-                    query += " AND s.id != ?"
-                    params.append(exclude_entry_id)
-
-                cur.execute(query, params)
-
-                conflicts = []
-                for row in cur.fetchall():
-                    existing_id = row[0]
-                    existing_name = row[1]
-                    existing_teacher = row[2]
-                    existing_location = row[3]
-                    existing_start = row[4]
-                    existing_end = row[5]
-                    existing_day = row[6]
-                    existing_weeks = json.loads(row[7]) if row[7] else []
-
-                    # Check time overlap
-                    if not (end_time <= existing_start or start_time >= existing_end):
-                        # Check week overlap
-                        conflict_weeks = []
-
-                        if not weeks or not existing_weeks:
-                            # If either has no week restriction, it conflicts for all weeks
-                            conflict_weeks = weeks if weeks else existing_weeks if existing_weeks else [1]
-                        else:
-                            # Calculate actual conflicting weeks
-                            conflict_weeks = list(set(weeks) & set(existing_weeks))
-
-                        if conflict_weeks or (not weeks and not existing_weeks):
-                            conflicts.append({
-                                "id": existing_id,
-                                "course_name": existing_name,
-                                "teacher": existing_teacher,
-                                "location": existing_location,
-                                "start_time": existing_start,
-                                "end_time": existing_end,
-                                "day_of_week": existing_day,
-                                "weeks": existing_weeks,
-                                "conflict_weeks": conflict_weeks
-                            })
-
-                            self.logger.log_message("warning",
-                                f"Conflict detected with '{existing_name}' ({existing_start}-{existing_end}) "
-                                f"in weeks {conflict_weeks}")
-
-                return conflicts
+        try:
+            conflicts = self.get_conflict_engine().find_conflicts(
+                day_of_week, start_time, end_time, weeks, exclude_entry_id
+            )
+            for conflict in conflicts:
+                self.logger.log_message("warning",
+                    f"Conflict detected with '{conflict['course_name']}' "
+                    f"({conflict['start_time']}-{conflict['end_time']}) "
+                    f"in weeks {conflict['conflict_weeks']}")
+            return conflicts
+        except Exception as e:
+            self.logger.log_message("error", f"Error checking conflicts: {e}")
+            return []
 
-            except Exception as e:
-                self.logger.log_message("error", f"Error checking conflicts: {e}")
-                return []
+    def get_conflict_report(self) -> List[Dict]:
+        """Find every pair of conflicting entries in the whole timetable."""
+        try:
+            report = self.get_conflict_engine().report()
+            self.logger.log_message("info", f"Conflict report: {len(report)} conflicting pairs")
+            return report
+        except Exception as e:
+            self.logger.log_message("error", f"Error building conflict report: {e}")
+            return []
 
     def get_statistics(self) -> Dict:
         """Get schedule statistics."""
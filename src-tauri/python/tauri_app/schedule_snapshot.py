@@ -0,0 +1,191 @@
+"""
+In-memory schedule snapshot for ClassTop application.
+Holds an immutable, versioned copy of courses and schedule entries indexed by
+day and by week so schedule reads never touch SQLite.
+"""
+
+import sqlite3
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional, Tuple
+
+Record = Mapping[str, object]
+
+_EMPTY: Tuple[Record, ...] = ()
+
+
+def _thaw(record: Record) -> Dict:
+    """Return a mutable copy of a frozen record for callers."""
+    item = dict(record)
+    item["weeks"] = list(item["weeks"])
+    return item
+
+
+class ScheduleSnapshot:
+    """Immutable view of the timetable at a given version.
+
+    Records are stored as read-only mappings and copied on the way out, so a
+    caller mutating a returned dict can never corrupt the shared snapshot.
+    Entries without a week restriction apply to every week, which is why the
+    per-week indexes fall back to the unrestricted entries for weeks no entry
+    mentions explicitly.
+    """
+
+    __slots__ = (
+        "version", "courses", "entries", "classes",
+        "_by_day", "_by_week", "_unrestricted",
+        "_by_day_week", "_unrestricted_by_day",
+        "_classes_by_week", "_unrestricted_classes",
+        "_course_index", "_entry_index",
+    )
+
+    def __init__(self, version: int, courses: List[Dict], entries: List[Dict]):
+        self.version = version
+        self.courses: Tuple[Record, ...] = tuple(
+            MappingProxyType(dict(c)) for c in sorted(courses, key=lambda c: c["id"])
+        )
+
+        entries = sorted(entries, key=lambda e: (e["day_of_week"], e["start_time"], e["id"]))
+        frozen = []
+        day_records = []
+        for e in entries:
+            weeks = tuple(e["weeks"])
+            frozen.append(MappingProxyType({**e, "weeks": weeks}))
+            day_records.append(MappingProxyType({
+                "id": e["id"],
+                "name": e["course_name"],
+                "teacher": e["teacher"],
+                "location": e["location"],
+                "day_of_week": e["day_of_week"],
+                "start_time": e["start_time"],
+                "end_time": e["end_time"],
+                "weeks": weeks,
+                "color": e["color"],
+            }))
+        self.entries: Tuple[Record, ...] = tuple(frozen)
+        self._course_index = {c["id"]: c for c in self.courses}
+        self._entry_index = {e["id"]: e for e in frozen}
+        # Same entries in class shape, already in (day, start_time) order
+        self.classes: Tuple[Record, ...] = tuple(day_records)
+
+        by_day: Dict[int, List[Record]] = {}
+        mentioned_weeks = set()
+        for record, day_record in zip(frozen, day_records):
+            by_day.setdefault(record["day_of_week"], []).append(day_record)
+            mentioned_weeks.update(record["weeks"])
+
+        self._by_day = {day: tuple(records) for day, records in by_day.items()}
+        self._unrestricted = tuple(r for r in frozen if not r["weeks"])
+        self._unrestricted_classes = tuple(r for r in self.classes if not r["weeks"])
+        self._unrestricted_by_day = {
+            day: tuple(r for r in records if not r["weeks"])
+            for day, records in self._by_day.items()
+        }
+
+        self._by_week: Dict[int, Tuple[Record, ...]] = {}
+        self._by_day_week: Dict[Tuple[int, int], Tuple[Record, ...]] = {}
+        self._classes_by_week: Dict[int, Tuple[Record, ...]] = {}
+        for week in mentioned_weeks:
+            self._by_week[week] = tuple(
+                r for r in frozen if not r["weeks"] or week in r["weeks"]
+            )
+            self._classes_by_week[week] = tuple(
+                r for r in self.classes if not r["weeks"] or week in r["weeks"]
+            )
+            for day, records in self._by_day.items():
+                self._by_day_week[(day, week)] = tuple(
+                    r for r in records if not r["weeks"] or week in r["weeks"]
+                )
+
+    @classmethod
+    def load(cls, conn: sqlite3.Connection, version: int) -> "ScheduleSnapshot":
+        """Build a snapshot from the database."""
+        cur = conn.cursor()
+        cur.execute("SELECT id, name, teacher, location, color FROM courses")
+        courses = [
+            {"id": row[0], "name": row[1], "teacher": row[2], "location": row[3], "color": row[4]}
+            for row in cur.fetchall()
+        ]
+
+        # Week membership comes from the normalized schedule_weeks table
+        # instead of decoding every row's JSON weeks column.
+        weeks_by_entry: Dict[int, List[int]] = {}
+        cur.execute("SELECT entry_id, week FROM schedule_weeks ORDER BY entry_id, week")
+        for entry_id, week in cur.fetchall():
+            weeks_by_entry.setdefault(entry_id, []).append(week)
+
+        cur.execute("""
+            SELECT s.id, s.course_id, c.name, c.teacher, c.location, c.color,
+                   s.day_of_week, s.start_time, s.end_time, s.note
+            FROM schedule s
+            JOIN courses c ON s.course_id = c.id
+        """)
+        entries = [
+            {
+                "id": row[0],
+                "course_id": row[1],
+                "course_name": row[2],
+                "teacher": row[3],
+                "location": row[4],
+                "color": row[5],
+                "day_of_week": row[6],
+                "start_time": row[7],
+                "end_time": row[8],
+                "weeks": weeks_by_entry.get(row[0], []),
+                "note": row[9],
+            }
+            for row in cur.fetchall()
+        ]
+        return cls(version, courses, entries)
+
+    def get_courses(self) -> List[Dict]:
+        """All courses ordered by ID."""
+        return [dict(c) for c in self.courses]
+
+    def get_course(self, course_id: int) -> Optional[Dict]:
+        """One course by ID, or None."""
+        course = self._course_index.get(course_id)
+        return dict(course) if course is not None else None
+
+    def get_entry(self, entry_id: int) -> Optional[Dict]:
+        """One schedule entry (course-joined shape) by ID, or None."""
+        entry = self._entry_index.get(entry_id)
+        return _thaw(entry) if entry is not None else None
+
+    def entry_ids_for_course(self, course_id: int) -> List[int]:
+        """IDs of the schedule entries that belong to a course."""
+        return [e["id"] for e in self.entries if e["course_id"] == course_id]
+
+    def get_schedule(self, week: Optional[int] = None) -> List[Dict]:
+        """All entries (course-joined shape), optionally filtered by week."""
+        if week is None:
+            records = self.entries
+        else:
+            records = self._by_week.get(week, self._unrestricted)
+        return [_thaw(r) for r in records]
+
+    def get_schedule_by_day(self, day_of_week: int, week: Optional[int] = None) -> List[Dict]:
+        """Entries for one day (class shape), optionally filtered by week."""
+        if week is None:
+            records = self._by_day.get(day_of_week, _EMPTY)
+        else:
+            records = self._by_day_week.get(
+                (day_of_week, week), self._unrestricted_by_day.get(day_of_week, _EMPTY)
+            )
+        return [_thaw(r) for r in records]
+
+    def week_classes(self, week: Optional[int] = None) -> Tuple[Record, ...]:
+        """Frozen class-shape records for a week in day/start order (no copies)."""
+        if week is None:
+            return self.classes
+        return self._classes_by_week.get(week, self._unrestricted_classes)
+
+    def get_schedule_for_week(self, week: Optional[int] = None) -> List[Dict]:
+        """Entries for the whole week (class shape) in day/start order, in one pass."""
+        return [_thaw(r) for r in self.week_classes(week)]
+
+    def get_schedule_for_week_grouped(self, week: Optional[int] = None) -> Dict[int, List[Dict]]:
+        """Entries for the whole week grouped by day (1-7); days without classes map to []."""
+        grouped: Dict[int, List[Dict]] = {day: [] for day in range(1, 8)}
+        for r in self.week_classes(week):
+            grouped[r["day_of_week"]].append(_thaw(r))
+        return grouped
@@ -0,0 +1,84 @@
+"""
+Week timeline for ClassTop application.
+Precomputes sorted class boundaries (minutes since the start of the week) so
+current/next/last class lookups are a bisect instead of a scan.
+"""
+
+from bisect import bisect_left, bisect_right
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+from .conflict_engine import to_minutes
+
+MINUTES_PER_DAY = 24 * 60
+
+
+def week_offset(day_of_week: int, minute_of_day: int) -> int:
+    """Minutes since Monday 00:00 for a day (1-7) and minute of that day."""
+    return (day_of_week - 1) * MINUTES_PER_DAY + minute_of_day
+
+
+class ScheduleTimeline:
+    """Class boundaries for one teaching week.
+
+    Built from class records (e.g. ScheduleSnapshot.week_classes()).
+    Besides the start offsets it keeps a running maximum of end offsets,
+    which is monotonic and therefore bisectable: the first index whose
+    running max reaches t is also the first class ending at or after t.
+    """
+
+    __slots__ = ("week", "version", "_classes", "_starts", "_max_end",
+                 "_day_bounds")
+
+    def __init__(self, classes: Sequence[Mapping], week: Optional[int], version: int):
+        self.week = week
+        self.version = version
+        bounds = []
+        for cls in classes:
+            day = cls["day_of_week"]
+            bounds.append((week_offset(day, to_minutes(cls["start_time"])),
+                           week_offset(day, to_minutes(cls["end_time"])), cls))
+        # Stable sort keeps the input's tie order for classes starting together
+        bounds.sort(key=lambda b: b[0])
+
+        self._classes = [b[2] for b in bounds]
+        self._starts: List[int] = []
+        self._max_end: List[int] = []
+        self._day_bounds: Dict[int, Tuple[int, int]] = {}
+
+        running = -1
+        for index, (start, end, cls) in enumerate(bounds):
+            day = cls["day_of_week"]
+            running = max(running, end)
+            self._starts.append(start)
+            self._max_end.append(running)
+            lo, _ = self._day_bounds.get(day, (index, index))
+            self._day_bounds[day] = (lo, index + 1)
+
+    def __len__(self) -> int:
+        return len(self._classes)
+
+    def _result(self, index: int) -> Dict:
+        cls = dict(self._classes[index])
+        cls["weeks"] = list(cls["weeks"])
+        return cls
+
+    def current(self, day_of_week: int, minute_of_day: int) -> Optional[Dict]:
+        """First class of the day with start <= now <= end."""
+        lo, hi = self._day_bounds.get(day_of_week, (0, 0))
+        now = week_offset(day_of_week, minute_of_day)
+        started = bisect_right(self._starts, now, lo, hi)
+        index = bisect_left(self._max_end, now, lo, started)
+        return self._result(index) if index < started else None
+
+    def next(self, day_of_week: int, minute_of_day: int) -> Optional[Dict]:
+        """Next class starting after now, wrapping around to the start of the week."""
+        if not self._classes:
+            return None
+        index = bisect_right(self._starts, week_offset(day_of_week, minute_of_day))
+        return self._result(index if index < len(self._classes) else 0)
+
+    def last(self, day_of_week: int, minute_of_day: int) -> Optional[Dict]:
+        """Latest class of the day in the leading run of classes that have all ended."""
+        lo, hi = self._day_bounds.get(day_of_week, (0, 0))
+        first_running = bisect_right(self._max_end, week_offset(day_of_week, minute_of_day), lo, hi)
+        return self._result(first_running - 1) if first_running > lo else None
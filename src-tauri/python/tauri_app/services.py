@@ -0,0 +1,179 @@
+"""
+Service supervisor for ClassTop application.
+Runs long-lived background services as tasks on the shared anyio portal
+event loop (instead of one thread and event loop per service), restarts
+them after crashes and reports their health.
+"""
+
+import asyncio
+import time
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from . import logger
+
+STOPPED = "stopped"
+RUNNING = "running"
+RESTARTING = "restarting"
+FAILED = "failed"
+
+
+class _Service:
+    __slots__ = ("name", "run", "restart_on_failure", "restart_delay", "state",
+                 "task", "started_at", "restarts", "last_error", "last_error_at")
+
+    def __init__(self, name: str, run: Callable[[], Awaitable[None]],
+                 restart_on_failure: bool, restart_delay: float):
+        self.name = name
+        self.run = run
+        self.restart_on_failure = restart_on_failure
+        self.restart_delay = restart_delay
+        self.state = STOPPED
+        self.task: Optional[asyncio.Task] = None
+        self.started_at: Optional[float] = None
+        self.restarts = 0
+        self.last_error: Optional[str] = None
+        self.last_error_at: Optional[float] = None
+
+
+class ServiceSupervisor:
+    """Hosts registered services as tasks on the portal's event loop.
+
+    start/stop/restart may be called from any thread, including the loop
+    thread itself: task creation and cancellation always happen on the loop.
+    """
+
+    def __init__(self, portal):
+        self.portal = portal
+        self.loop: asyncio.AbstractEventLoop = portal.call(asyncio.get_running_loop)
+        self.logger = logger
+        self._services: Dict[str, _Service] = {}
+
+    def register(self, name: str, run: Callable[[], Awaitable[None]],
+                 restart_on_failure: bool = True, restart_delay: float = 5.0) -> None:
+        """Register a service; `run` is a coroutine function that runs until cancelled.
+
+        If `run` raises, the service is restarted after `restart_delay` seconds
+        (unless restart_on_failure is False, in which case it is marked failed).
+        """
+        if name in self._services:
+            raise ValueError(f"Service already registered: {name}")
+        self._services[name] = _Service(name, run, restart_on_failure, restart_delay)
+
+    def _get(self, name: str) -> _Service:
+        try:
+            return self._services[name]
+        except KeyError:
+            raise ValueError(f"Unknown service: {name}")
+
+    def _on_loop(self, func: Callable[..., Any], *args) -> Any:
+        """Run a synchronous function on the supervisor loop and return its result."""
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self.loop:
+            return func(*args)
+        return self.portal.call(func, *args)
+
+    def is_running(self, name: str) -> bool:
+        """Whether the service has a live task (running or waiting to restart)."""
+        task = self._get(name).task
+        return task is not None and not task.done()
+
+    def start(self, name: str) -> bool:
+        """Start a service. Returns False if it was already running."""
+        service = self._get(name)
+        return self._on_loop(self._start_on_loop, service)
+
+    def stop(self, name: str) -> bool:
+        """Cancel a service's task. Returns False if it was not running."""
+        service = self._get(name)
+        return self._on_loop(self._stop_on_loop, service)
+
+    def restart(self, name: str) -> None:
+        """Stop the service if running, then start a fresh task."""
+        service = self._get(name)
+
+        def restart_on_loop():
+            self._stop_on_loop(service)
+            self._start_on_loop(service)
+
+        self._on_loop(restart_on_loop)
+        self.logger.log_message("info", f"Service restarted: {name}")
+
+    def _start_on_loop(self, service: _Service) -> bool:
+        if service.task is not None and not service.task.done():
+            return False
+        service.task = self.loop.create_task(self._supervise(service), name=f"service:{service.name}")
+        return True
+
+    def _stop_on_loop(self, service: _Service) -> bool:
+        task = service.task
+        if task is None or task.done():
+            return False
+        task.cancel()
+        # Forget the task right away so an immediate start() creates a new one
+        service.task = None
+        service.state = STOPPED
+        return True
+
+    async def _supervise(self, service: _Service) -> None:
+        try:
+            while True:
+                service.state = RUNNING
+                service.started_at = time.time()
+                self.logger.log_message("info", f"Service started: {service.name}")
+                try:
+                    await service.run()
+                    service.state = STOPPED
+                    self.logger.log_message("info", f"Service finished: {service.name}")
+                    return
+                except Exception as e:
+                    service.last_error = f"{type(e).__name__}: {e}"
+                    service.last_error_at = time.time()
+                    if not service.restart_on_failure:
+                        service.state = FAILED
+                        self.logger.log_message("error", f"Service {service.name} failed: {e}")
+                        return
+                    service.state = RESTARTING
+                    service.restarts += 1
+                    self.logger.log_message(
+                        "error", f"Service {service.name} crashed, restarting in {service.restart_delay}s: {e}")
+                    await asyncio.sleep(service.restart_delay)
+        except asyncio.CancelledError:
+            # Tasks cancelled through stop() were already detached
+            if service.task is asyncio.current_task():
+                service.state = STOPPED
+            self.logger.log_message("info", f"Service stopped: {service.name}")
+            raise
+
+    def health(self) -> Dict[str, Dict[str, Any]]:
+        """State, uptime, restart count and last error for every service."""
+        now = time.time()
+        report = {}
+        for name, service in self._services.items():
+            running = service.state == RUNNING and service.started_at is not None
+            report[name] = {
+                "state": service.state,
+                "uptime_seconds": round(now - service.started_at, 1) if running else None,
+                "restarts": service.restarts,
+                "last_error": service.last_error,
+                "last_error_at": (datetime.fromtimestamp(service.last_error_at).isoformat()
+                                  if service.last_error_at else None),
+            }
+        return report
+
+    def shutdown(self, timeout: float = 5.0) -> None:
+        """Cancel all services and wait for them to finish (call before the portal closes)."""
+        async def stop_all():
+            tasks = [s.task for s in self._services.values() if s.task is not None and not s.task.done()]
+            for task in tasks:
+                task.cancel()
+            if tasks:
+                await asyncio.wait(tasks, timeout=timeout)
+
+        try:
+            self.portal.call(stop_all)
+        except Exception as e:
+            self.logger.log_message("warning", f"Error stopping services: {e}")
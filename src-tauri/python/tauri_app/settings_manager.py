@@ -1,9 +1,12 @@
 """Settings Manager - 统一管理应用设置"""
-import sqlite3
+import threading
 import uuid
 from pathlib import Path
-from typing import Dict, Optional, Any
+from types import MappingProxyType
+from typing import Callable, Dict, Iterable, List, Mapping, Optional, Any, Tuple
 from . import logger
+from .connection_pool import get_pool
+from .settings_schema import parse_setting, validate_setting
 
 APP_DIR = Path.home() / ".classtop"
 
@@ -34,6 +37,7 @@ class SettingsManager:
 
         # 课程设置
         'semester_start_date': '',
+        'vacation_weeks': '',  # 假期周，如 "8,9" 或 "8-9"
 
         # 控制模式
         'control_mode': 'touch',  # 'touch' or 'mouse'
@@ -56,9 +60,19 @@ class SettingsManager:
         # 课程提醒设置
         'reminder_enabled': 'true',  # 是否启用课程提醒
         'reminder_minutes': '10',  # 提前多少分钟提醒（可选: 5, 10, 15, 30）
+        'reminder_offsets': '',  # 多次提醒的提前量，如 "15,2"；为空时使用 reminder_minutes
+        'reminder_end_notice': 'false',  # 是否在下课时提醒
         'reminder_sound': 'true',  # 是否播放提示音
+
+        # 日志设置
+        'log_level': 'DEBUG',  # 最低日志级别: TRACE/DEBUG/INFO/SUCCESS/WARNING/ERROR/CRITICAL
     }
 
+    _UPSERT_SQL = (
+        "INSERT INTO settings(key, value) VALUES(?, ?) "
+        "ON CONFLICT(key) DO UPDATE SET value=excluded.value"
+    )
+
     def __init__(self, db_path: Path, event_handler):
         """初始化设置管理器
 
@@ -68,36 +82,126 @@ class SettingsManager:
         self.db_path = db_path
         self.event_handler = event_handler
         self.logger = logger
+        self.pool = get_pool(db_path)
+        # 订阅者列表：(关注的键集合，None 表示全部键; 回调)
+        self._subscribers: List[Tuple[Optional[frozenset], Callable[[Dict[str, Any]], None]]] = []
+
+        # 内存缓存：整表只读视图，写入时复制替换（copy-on-write）
+        self._cache: Optional[Mapping[str, str]] = None
+        self._write_lock = threading.RLock()
+        # 类型化值缓存 {key: (原始字符串, 解析后的值)}，原始字符串变化时重新解析
+        self._parsed: Dict[str, Tuple[str, Any]] = {}
         self.logger.log_message("info", "SettingsManager initialized")
 
-    def get_connection(self):
-        """获取数据库连接"""
-        return sqlite3.connect(self.db_path)
+    def subscribe(self, keys: Optional[Iterable[str]],
+                  callback: Callable[[Dict[str, Any]], None]) -> Callable[[], None]:
+        """订阅设置变更
 
-    def initialize_defaults(self) -> None:
-        """初始化默认设置（如果不存在）"""
-        self.logger.log_message("info", "Initializing default settings")
+        设置写入成功后，以 {key: 类型化的新值} 调用回调，只包含订阅的键。
+
+        Args:
+            keys: 关注的设置键，None 表示所有键
+            callback: 回调函数
+
+        Returns:
+            取消订阅的函数
+        """
+        entry = (frozenset(keys) if keys is not None else None, callback)
+        self._subscribers.append(entry)
+
+        def unsubscribe() -> None:
+            if entry in self._subscribers:
+                self._subscribers.remove(entry)
+
+        return unsubscribe
+
+    def _notify_changed(self, keys: List[str]) -> None:
+        """通知订阅者设置已变更"""
+        for watched, callback in list(self._subscribers):
+            relevant = [k for k in keys if watched is None or k in watched]
+            if not relevant:
+                continue
+            try:
+                callback({k: self.get_typed(k) for k in relevant})
+            except Exception as e:
+                self.logger.log_message("error", f"Settings subscriber failed: {e}")
+
+    def get_connection(self):
+        """获取当前线程的复用数据库连接（上下文管理器）"""
+        return self.pool.connection()
 
+    def _read_table(self) -> Dict[str, str]:
+        """从数据库读取整个设置表"""
         with self.get_connection() as conn:
             cur = conn.cursor()
+            cur.execute("SELECT key, value FROM settings")
+            return {k: v for k, v in cur.fetchall()}
+
+    def _settings(self) -> Mapping[str, str]:
+        """返回设置缓存视图，首次访问时从数据库加载"""
+        cache = self._cache
+        if cache is None:
+            with self._write_lock:
+                if self._cache is None:
+                    self._cache = MappingProxyType(self._read_table())
+                cache = self._cache
+        return cache
+
+    def _apply_to_cache(self, updates: Dict[str, str]) -> None:
+        """将已写入数据库的值合并到缓存（复制后整体替换，读者无需加锁）"""
+        if self._cache is None:
+            return
+        merged = dict(self._cache)
+        merged.update(updates)
+        self._cache = MappingProxyType(merged)
+
+    def reload(self) -> List[str]:
+        """从数据库重新加载设置缓存，用于感知其他进程/连接的直接写入
+
+        Returns:
+            值发生变化的设置键列表
+        """
+        with self._write_lock:
+            old = self._cache or {}
+            fresh = self._read_table()
+            self._cache = MappingProxyType(fresh)
+
+        changed = [k for k in fresh.keys() | old.keys() if fresh.get(k) != old.get(k)]
+        if changed:
+            self._notify_changed(changed)
+            self.logger.log_message("info", f"Settings reloaded, {len(changed)} changed")
+        return changed
+
+    def _default_values(self, exclude_keys: Optional[list] = None) -> Dict[str, str]:
+        """生成默认设置值（可调用的默认值如 uuid 会被调用）"""
+        exclude = set(exclude_keys or [])
+        return {
+            key: str(default() if callable(default) else default)
+            for key, default in self.DEFAULT_SETTINGS.items()
+            if key not in exclude
+        }
 
-            for key, default_value in self.DEFAULT_SETTINGS.items():
-                # 检查设置是否已存在
-                cur.execute("SELECT value FROM settings WHERE key=?", (key,))
-                existing = cur.fetchone()
+    def initialize_defaults(self) -> None:
+        """初始化默认设置（如果不存在）
 
-                if not existing:
-                    # 如果默认值是函数（如 uuid），调用它
-                    value = default_value() if callable(default_value) else default_value
-                    cur.execute(
-                        "INSERT INTO settings(key, value) VALUES(?, ?)",
-                        (key, str(value))
-                    )
-                    self.logger.log_message("debug", f"Initialized setting: {key} = {value}")
+        在同一事务中 INSERT OR IGNORE 全部默认值并读回整表，填充内存缓存。
+        """
+        self.logger.log_message("info", "Initializing default settings")
 
-            conn.commit()
+        with self._write_lock:
+            with self.get_connection() as conn:
+                cur = conn.cursor()
+                before = conn.total_changes
+                cur.executemany(
+                    "INSERT OR IGNORE INTO settings(key, value) VALUES(?, ?)",
+                    self._default_values().items()
+                )
+                inserted = conn.total_changes - before
+                cur.execute("SELECT key, value FROM settings")
+                self._cache = MappingProxyType({k: v for k, v in cur.fetchall()})
+                conn.commit()
 
-        self.logger.log_message("info", "Default settings initialized")
+        self.logger.log_message("info", f"Default settings initialized ({inserted} added)")
 
     def get_setting(self, key: str) -> Optional[str]:
         """获取单个设置值
@@ -108,11 +212,51 @@ class SettingsManager:
         Returns:
             设置值，如果不存在返回 None
         """
-        with self.get_connection() as conn:
-            cur = conn.cursor()
-            cur.execute("SELECT value FROM settings WHERE key=?", (key,))
-            row = cur.fetchone()
-            return row[0] if row else None
+        return self._settings().get(key)
+
+    def _typed_default(self, key: str) -> Any:
+        """DEFAULT_SETTINGS 中的默认值（解析后）"""
+        default = self.DEFAULT_SETTINGS.get(key)
+        if default is None or callable(default):
+            return None
+        return parse_setting(key, default)
+
+    def get_typed(self, key: str, default: Any = None) -> Any:
+        """获取按 schema 解析后的设置值
+
+        解析结果会缓存，值未变化时不再重复解析。
+
+        Args:
+            key: 设置键名
+            default: 设置不存在或非法时的返回值，None 时使用 DEFAULT_SETTINGS 中的默认值
+
+        Returns:
+            类型化的设置值
+        """
+        raw = self._settings().get(key)
+        cached = self._parsed.get(key)
+        if raw is not None and cached is not None and cached[0] is raw:
+            return cached[1]
+
+        if raw is None:
+            return default if default is not None else self._typed_default(key)
+        try:
+            value = parse_setting(key, raw)
+        except ValueError as e:
+            self.logger.log_message("warning", f"{e}, using default")
+            return default if default is not None else self._typed_default(key)
+        self._parsed[key] = (raw, value)
+        return value
+
+    def get_bool(self, key: str, default: bool = False) -> bool:
+        """获取布尔类型设置"""
+        value = self.get_typed(key)
+        return default if value is None else bool(value)
+
+    def get_int(self, key: str, default: int = 0) -> int:
+        """获取整数类型设置"""
+        value = self.get_typed(key)
+        return default if value is None else int(value)
 
     def set_setting(self, key: str, value: str) -> bool:
         """设置单个设置值
@@ -124,16 +268,21 @@ class SettingsManager:
         Returns:
             是否成功
         """
+        error = validate_setting(key, str(value))
+        if error:
+            self.logger.log_message("error", f"Error setting {key}: {error}")
+            return False
+
         try:
-            with self.get_connection() as conn:
-                cur = conn.cursor()
-                cur.execute(
-                    "INSERT INTO settings(key, value) VALUES(?, ?) "
-                    "ON CONFLICT(key) DO UPDATE SET value=excluded.value",
-                    (key, str(value))
-                )
-                conn.commit()
-                
+            with self._write_lock:
+                with self.get_connection() as conn:
+                    cur = conn.cursor()
+                    cur.execute(self._UPSERT_SQL, (key, str(value)))
+                    conn.commit()
+                self._apply_to_cache({key: str(value)})
+
+            self._notify_changed([key])
+
             # Emit event if handler is available
             if self.event_handler:
                 self.event_handler.emit_setting_update(key, value)
@@ -144,16 +293,34 @@ class SettingsManager:
             self.logger.log_message("error", f"Error setting {key}: {e}")
             return False
 
-    def get_all_settings(self) -> Dict[str, str]:
+    def get_all_settings(self) -> Mapping[str, str]:
         """获取所有设置
 
         Returns:
-            设置字典 {key: value}
+            设置的只读视图 {key: value}，序列化前需 dict() 转换
         """
-        with self.get_connection() as conn:
-            cur = conn.cursor()
-            cur.execute("SELECT key, value FROM settings")
-            return {k: v for k, v in cur.fetchall()}
+        return self._settings()
+
+    def _write_many(self, settings: Dict[str, str]) -> None:
+        """在一个事务中批量写入设置并更新缓存、通知订阅者、发送一次批量事件
+
+        Raises:
+            ValueError: 任一值不符合 schema 时整批不写入
+        """
+        values = {key: str(value) for key, value in settings.items()}
+        errors = [e for e in (validate_setting(k, v) for k, v in values.items()) if e]
+        if errors:
+            raise ValueError("; ".join(errors))
+        with self._write_lock:
+            with self.pool.transaction() as conn:
+                conn.executemany(self._UPSERT_SQL, values.items())
+            self._apply_to_cache(values)
+
+        self._notify_changed(list(values.keys()))
+
+        # Emit batch update event
+        if self.event_handler:
+            self.event_handler.emit_settings_batch_updated(list(values.keys()), values)
 
     def update_multiple(self, settings: Dict[str, str]) -> bool:
         """批量更新设置
@@ -165,20 +332,7 @@ class SettingsManager:
             是否全部成功
         """
         try:
-            with self.get_connection() as conn:
-                cur = conn.cursor()
-                for key, value in settings.items():
-                    cur.execute(
-                        "INSERT INTO settings(key, value) VALUES(?, ?) "
-                        "ON CONFLICT(key) DO UPDATE SET value=excluded.value",
-                        (key, str(value))
-                    )
-                conn.commit()
-
-            # Emit batch update event
-            if self.event_handler:
-                self.event_handler.emit_settings_batch_updated(list(settings.keys()))
-
+            self._write_many(settings)
             self.logger.log_message("info", f"Updated {len(settings)} settings")
             return True
         except Exception as e:
@@ -205,14 +359,8 @@ class SettingsManager:
         Returns:
             是否成功
         """
-        exclude_keys = exclude_keys or []
-
         try:
-            for key, default_value in self.DEFAULT_SETTINGS.items():
-                if key not in exclude_keys:
-                    value = default_value() if callable(default_value) else default_value
-                    self.set_setting(key, str(value))
-
+            self._write_many(self._default_values(exclude_keys))
             self.logger.log_message("info", "Settings reset to defaults")
             return True
         except Exception as e:
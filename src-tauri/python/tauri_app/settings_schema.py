@@ -0,0 +1,152 @@
+"""Settings Schema - 设置项类型声明与解析"""
+from datetime import datetime
+from typing import Any, Callable, Dict, NamedTuple, Optional, Sequence, Tuple
+
+from .week_calendar import parse_week_list
+
+
+class SettingSpec(NamedTuple):
+    """单个设置项的类型声明
+
+    parse 将数据库中的字符串转换为类型化的值，非法值抛出 ValueError。
+    """
+    type_name: str
+    parse: Callable[[str], Any]
+
+
+def _parse_bool(value: str) -> bool:
+    # 与历史代码中的 == 'true' 判断保持一致
+    normalized = value.strip().lower()
+    if normalized not in ('true', 'false', ''):
+        raise ValueError(f"not a boolean: {value!r}")
+    return normalized == 'true'
+
+
+def _int_range(minimum: Optional[int] = None, maximum: Optional[int] = None) -> Callable[[str], int]:
+    def parse(value: str) -> int:
+        number = int(value)
+        if minimum is not None and number < minimum:
+            raise ValueError(f"{number} < {minimum}")
+        if maximum is not None and number > maximum:
+            raise ValueError(f"{number} > {maximum}")
+        return number
+    return parse
+
+
+def _float_range(minimum: float) -> Callable[[str], float]:
+    def parse(value: str) -> float:
+        number = float(value)
+        if number < minimum:
+            raise ValueError(f"{number} < {minimum}")
+        return number
+    return parse
+
+
+def _choice(*choices: str) -> Callable[[str], str]:
+    def parse(value: str) -> str:
+        if value not in choices:
+            raise ValueError(f"{value!r} not in {choices}")
+        return value
+    return parse
+
+
+def _log_level(value: str) -> str:
+    # 与 logger.set_min_level 一致，级别名不区分大小写
+    return _choice('TRACE', 'DEBUG', 'INFO', 'SUCCESS', 'WARNING', 'ERROR', 'CRITICAL')(value.strip().upper())
+
+
+def _optional_date(value: str) -> str:
+    # 空字符串表示未设置；否则必须是 YYYY-MM-DD
+    if value.strip():
+        datetime.strptime(value.strip(), "%Y-%m-%d")
+    return value.strip()
+
+
+def parse_offsets(value: Optional[str]) -> Tuple[int, ...]:
+    """解析提醒提前量列表，如 "15, 2"（分钟，去重后从大到小排列）"""
+    offsets = set()
+    for part in (value or '').replace(' ', '').split(','):
+        if not part:
+            continue
+        minutes = int(part)
+        if minutes < 0:
+            raise ValueError(f"negative reminder offset: {minutes}")
+        offsets.add(minutes)
+    return tuple(sorted(offsets, reverse=True))
+
+
+def _text(value: str) -> str:
+    return value
+
+
+BOOL = SettingSpec('bool', _parse_bool)
+TEXT = SettingSpec('str', _text)
+
+
+def int_spec(minimum: Optional[int] = None, maximum: Optional[int] = None) -> SettingSpec:
+    return SettingSpec('int', _int_range(minimum, maximum))
+
+
+def choice_spec(choices: Sequence[str]) -> SettingSpec:
+    return SettingSpec('str', _choice(*choices))
+
+
+# 类型化的设置项；未列出的键按普通字符串处理
+SETTINGS_SCHEMA: Dict[str, SettingSpec] = {
+    'api_server_enabled': BOOL,
+    'api_server_port': int_spec(1, 65535),
+
+    'theme_mode': choice_spec(('auto', 'dark', 'light')),
+    'topbar_height': SettingSpec('float', _float_range(0)),
+    'font_size': int_spec(1),
+
+    'show_clock': BOOL,
+    'show_schedule': BOOL,
+
+    'semester_start_date': SettingSpec('date', _optional_date),
+    'vacation_weeks': SettingSpec('weeks', parse_week_list),
+    'current_week': int_spec(1),
+    'total_weeks': int_spec(1),
+
+    'control_mode': choice_spec(('touch', 'mouse')),
+
+    'camera_enabled': BOOL,
+    'camera_width': int_spec(1),
+    'camera_height': int_spec(1),
+    'camera_fps': int_spec(1),
+    'camera_encoder_preference': choice_spec(('hardware', 'software')),
+
+    'reminder_enabled': BOOL,
+    'reminder_minutes': int_spec(1),
+    'reminder_offsets': SettingSpec('offsets', parse_offsets),
+    'reminder_end_notice': BOOL,
+    'reminder_sound': BOOL,
+
+    'log_level': SettingSpec('str', _log_level),
+}
+
+
+def get_spec(key: str) -> SettingSpec:
+    """获取设置项的类型声明（未声明的键视为字符串）"""
+    return SETTINGS_SCHEMA.get(key, TEXT)
+
+
+def parse_setting(key: str, raw: str) -> Any:
+    """按声明的类型解析设置值
+
+    Raises:
+        ValueError: 值不符合声明的类型或范围
+    """
+    try:
+        return get_spec(key).parse(raw)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Invalid value for {key}: {e}") from e
+
+
+def validate_setting(key: str, raw: str) -> Optional[str]:
+    """校验设置值，合法返回 None，否则返回错误信息"""
+    try:
+        parse_setting(key, raw)
+        return None
+    except ValueError as e:
+        return str(e)
@@ -25,6 +25,11 @@ class WebSocketClient:
         self.settings_manager = settings_manager
         self.portal = portal
         self.logger = logger
+        # The portal's loop owns the connection; captured up front so settings
+        # pushes find it even if start() never ran
+        self._loop: Optional[asyncio.AbstractEventLoop] = (
+            portal.call(asyncio.get_running_loop) if portal else None
+        )
 
         self.websocket: Optional[websockets.WebSocketClientProtocol] = None
         self.running = False
@@ -35,6 +40,12 @@ class WebSocketClient:
         self._connect_task: Optional[asyncio.Task] = None
         self._listen_task: Optional[asyncio.Task] = None
         self._heartbeat_task: Optional[asyncio.Task] = None
+        self._log_task: Optional[asyncio.Task] = None
+
+        # Push setting changes to the server as they happen
+        self._unsubscribe_settings = None
+        if settings_manager:
+            self._unsubscribe_settings = settings_manager.subscribe(None, self._on_settings_changed)
 
     async def start(self):
         """Start WebSocket client with auto-reconnect."""
@@ -55,6 +66,7 @@ class WebSocketClient:
         self.running = False
 
         # Cancel tasks
+        self._stop_log_stream()
         if self._heartbeat_task:
             self._heartbeat_task.cancel()
         if self._listen_task:
@@ -103,6 +115,7 @@ class WebSocketClient:
 
             # Cleanup
             self.websocket = None
+            self._stop_log_stream()
             if self._heartbeat_task:
                 self._heartbeat_task.cancel()
                 self._heartbeat_task = None
@@ -176,7 +189,7 @@ class WebSocketClient:
         # Map commands to functions
         if command == 'get_all_settings':
             if self.settings_manager:
-                return self.settings_manager.get_all_settings()
+                return dict(self.settings_manager.get_all_settings())
             return {}
 
         elif command == 'get_setting':
@@ -201,6 +214,9 @@ class WebSocketClient:
             return {'success': False}
 
         elif command == 'refresh_state':
+            # Pick up settings written to the database outside this process
+            if self.settings_manager:
+                self.settings_manager.reload()
             await self._send_state_update()
             return {'success': True}
 
@@ -276,9 +292,60 @@ class WebSocketClient:
             success = _db.camera_manager.stop_preview(params.get('camera_index', 0))
             return {'success': success}
 
+        elif command == 'logs_subscribe':
+            return self._start_log_stream(
+                params.get('level'),
+                params.get('modules'),
+                int(params.get('backlog', 50))
+            )
+
+        elif command == 'logs_unsubscribe':
+            return {'subscribed': False, 'was_subscribed': self._stop_log_stream()}
+
         else:
             raise ValueError(f"Unknown command: {command}")
 
+    def _start_log_stream(self, level: Optional[str], modules, backlog: int) -> Dict[str, Any]:
+        """Start pushing log records to the server, replacing any previous subscription.
+
+        Filtering happens here, before anything is sent.
+        """
+        from .log_stream import make_filter
+
+        if isinstance(modules, str):
+            modules = modules.split(',')
+        log_filter = make_filter(level, modules)
+
+        self._stop_log_stream()
+        subscription = self.logger.log_stream.open_async(log_filter, backlog=max(0, backlog))
+        self._log_task = asyncio.create_task(self._log_stream_loop(subscription))
+        return {'subscribed': True, 'level': level, 'modules': list(log_filter.modules or [])}
+
+    def _stop_log_stream(self) -> bool:
+        if self._log_task is None:
+            return False
+        self._log_task.cancel()
+        self._log_task = None
+        return True
+
+    async def _log_stream_loop(self, subscription):
+        """Forward log records in batches. Must not log itself (it would feed back)."""
+        try:
+            entries = subscription.backlog
+            while self.websocket:
+                if entries or subscription.dropped:
+                    message = {'type': 'logs', 'entries': entries, 'dropped': subscription.dropped}
+                    subscription.dropped = 0
+                    await self.websocket.send(json.dumps(message, ensure_ascii=False))
+                entries = await subscription.get_batch(timeout=self.heartbeat_interval)
+        except asyncio.CancelledError:
+            pass
+        except Exception:
+            # Connection dropped; the subscription ends with it
+            pass
+        finally:
+            subscription.close()
+
     async def _heartbeat_loop(self):
         """Send periodic heartbeat to server."""
         while self.running and self.websocket:
@@ -298,18 +365,58 @@ class WebSocketClient:
                 self.logger.log_message("error", f"Error sending heartbeat: {e}")
                 break
 
-    async def _send_state_update(self):
-        """Send state update to server."""
+    def _on_settings_changed(self, changes: Dict[str, Any]):
+        """Settings subscriber: forward changed keys to the server.
+
+        Called from whichever thread wrote the settings, so the send is
+        scheduled onto the event loop the client runs on.
+        """
+        if 'server_url' in changes or (self.websocket and self.running):
+            self._run_in_loop(self._handle_settings_changed, list(changes.keys()))
+
+    def _run_in_loop(self, func, *args):
+        """Schedule func(*args) on the loop that owns the websocket.
+
+        Settings changes may come from any thread or from another event loop
+        (e.g. uvicorn's), so tasks are only created directly when already on
+        the connection's loop; everything else goes through the portal.
+        """
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is not None and running is self._loop:
+            running.create_task(func(*args))
+            return
+        if self.portal:
+            try:
+                self.portal.start_task_soon(func, *args)
+            except Exception as e:
+                self.logger.log_message("error", f"Failed to schedule settings push: {e}")
+
+    async def _handle_settings_changed(self, changed_keys):
+        if 'server_url' in changed_keys and self.settings_manager:
+            self.update_server_url(self.settings_manager.get_setting('server_url') or '')
+        await self._send_state_update(changed_keys)
+
+    async def _send_state_update(self, changed_keys=None):
+        """Send state update to server.
+
+        Args:
+            changed_keys: Setting keys that triggered this update, if any
+        """
         if not self.websocket:
             return
 
         try:
             # Collect current state
             state_data = {}
+            if changed_keys:
+                state_data['changed_keys'] = list(changed_keys)
 
             # Get settings
             if self.settings_manager:
-                state_data['settings'] = self.settings_manager.get_all_settings()
+                state_data['settings'] = dict(self.settings_manager.get_all_settings())
 
             # Send update
             message = {
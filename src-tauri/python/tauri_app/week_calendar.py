@@ -0,0 +1,181 @@
+"""
+Week calendar for ClassTop application.
+Parses the semester settings once and maps arbitrary dates to teaching week
+numbers, honouring total_weeks and vacation weeks.
+"""
+
+import threading
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from typing import Callable, Dict, FrozenSet, Iterable, NamedTuple, Optional
+
+from . import logger
+
+# Settings the calendar depends on; a change to any of them invalidates it
+SETTING_KEYS = ("semester_start_date", "current_week", "total_weeks", "vacation_weeks")
+
+# Longest range weeks_between() accepts (one academic year, leap day included)
+MAX_RANGE_DAYS = 366
+
+
+@lru_cache(maxsize=32)
+def parse_start_date(value: str) -> date:
+    """Parse a 'YYYY-MM-DD' semester start date.
+
+    Raises:
+        ValueError: if the value is not a valid date
+    """
+    return datetime.strptime(value.strip(), "%Y-%m-%d").date()
+
+
+def week_from_start(start: date, day: date) -> int:
+    """Week number of `day` counted from the semester start (never below 1)."""
+    return max(1, (day - start).days // 7 + 1)
+
+
+def parse_week_list(value: Optional[str]) -> FrozenSet[int]:
+    """Parse a week list such as '8, 9' or '8-9,17' (JSON-style brackets are tolerated)."""
+    weeks = set()
+    if not value:
+        return frozenset()
+    for part in value.strip().strip("[]").replace(" ", "").split(","):
+        if not part:
+            continue
+        if "-" in part:
+            first, last = part.split("-", 1)
+            weeks.update(range(int(first), int(last) + 1))
+        else:
+            weeks.add(int(part))
+    return frozenset(weeks)
+
+
+class SemesterConfig(NamedTuple):
+    """Parsed semester settings."""
+    start: Optional[date]
+    current_week: int
+    total_weeks: Optional[int]
+    vacation_weeks: FrozenSet[int]
+
+
+class WeekCalendar:
+    """Date to teaching week mapping backed by cached semester settings.
+
+    With a semester start date, week numbers are counted from that date.
+    Otherwise the manually set current_week applies to today and other dates
+    are offset from it by whole calendar weeks. The parsed configuration is
+    kept until invalidate() is called, normally from a settings change.
+    """
+
+    def __init__(self, get_setting: Callable[[str], Optional[str]]):
+        self._get_setting = get_setting
+        self._lock = threading.Lock()
+        self._config: Optional[SemesterConfig] = None
+        self._generation = 0
+        self.logger = logger
+
+    def invalidate(self) -> None:
+        """Drop the cached configuration; it is re-read on next use."""
+        with self._lock:
+            self._config = None
+            self._generation += 1
+
+    def on_settings_changed(self, keys: Iterable[str]) -> None:
+        """Settings listener: invalidate when a semester setting changed."""
+        if any(key in SETTING_KEYS for key in keys):
+            self.invalidate()
+
+    def _int_setting(self, key: str, default: Optional[int]) -> Optional[int]:
+        value = self._get_setting(key)
+        try:
+            return int(value) if value not in (None, "") else default
+        except (TypeError, ValueError):
+            self.logger.log_message("warning", f"Invalid {key} setting: {value!r}")
+            return default
+
+    def _load(self) -> SemesterConfig:
+        start = None
+        start_value = self._get_setting("semester_start_date")
+        if start_value and start_value.strip():
+            try:
+                start = parse_start_date(start_value)
+            except ValueError as e:
+                self.logger.log_message("error", f"Error calculating week number: {e}")
+
+        try:
+            vacation_weeks = parse_week_list(self._get_setting("vacation_weeks"))
+        except ValueError as e:
+            self.logger.log_message("warning", f"Invalid vacation_weeks setting: {e}")
+            vacation_weeks = frozenset()
+
+        total_weeks = self._int_setting("total_weeks", None)
+        return SemesterConfig(
+            start=start,
+            current_week=self._int_setting("current_week", 1) or 1,
+            total_weeks=total_weeks if total_weeks and total_weeks > 0 else None,
+            vacation_weeks=vacation_weeks,
+        )
+
+    @property
+    def config(self) -> SemesterConfig:
+        """The parsed semester configuration, loaded on first use."""
+        config = self._config
+        if config is None:
+            generation = self._generation
+            config = self._load()
+            with self._lock:
+                # Don't cache a config that was invalidated while loading
+                if generation == self._generation:
+                    self._config = config
+        return config
+
+    def _week(self, config: SemesterConfig, day: date, today: date) -> int:
+        if config.start is not None:
+            return week_from_start(config.start, day)
+        this_monday = today - timedelta(days=today.weekday())
+        return max(1, config.current_week + (day - this_monday).days // 7)
+
+    def _in_term(self, config: SemesterConfig, week: int, day: date) -> bool:
+        if config.start is not None and day < config.start:
+            return False
+        if config.total_weeks is not None and week > config.total_weeks:
+            return False
+        return week not in config.vacation_weeks
+
+    def week_of(self, day: Optional[date] = None, strict: bool = False) -> Optional[int]:
+        """Teaching week of a date (default today).
+
+        In strict mode dates before the semester, after total_weeks or in a
+        vacation week give None; otherwise the week number is returned as is.
+        """
+        config = self.config
+        today = date.today()
+        day = day or today
+        week = self._week(config, day, today)
+        if strict and not self._in_term(config, week, day):
+            return None
+        return week
+
+    def weeks_between(self, start: date, end: date, strict: bool = False) -> Dict[date, Optional[int]]:
+        """Week number for every date from start to end inclusive.
+
+        Raises:
+            ValueError: if end is before start or the range spans more than
+                MAX_RANGE_DAYS days
+        """
+        if end < start:
+            raise ValueError(f"End date {end} is before start date {start}")
+        if (end - start).days + 1 > MAX_RANGE_DAYS:
+            raise ValueError(f"Date range is longer than {MAX_RANGE_DAYS} days")
+        config = self.config
+        today = date.today()
+        weeks: Dict[date, Optional[int]] = {}
+        day = start
+        while day <= end:
+            week = self._week(config, day, today)
+            weeks[day] = week if not strict or self._in_term(config, week, day) else None
+            day += timedelta(days=1)
+        return weeks
+
+    def is_vacation_week(self, week: int) -> bool:
+        """Whether a week number is configured as a vacation week."""
+        return week in self.config.vacation_weeks
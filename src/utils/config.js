@@ -43,9 +43,10 @@ async function logMessage(level, message) {
   }
 }
 
-async function getLogs(maxLines = 200) {
+// options: { level, since, until, cursor } — pass the returned cursor to load older lines
+async function getLogs(maxLines = 200, options = {}) {
   try {
-    const logs = await pyInvoke('get_logs', { max_lines: maxLines });
+    const logs = await pyInvoke('get_logs', { max_lines: maxLines, ...options });
     return { lines: logs };
   } catch (err) {
     console.error('getLogs failed', err);
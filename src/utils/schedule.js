@@ -87,6 +87,23 @@ export async function getCurrentWeek() {
   }
 }
 
+/**
+ * 获取日期范围内每天的周数（strict 时假期/学期外为 null）
+ */
+export async function getWeekNumbers(startDate, endDate, strict = false) {
+  try {
+    const result = await pyInvoke('get_week_numbers', { start_date: startDate, end_date: endDate, strict });
+    if (!result.success) {
+      console.error('Failed to get week numbers:', result.message);
+      return {};
+    }
+    return result.weeks || {};
+  } catch (error) {
+    console.error('Failed to get week numbers:', error);
+    return {};
+  }
+}
+
 /**
  * 获取所有课程
  */
@@ -246,6 +263,73 @@ export async function getScheduleForWeek(week = null) {
   }
 }
 
+/**
+ * 获取整周的课程表（后端已按天分组并排序，键为 1-7）
+ */
+export async function getScheduleForWeekGrouped(week = null) {
+  try {
+    const grouped = await pyInvoke('get_schedule_for_week_grouped', { week });
+    return grouped || {};
+  } catch (error) {
+    console.error('Failed to get grouped schedule for week:', error);
+    return {};
+  }
+}
+
+/**
+ * 获取指定版本之后的课表/设置变更（complete 为 false 时需全量重新加载）
+ */
+export async function getChangesSince(revision = 0) {
+  try {
+    return await pyInvoke('get_changes_since', { revision });
+  } catch (error) {
+    console.error('Failed to get changes:', error);
+    return { revision, complete: false, changes: [] };
+  }
+}
+
+/**
+ * 获取课程的提醒方案（offsets 为 null 时使用全局设置）
+ */
+export async function getCourseReminderPlan(courseId) {
+  try {
+    const result = await pyInvoke('get_course_reminder_plan', { course_id: courseId });
+    return result.success ? result.plan : null;
+  } catch (error) {
+    console.error('Failed to get course reminder plan:', error);
+    return null;
+  }
+}
+
+/**
+ * 设置课程的提醒方案，如 { offsets: [15, 2], end_notice: true }
+ */
+export async function setCourseReminderPlan(courseId, { enabled = true, offsets = null, endNotice = null } = {}) {
+  try {
+    return await pyInvoke('set_course_reminder_plan', {
+      course_id: courseId,
+      enabled,
+      offsets,
+      end_notice: endNotice
+    });
+  } catch (error) {
+    console.error('Failed to set course reminder plan:', error);
+    return { success: false };
+  }
+}
+
+/**
+ * 删除课程的提醒方案，恢复使用全局设置
+ */
+export async function clearCourseReminderPlan(courseId) {
+  try {
+    return await pyInvoke('clear_course_reminder_plan', { course_id: courseId });
+  } catch (error) {
+    console.error('Failed to clear course reminder plan:', error);
+    return { success: false };
+  }
+}
+
 /**
  * 从课程列表中查找当前正在上的课
  */
@@ -457,14 +541,16 @@ export async function checkScheduleConflict(dayOfWeek, startTime, endTime, weeks
 
 /**
  * 导出课程表数据
+ * 指定 outputPath 时由后端直接流式写入文件；否则通过 data 返回（有大小限制）
  */
-export async function exportScheduleData(format = 'json', includeCourses = true, includeSchedule = true, includeSettings = false) {
+export async function exportScheduleData(format = 'json', includeCourses = true, includeSchedule = true, includeSettings = false, outputPath = null) {
   try {
     const result = await pyInvoke('export_schedule_data', {
       format,
       include_courses: includeCourses,
       include_schedule: includeSchedule,
-      include_settings: includeSettings
+      include_settings: includeSettings,
+      output_path: outputPath
     });
     return result;
   } catch (error) {